@@ -1,193 +1,391 @@
+import copy
 import json
+import time
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 
-from agents.analyser.analyser_plan import AnalyserPlanAgent
-from agents.football.football_plan import FootballPlanAgent
+from agents.analyser.context_encoder import DEFAULT_TOKEN_BUDGET, encode_context
+from agenteSystem.query_extractor import QueryExtractor
+from tools.football.match_stats import attach, fixture_ids
+from tools.football.ratings import get_ratings_store
+from tools.telemetry.telemetry import get_telemetry
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# question_type das perguntas sobre a liga inteira = ação de liga do FootballAPI
+LEAGUE_ACTIONS = ("league_table", "league_form", "league_markets")
+
 class SystemAgent:
-    def __init__(self):
-        self.football_agent = FootballPlanAgent()
-        self.analyser_agent = AnalyserPlanAgent()
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
+    """Orquestra extração, coleta e análise.
 
-    def run(self, user_query: str):
+    Os agentes (e os imports de langchain/langchain_openai) são construídos no
+    primeiro uso: perguntas sem time identificado ou respondidas pelo cache não
+    pagam esse custo. Use warm() para construir tudo antecipadamente.
+    """
+
+    def __init__(self, max_workers: int = 4, context_budget: int = DEFAULT_TOKEN_BUDGET):
+        self.max_workers = max_workers
+        self.extractor = QueryExtractor()
+        self.context_budget = context_budget
+        self._football_agent = None
+        self._analyser_agent = None
+        self._llm = None
+        self._lazy_lock = threading.Lock()
+
+    @property
+    def football_agent(self):
+        with self._lazy_lock:
+            if self._football_agent is None:
+                from agents.football.football_plan import FootballPlanAgent
+                self._football_agent = FootballPlanAgent()
+            return self._football_agent
+
+    @football_agent.setter
+    def football_agent(self, agent):
+        self._football_agent = agent
+
+    @property
+    def analyser_agent(self):
+        with self._lazy_lock:
+            if self._analyser_agent is None:
+                from agents.analyser.analyser_plan import AnalyserPlanAgent
+                self._analyser_agent = AnalyserPlanAgent()
+            return self._analyser_agent
+
+    @analyser_agent.setter
+    def analyser_agent(self, agent):
+        self._analyser_agent = agent
+
+    @property
+    def llm(self):
+        with self._lazy_lock:
+            if self._llm is None:
+                from agents.llm.llm_cache import CachedLLM, LazyChatOpenAI
+                self._llm = CachedLLM(LazyChatOpenAI(model="gpt-4o-mini", temperature=0.1))
+            return self._llm
+
+    def warm(self):
+        """Constrói agentes e modelos agora (processos de longa duração, como o servidor)."""
+        getattr(self.football_agent, "agent_football", None)
+        self.analyser_agent.structured_llm.runnable
+        self.llm.llm.llm  # CachedLLM -> LazyChatOpenAI -> ChatOpenAI
+        return self
+
+    def _collection_tasks(self, params: dict) -> list:
+        """Monta as consultas de coleta: uma por time e, se houver 2 times, o confronto direto.
+
+        Perguntas sobre a liga inteira (sem time) viram uma única ação de liga,
+        que calcula todos os times a partir de uma só busca de jogos.
         """
-        Recebe a pergunta do usuário, coleta dados, analisa e retorna relatório JSON.
+        teams = params.get("teams", [])
+        tasks = []
+
+        if self._is_league_question(params):
+            league_query = {
+                "action": params["question_type"],
+                "league_id": params["league_id"],
+                "season": params.get("season", 2022),
+                "last_n_games": params.get("last_n_games"),
+                "market": params.get("market"),
+                "ascending": params.get("ascending")
+            }
+            return [({"type": "liga"}, {k: v for k, v in league_query.items() if v is not None})]
+
+        for team in teams:
+            team_query = {
+                "action": "get_team_recent_matches",
+                "team_name": team,
+                "league_id": params.get("league_id"),
+                "season": params.get("season", 2022),
+                "last_n_games": params.get("last_n_games") or 10
+            }
+            tasks.append(({"team": team}, team_query))
+
+        # Se há 2 times, buscar confronto direto
+        if len(teams) == 2:
+            h2h_query = {
+                "action": "head_to_head",
+                "team1": teams[0],
+                "team2": teams[1],
+                "season": params.get("season", 2022)
+            }
+            tasks.append(({"type": "head_to_head"}, h2h_query))
+
+        return tasks
+
+    @staticmethod
+    def _is_league_question(params: dict) -> bool:
+        return (not params.get("teams") and params.get("league_id") is not None
+                and params.get("question_type") in LEAGUE_ACTIONS
+                and (params["question_type"] != "league_markets" or bool(params.get("market"))))
+
+    def _iter_collect(self, params: dict):
+        """Executa as consultas de coleta em paralelo, gerando (posição, resultado) conforme terminam."""
+        tasks = self._collection_tasks(params)
+        if not tasks:
+            return
+
+        for entry, query in tasks:
+            if "team" in entry:
+                logger.info(f"📊 Buscando dados de: {entry['team']}")
+            elif entry.get("type") == "liga":
+                logger.info(f"🏆 Buscando dados da liga {query['league_id']} ({query['action']})")
+            else:
+                logger.info(f"⚔️ Buscando confronto direto: {query['team1']} vs {query['team2']}")
+
+        with get_telemetry().span("coleta", tarefas=len(tasks)), \
+                ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(tasks)))) as executor:
+            # copy_context leva o span atual para as threads (spans HTTP aninhados na coleta)
+            futures = {executor.submit(contextvars.copy_context().run, self._run_task, entry, query): i
+                       for i, (entry, query) in enumerate(tasks)}
+
+            for future in as_completed(futures):
+                i = futures[future]
+                entry = tasks[i][0]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ Erro ao buscar dados de {entry.get('team', entry.get('type'))}: {str(e)}")
+                    data = {"error": str(e)}
+                yield i, {**entry, "data": data}
+
+    def _run_task(self, entry: dict, query: dict):
+        with get_telemetry().span("coleta.tarefa", alvo=entry.get("team", entry.get("type"))):
+            return self.football_agent.run(json.dumps(query))
+
+    def _enrich(self, data_collection: list) -> list:
+        """Junta escanteios/cartões/chutes/xG de todos os jogos coletados com uma chamada em lote."""
+        ids = fixture_ids([entry.get("data") for entry in data_collection])
+        if not ids:
+            return data_collection
+
+        with get_telemetry().span("enriquecimento", jogos=len(ids)):
+            try:
+                enrichment = self.football_agent.run(json.dumps({"action": "enrich_match_statistics", "fixture_ids": ids}))
+            except Exception as e:
+                enrichment = {"error": str(e)}
+        if not isinstance(enrichment, dict) or "error" in enrichment:
+            # Sem estatísticas detalhadas a análise segue só com placares
+            logger.warning(f"⚠️ Estatísticas detalhadas indisponíveis: {enrichment.get('error') if isinstance(enrichment, dict) else enrichment}")
+            return data_collection
+
+        records = enrichment.get("statistics", {})
+        return [{**entry, "data": attach(copy.deepcopy(entry["data"]), records)} for entry in data_collection]
+
+    def _attach_ratings(self, data_collection: list) -> list:
+        """Acrescenta rating Elo, força de ataque/defesa e forma mantidos localmente a cada time coletado."""
+        store = get_ratings_store()
+        result = []
+        for entry in data_collection:
+            data = entry.get("data")
+            rating = store.get(data["team_id"]) if isinstance(data, dict) and data.get("team_id") else None
+            result.append({**entry, "data": {**data, "rating": rating}} if rating else entry)
+        return result
+
+    def _predict(self, params: dict, data_collection: list) -> list:
+        """Com 2 times, acrescenta as probabilidades do modelo Dixon-Coles (1º time = mandante).
+
+        O ajuste é local e reaproveita as respostas da coleta (em cache); a análise
+        recebe os números prontos em vez de calculá-los.
         """
-        try:
-            hoje = "2022-07-11"
-            trinta_dias_atras = "2022-05-23"
-            
-            extraction_prompt = f"""Você é um extrator de informações sobre futebol. Analise a pergunta e retorne APENAS um JSON válido, sem explicações.
-
-            Pergunta: "{user_query}"
-
-            Retorne exatamente neste formato:
-            {{
-                "teams": [],
-                "league_id": null,
-                "season": 2024,
-                "date_from": null,
-                "date_to": null,
-                "analysis_type": "recent_performance",
-                "question_type": "general"
-            }}
-
-            REGRAS DE EXTRAÇÃO:
-            - teams: Liste TODOS os times mencionados (ex: ["Flamengo", "River Plate"])
-            - league_id: 71 para Brasileirão, 13 para Libertadores, null se não mencionado
-            - season: 2022
-            - date_from: Se mencionar "últimos X jogos" ou "última rodada", use "{trinta_dias_atras}"
-            - date_to: Data final, use "{hoje}" se mencionado "hoje" ou "atual"
-            - analysis_type: "recent_performance", "prediction", "head_to_head" ou "betting"
-            - question_type: "goals_scored", "match_prediction", "betting_tips", "team_form"
-
-            EXEMPLOS:
-            P: "Quantos gols o Flamengo fez nos últimos jogos?"
-            R: {{"teams": ["Flamengo"], "league_id": 71, "season": 2022, "date_from": "{trinta_dias_atras}", "date_to": "{hoje}", "analysis_type": "recent_performance", "question_type": "goals_scored"}}
-
-            P: "Flamengo ganha do River Plate?"
-            R: {{"teams": ["Flamengo", "River Plate"], "league_id": null, "season": 2022, "date_from": null, "date_to": null, "analysis_type": "prediction", "question_type": "match_prediction"}}
-
-            Retorne APENAS o JSON, sem texto adicional:"""
-            
-            response = self.llm.invoke(extraction_prompt)
-            parsed_input_str = response.content if hasattr(response, 'content') else str(response)
-            
+        teams = params.get("teams", [])
+        if len(teams) != 2:
+            return data_collection
+
+        query = {
+            "action": "predict_match",
+            "team1": teams[0],
+            "team2": teams[1],
+            "league_id": params.get("league_id"),
+            "season": params.get("season", 2022),
+            "last_n_games": params.get("last_n_games") or 10
+        }
+        with get_telemetry().span("previsao"):
             try:
-                if "```json" in parsed_input_str:
-                    parsed_input_str = parsed_input_str.split("```json")[1].split("```")[0].strip()
-                elif "```" in parsed_input_str:
-                    parsed_input_str = parsed_input_str.split("```")[1].split("```")[0].strip()
-                
-                params = json.loads(parsed_input_str)
+                prediction = self.football_agent.run(json.dumps(query))
             except Exception as e:
-                return {
-                    "error": "Não foi possível interpretar a entrada do usuário.",
-                    "raw": parsed_input_str,
-                    "exception": str(e)
-                }
+                prediction = {"error": str(e)}
+        if not isinstance(prediction, dict) or "error" in prediction:
+            logger.warning(f"⚠️ Modelo de previsão indisponível: {prediction.get('error') if isinstance(prediction, dict) else prediction}")
+            return data_collection
+        return data_collection + [{"type": "previsao_modelo", "data": prediction}]
+
+    def _extract_with_llm(self, user_query: str, hoje: str, trinta_dias_atras: str) -> dict:
+        """Extração via LLM, usada quando o extrator local não tem confiança suficiente."""
+        extraction_prompt = f"""Você é um extrator de informações sobre futebol. Analise a pergunta e retorne APENAS um JSON válido, sem explicações.
+
+        Pergunta: "{user_query}"
+
+        Retorne exatamente neste formato:
+        {{
+            "teams": [],
+            "league_id": null,
+            "season": 2024,
+            "date_from": null,
+            "date_to": null,
+            "analysis_type": "recent_performance",
+            "question_type": "general"
+        }}
+
+        REGRAS DE EXTRAÇÃO:
+        - teams: Liste TODOS os times mencionados (ex: ["Flamengo", "River Plate"])
+        - league_id: 71 para Brasileirão, 13 para Libertadores, null se não mencionado
+        - season: 2022
+        - date_from: Se mencionar "últimos X jogos" ou "última rodada", use "{trinta_dias_atras}"
+        - date_to: Data final, use "{hoje}" se mencionado "hoje" ou "atual"
+        - analysis_type: "recent_performance", "prediction", "head_to_head", "betting" ou "league"
+        - question_type: "goals_scored", "match_prediction", "betting_tips", "team_form"
+        - Pergunta sobre a liga inteira, sem time: analysis_type "league" e question_type "league_table"
+          (classificação), "league_form" (forma) ou "league_markets" com "market": "btts", "clean_sheets",
+          "sem_marcar", "over_1_5", "over_2_5", "over_3_5", "gols_marcados" (times que mais marcam) ou
+          "gols_sofridos" (times que mais sofrem); acrescente "ascending": true se pedir os que menos
 
-            print(f"\n🔍 Parâmetros extraídos: {json.dumps(params, indent=2, ensure_ascii=False)}")
+        EXEMPLOS:
+        P: "Quantos gols o Flamengo fez nos últimos jogos?"
+        R: {{"teams": ["Flamengo"], "league_id": 71, "season": 2022, "date_from": "{trinta_dias_atras}", "date_to": "{hoje}", "analysis_type": "recent_performance", "question_type": "goals_scored"}}
+
+        P: "Flamengo ganha do River Plate?"
+        R: {{"teams": ["Flamengo", "River Plate"], "league_id": null, "season": 2022, "date_from": null, "date_to": null, "analysis_type": "prediction", "question_type": "match_prediction"}}
+
+        Retorne APENAS o JSON, sem texto adicional:"""
+        
+        response = self.llm.invoke(extraction_prompt)
+        parsed_input_str = response.content if hasattr(response, 'content') else str(response)
+        
+        try:
+            if "```json" in parsed_input_str:
+                parsed_input_str = parsed_input_str.split("```json")[1].split("```")[0].strip()
+            elif "```" in parsed_input_str:
+                parsed_input_str = parsed_input_str.split("```")[1].split("```")[0].strip()
             
-            if not params.get("teams") or len(params.get("teams", [])) == 0:
-                return {
-                    "error": "Não consegui identificar nenhum time na sua pergunta. Por favor, mencione pelo menos um time.",
-                    "exemplo": "Tente perguntas como: 'Como está o Flamengo?' ou 'Flamengo vs Palmeiras'"
-                }
+            return json.loads(parsed_input_str)
+        except Exception as e:
+            return {
+                "error": "Não foi possível interpretar a entrada do usuário.",
+                "raw": parsed_input_str,
+                "exception": str(e)
+            }
+
+    def stream(self, user_query: str):
+        """
+        Executa o pipeline gerando eventos à medida que cada etapa termina:
+
+            {"event": "params", "params": {...}}           parâmetros extraídos
+            {"event": "data", "team"|"type": ..., "data": {...}}   cada coleta concluída
+            {"event": "token", "text": "..."}             trechos da resposta direta
+            {"event": "result", "data": {...}}            resultado final (o mesmo de run); quando houve
+                                                          análise, traz também "context_report" da pergunta
+        """
+        telemetry = get_telemetry()
+        start = time.perf_counter()
+        with telemetry.span("consulta") as span:
+            for event in self._stream(user_query):
+                if event["event"] == "result":
+                    ok = isinstance(event["data"], dict) and "error" not in event["data"]
+                    span.set(status="ok" if ok else "error")
+                    telemetry.incr("queries_total", status="ok" if ok else "error")
+                    telemetry.observe("query_seconds", time.perf_counter() - start)
+                yield event
+
+    def _stream(self, user_query: str):
+        telemetry = get_telemetry()
+        try:
+            hoje = "2022-07-11"
+            trinta_dias_atras = "2022-05-23"
             
-            data_collection = []
+            with telemetry.span("extracao") as span:
+                params, confidence = self.extractor.extract(user_query, hoje, trinta_dias_atras)
+                span.set(confianca=confidence, fonte="local")
+                if confidence < self.extractor.min_confidence:
+                    logger.info(f"🤖 Extração local com baixa confiança ({confidence}), consultando o LLM...")
+                    span.set(fonte="llm")
+                    params = self._extract_with_llm(user_query, hoje, trinta_dias_atras)
+            telemetry.incr("extractions_total", source="llm" if confidence < self.extractor.min_confidence else "local")
+            if "error" in params:
+                yield {"event": "result", "data": params}
+                return
+
+            logger.info(f"🔍 Parâmetros extraídos: {json.dumps(params, ensure_ascii=False)}")
+            yield {"event": "params", "params": params}
             
-            for team in params.get("teams", []):
-                print(f"📊 Buscando dados de: {team}")
-                team_query = {
-                    "action": "get_team_recent_matches",
-                    "team_name": team,
-                    "league_id": params.get("league_id"),
-                    "season": params.get("season", 2022),
-                    "last_n_games": 10
-                }
-                
-                try:
-                    team_data = self.football_agent.run(json.dumps(team_query))
-                    data_collection.append({
-                        "team": team,
-                        "data": team_data
-                    })
-                except Exception as e:
-                    print(f"⚠️ Erro ao buscar dados de {team}: {str(e)}")
-                    data_collection.append({
-                        "team": team,
-                        "data": {"error": str(e)}
-                    })
+            if not params.get("teams") and not self._is_league_question(params):
+                yield {"event": "result", "data": {
+                    "error": "Não consegui identificar nenhum time na sua pergunta. Por favor, mencione pelo menos um time ou uma liga.",
+                    "exemplo": "Tente perguntas como: 'Como está o Flamengo?', 'Flamengo vs Palmeiras' ou 'Tabela do Brasileirão 2022'"
+                }}
+                return
             
-            # Se há 2 times, buscar confronto direto
-            if len(params.get("teams", [])) == 2:
-                print(f"⚔️ Buscando confronto direto: {params['teams'][0]} vs {params['teams'][1]}")
-                try:
-                    h2h_query = {
-                        "action": "head_to_head",
-                        "team1": params["teams"][0],
-                        "team2": params["teams"][1]
-                    }
-                    h2h_data = self.football_agent.run(json.dumps(h2h_query))
-                    data_collection.append({
-                        "type": "head_to_head",
-                        "data": h2h_data
-                    })
-                except Exception as e:
-                    print(f"⚠️ Erro ao buscar confronto direto: {str(e)}")
+            results = {}
+            for i, entry in self._iter_collect(params):
+                results[i] = entry
+                yield {"event": "data", **entry}
+            data_collection = self._attach_ratings(self._enrich([results[i] for i in sorted(results)]))
+            data_collection = self._predict(params, data_collection)
 
             # Verificar se conseguimos coletar algum dado
             if not data_collection or all(d.get("data", {}).get("error") for d in data_collection):
-                return {
+                yield {"event": "result", "data": {
                     "error": "Não foi possível coletar dados da API de futebol.",
                     "possivel_causa": "API key inválida ou limite de requisições atingido",
                     "dados_tentados": params
-                }
+                }}
+                return
 
-            print("✅ Dados coletados com sucesso!")
-            
-            # Passo 3: Análise inteligente
-            analysis_prompt = f"""
-            Pergunta original: {user_query}
-            
-            Dados coletados: {json.dumps(data_collection, indent=2)}
-            
-            Contexto da pergunta: {json.dumps(params, indent=2)}
-            """
+            logger.info("✅ Dados coletados com sucesso!")
             
-            analysis = self.analyser_agent.run(analysis_prompt)
+            # Passo 3: Análise e resposta final em uma única chamada estruturada
+            with telemetry.span("contexto") as span:
+                context, context_report = encode_context(data_collection, params, self.context_budget)
+                span.set(tokens=context_report["tokens_compact"])
+            telemetry.observe("context_tokens", context_report["tokens_compact"])
+            logger.info(f"🧮 Contexto compacto: {context_report['tokens_compact']} tokens, ~{context_report['tokens_saved']} "
+                        f"economizados ({context_report['rows_dropped']} linhas de jogos fora do orçamento)")
 
-            # Passo 4: Gerar resposta final em linguagem natural
-            final_response_prompt = f"""
-            Com base na análise abaixo, responda a pergunta do usuário de forma clara e direta:
-            
-            Pergunta: "{user_query}"
-            
-            Análise: {json.dumps(analysis, indent=2)}
-            
-            Forneça:
-            1. Resposta direta à pergunta
-            2. Estatísticas relevantes
-            3. Se for sobre apostas, sugira mercados interessantes com base nos dados
-            4. Se for sobre previsão, dê sua análise fundamentada
-            
-            Retorne JSON no formato:
-            {{
-                "resposta_direta": "...",
-                "estatisticas": {{}},
-                "sugestoes_apostas": [],
-                "confianca_analise": "alta/média/baixa",
-                "observacoes": "..."
-            }}
-            """
-            
-            print("🧠 Gerando análise final...")
-            final_answer_response = self.llm.invoke(final_response_prompt)
-            final_answer = final_answer_response.content if hasattr(final_answer_response, 'content') else str(final_answer_response)
-            
-            # Limpar markdown se existir
-            if "```json" in final_answer:
-                final_answer = final_answer.split("```json")[1].split("```")[0].strip()
-            elif "```" in final_answer:
-                final_answer = final_answer.split("```")[1].split("```")[0].strip()
-            
+            logger.info("🧠 Gerando análise final...")
+            report, sent = None, ""
             try:
-                result = json.loads(final_answer)
-                print("✅ Análise concluída!")
-                return result
-            except json.JSONDecodeError as e:
-                print(f"⚠️ Erro ao parsear JSON final: {str(e)}")
-                return {
-                    "resposta": final_answer,
-                    "analise_completa": analysis,
-                    "dados_brutos": data_collection,
-                    "nota": "A resposta não pôde ser formatada como JSON, mas está disponível em texto"
-                }
+                with telemetry.span("analise"):
+                    for partial in self.analyser_agent.analyse_stream(user_query, context):
+                        if isinstance(partial, dict):
+                            text = (partial.get("resposta") or {}).get("resposta_direta") or ""
+                        else:
+                            report = partial
+                            text = report.resposta.resposta_direta
+                        # Só emite o que estende o texto já enviado (JSON parcial pode oscilar em escapes)
+                        if isinstance(text, str) and len(text) > len(sent) and text.startswith(sent):
+                            yield {"event": "token", "text": text[len(sent):]}
+                            sent = text
+            except Exception as e:
+                logger.warning(f"⚠️ Erro na análise estruturada: {str(e)}")
+                yield {"event": "result", "data": {
+                    "error": f"Erro na análise: {str(e)}",
+                    "dados_brutos": data_collection
+                }, "context_report": context_report}
+                return
+
+            logger.info("✅ Análise concluída!")
+            output = report.to_output()
+            stale = [entry.get("team", entry.get("type")) for entry in data_collection
+                     if isinstance(entry.get("data"), dict) and entry["data"].get("stale")]
+            if stale:
+                # Parte dos dados veio do cache vencido porque a cota da API acabou
+                output["dados_desatualizados"] = stale
+            yield {"event": "result", "data": output, "context_report": context_report}
 
         except Exception as e:
-            return {"error": str(e), "traceback": str(e.__traceback__)}
\ No newline at end of file
+            yield {"event": "result", "data": {"error": str(e), "traceback": str(e.__traceback__)}}
+
+    def run(self, user_query: str):
+        """
+        Recebe a pergunta do usuário, coleta dados, analisa e retorna relatório JSON.
+        """
+        result = None
+        for event in self.stream(user_query):
+            if event["event"] == "result":
+                result = event["data"]
+        return result
@@ -0,0 +1,250 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from tools.football.football_http import get_http_client, request_priority, PRIORITY_BATCH
+from tools.telemetry.telemetry import configure_logging, get_telemetry
+
+
+class SharedFootballAgent:
+    """Envolve o FootballPlanAgent e reaproveita consultas idênticas entre perguntas do lote.
+
+    Consultas concorrentes com o mesmo payload esperam a primeira terminar.
+    Resultados com erro não ficam memorizados, para que perguntas seguintes tentem de novo.
+    """
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.results = {}
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def run(self, query: str):
+        key = json.dumps(json.loads(query), sort_keys=True)
+        with self._lock:
+            future = self.results.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.results[key] = future
+            else:
+                self.hits += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            result = self.agent.run(query)
+        except Exception as e:
+            with self._lock:
+                self.results.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        if isinstance(result, dict) and "error" in result:
+            with self._lock:
+                self.results.pop(key, None)
+        future.set_result(result)
+        return result
+
+
+def read_questions(path: str) -> list:
+    """Lê perguntas de um JSONL: {"id": ..., "question"|"pergunta": "..."}; sem id, usa o número da linha."""
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            question = item.get("question") or item.get("pergunta")
+            if not question:
+                continue
+            questions.append({"id": str(item.get("id", line_number)), "question": question})
+    return questions
+
+
+def completed_ids(path: str) -> set:
+    """IDs já respondidos sem erro em um arquivo de saída anterior (para retomar o lote)."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Última linha truncada de um processo interrompido
+                continue
+            if record.get("status") == "ok":
+                done.add(str(record.get("id")))
+    return done
+
+
+def repair_tail(path: str):
+    """Garante que o arquivo de saída termine em "\n" antes de um append (retomada).
+
+    Um processo interrompido pode deixar a última linha pela metade; ela é
+    descartada (não seria lida por completed_ids e colaria no próximo registro).
+    Se a linha estiver completa e só faltar a quebra, a quebra é acrescentada.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+
+        position = size
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                start = position + newline + 1
+                break
+        else:
+            start = 0
+
+        f.seek(start)
+        try:
+            json.loads(f.read())
+        except ValueError:
+            f.truncate(start)
+        else:
+            f.write(b"\n")
+
+
+class BatchRunner:
+    """Executa perguntas de um JSONL pelo SystemAgent com pool de workers e orçamento de chamadas à API."""
+
+    def __init__(self, system_agent, max_workers: int = 4, api_budget: int = None):
+        self.system_agent = system_agent
+        self.max_workers = max_workers
+        self.api_budget = api_budget
+        self.shared_football = SharedFootballAgent(system_agent.football_agent)
+        system_agent.football_agent = self.shared_football
+        self._write_lock = threading.Lock()
+
+    def _api_calls(self) -> int:
+        return get_http_client().stats["requests"]
+
+    def _budget_exhausted(self, start_calls: int) -> bool:
+        return self.api_budget is not None and self._api_calls() - start_calls >= self.api_budget
+
+    def _answer(self, item: dict) -> dict:
+        """Responde uma pergunta registrando o tempo de cada etapa (segundos desde o início)."""
+        start = time.perf_counter()
+        timings = {}
+        result, context_report = None, None
+
+        for event in self.system_agent.stream(item["question"]):
+            elapsed = round(time.perf_counter() - start, 3)
+            kind = event["event"]
+            if kind == "params":
+                timings["extracao_s"] = elapsed
+            elif kind == "data":
+                timings["coleta_s"] = elapsed
+            elif kind == "token":
+                timings.setdefault("primeiro_token_s", elapsed)
+            elif kind == "result":
+                result = event["data"]
+                context_report = event.get("context_report")
+        timings["total_s"] = round(time.perf_counter() - start, 3)
+
+        status = "error" if not isinstance(result, dict) or "error" in result else "ok"
+        record = {"id": item["id"], "question": item["question"], "status": status,
+                  "timings": timings, "result": result}
+        if context_report:
+            record["context_report"] = context_report
+        return record
+
+    def _write(self, out, record: dict):
+        with self._write_lock:
+            out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+
+    def run(self, input_path: str, output_path: str, resume: bool = True) -> dict:
+        """Processa o lote e grava cada resultado assim que fica pronto. Retorna um resumo."""
+        questions = read_questions(input_path)
+        if resume:
+            repair_tail(output_path)
+        done = completed_ids(output_path) if resume else set()
+        pending = [item for item in questions if item["id"] not in done]
+
+        start_calls = self._api_calls()
+        start_coalesced = get_http_client().stats["coalesced"]
+        start_stale = get_http_client().stats["stale_served"]
+        start = time.perf_counter()
+        summary = {"total": len(questions), "skipped_done": len(questions) - len(pending),
+                   "ok": 0, "error": 0, "not_started_budget": 0}
+
+        def work(item):
+            # O orçamento é verificado antes de cada pergunta; as que já começaram terminam
+            if self._budget_exhausted(start_calls):
+                return None
+            # Chamadas do lote cedem a vez e a reserva da cota às consultas interativas
+            with request_priority(PRIORITY_BATCH):
+                return self._answer(item)
+
+        mode = "a" if resume else "w"
+        with open(output_path, mode, encoding="utf-8") as out:
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+                futures = {executor.submit(work, item): item for item in pending}
+                for future in as_completed(futures):
+                    item = futures[future]
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        record = {"id": item["id"], "question": item["question"], "status": "error",
+                                  "timings": {}, "result": {"error": str(e)}}
+                    if record is None:
+                        # Não gravado: fica para a próxima execução com --resume
+                        summary["not_started_budget"] += 1
+                        continue
+                    summary[record["status"]] += 1
+                    self._write(out, record)
+
+        summary["api_calls"] = self._api_calls() - start_calls
+        summary["fetches_reused"] = self.shared_football.hits
+        summary["api_coalesced"] = get_http_client().stats["coalesced"] - start_coalesced
+        summary["stale_served"] = get_http_client().stats["stale_served"] - start_stale
+        summary["elapsed_s"] = round(time.perf_counter() - start, 3)
+        if get_telemetry().enabled:
+            summary["telemetry"] = get_telemetry().snapshot()
+        return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa perguntas em lote a partir de um arquivo JSONL.")
+    parser.add_argument("input", nargs="?", default="perguntas.jsonl", help="JSONL de entrada (padrão: perguntas.jsonl)")
+    parser.add_argument("-o", "--output", default="respostas.jsonl", help="JSONL de saída (padrão: respostas.jsonl)")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Perguntas processadas em paralelo")
+    parser.add_argument("--api-budget", type=int, default=None, help="Máximo de chamadas à API-Football no lote")
+    parser.add_argument("--no-resume", action="store_true", help="Reprocessa tudo e sobrescreve a saída")
+    parser.add_argument("--telemetry", action="store_true",
+                        help="Inclui spans/métricas no resumo (também via TELEMETRY_ENABLED=1)")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    if args.telemetry:
+        get_telemetry().enable()
+
+    from agenteSystem.agente_system_plan import SystemAgent
+
+    runner = BatchRunner(SystemAgent(), max_workers=args.workers, api_budget=args.api_budget)
+    summary = runner.run(args.input, args.output, resume=not args.no_resume)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    return 0 if summary["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+import re
+
+from tools.football.team_index import BUILTIN_ALIASES, get_team_index, normalize, strip_stopwords
+
+# Times mais perguntados; complementados pelo índice local de times (load_teams)
+KNOWN_TEAMS = [
+    "Flamengo", "Palmeiras", "Corinthians", "São Paulo", "Santos", "Fluminense", "Botafogo",
+    "Vasco", "Grêmio", "Internacional", "Atlético-MG", "Athletico-PR", "Cruzeiro", "Bahia",
+    "Fortaleza", "Bragantino", "Cuiabá", "Goiás", "Coritiba", "América-MG", "Ceará", "Sport",
+    "Juventude", "Vitória", "Atlético-GO", "Avaí", "Chapecoense",
+    "River Plate", "Boca Juniors", "Racing", "Independiente", "Estudiantes", "Vélez Sarsfield",
+    "Peñarol", "Nacional", "Olimpia", "Cerro Porteño", "Colo-Colo", "LDU Quito", "Atlético Nacional",
+    "Real Madrid", "Barcelona", "Atlético de Madrid", "Manchester City", "Manchester United",
+    "Liverpool", "Arsenal", "Chelsea", "Bayern de Munique", "PSG", "Juventus", "Milan",
+]
+
+# Apelidos que também são palavras comuns e não devem, sozinhos, virar time
+AMBIGUOUS_ALIASES = {"real", "inter", "galo", "peixe", "porco", "colorado", "raposa"}
+
+LEAGUE_KEYWORDS = [
+    ("copa do brasil", 73),
+    ("libertadores", 13),
+    ("sul americana", 11),
+    ("sudamericana", 11),
+    ("brasileirao", 71),
+    ("campeonato brasileiro", 71),
+    ("serie a do brasil", 71),
+    ("premier league", 39),
+    ("la liga", 140),
+    ("champions", 2),
+]
+
+# (analysis_type, question_type, palavras-chave) em ordem de prioridade
+INTENTS = [
+    ("betting", "betting_tips", ["aposta", "apostas", "apostar", "odd", "odds", "mercado", "mercados",
+                                 "over", "under", "ambas marcam", "btts", "handicap", "escanteios", "cartoes"]),
+    ("prediction", "match_prediction", ["ganha", "vence", "vai ganhar", "previsao", "palpite",
+                                        "favorito", "quem ganha", "placar", "vencedor"]),
+    ("head_to_head", "general", ["historico", "confronto", "confrontos", "retrospecto", "h2h"]),
+    ("recent_performance", "goals_scored", ["gols", "gol", "marcou", "marcados"]),
+    ("recent_performance", "team_form", ["forma", "como esta", "desempenho", "fase", "momento", "aproveitamento"]),
+]
+
+# Perguntas sobre a liga inteira (sem time): ranking de mercado, de forma ou classificação
+OVER_PATTERN = re.compile(r"\b(?:over|mais de|acima de)\s+([123])\b")
+LEAGUE_MARKET_KEYWORDS = [
+    ("btts", ["ambas marcam", "btts"]),
+    ("clean_sheets", ["sem sofrer", "clean sheet", "clean sheets", "nao sofre", "nao sofrem"]),
+    ("sem_marcar", ["sem marcar", "nao marca", "nao marcam"]),
+]
+# Checados depois dos mercados: "nao sofrem"/"nao marcam" são clean_sheets/sem_marcar
+LEAGUE_GOAL_KEYWORDS = [
+    ("gols_sofridos", ["sofrem", "sofre", "sofreram", "gols sofridos", "defesa", "defesas"]),
+    ("gols_marcados", ["marcam", "marca", "marcaram", "fazem", "fizeram", "gols marcados", "ataque", "ataques"]),
+]
+LEAST_PATTERN = re.compile(r"\b(?:menos|menor|menores|pior|piores)\b")
+LEAGUE_FORM_KEYWORDS = ["forma", "momento", "fase", "sequencia", "ultimos", "ultimas"]
+
+LAST_N_PATTERN = re.compile(r"\b(?:ultimos|ultimas)\s+(\d{1,2})\s+(?:jogos|partidas|rodadas)\b")
+LAST_GAMES_PATTERN = re.compile(r"\b(?:ultimos jogos|ultimas partidas|ultima rodada|ultimo jogo)\b")
+TODAY_PATTERN = re.compile(r"\b(?:hoje|atual|atualmente|agora)\b")
+VERSUS_PATTERN = re.compile(r"\s(?:vs\.?|versus|x|contra)\s", re.IGNORECASE)
+SEASON_PATTERN = re.compile(r"\b(20[0-9]{2})\b")
+CAPITALIZED_PATTERN = re.compile(r"(?<![.!?]\s)(?<!^)\b[A-ZÀ-Ý][\wÀ-ÿ-]{2,}")
+
+# Palavras que costumam aparecer com maiúscula sem serem times
+NON_TEAM_WORDS = {
+    "brasileirao", "libertadores", "copa", "brasil", "campeonato", "serie", "liga", "premier",
+    "champions", "league", "sul", "americana", "over", "under", "btts", "quais", "qual", "como",
+    "quantos", "quem", "mostre", "hoje", "europa",
+}
+
+DEFAULT_SEASON = 2022
+MIN_CONFIDENCE = 0.7
+
+
+class QueryExtractor:
+    """Extrai times, liga e intenção da pergunta sem chamar o LLM.
+
+    Devolve os mesmos campos do prompt de extração de SystemAgent e uma
+    confiança entre 0 e 1; abaixo de `min_confidence`, o chamador deve usar o LLM.
+    """
+
+    def __init__(self, min_confidence: float = MIN_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self._vocabulary = {}
+        self._max_tokens = 1
+        self._indexed_teams = -1
+
+    def _build_vocabulary(self):
+        index = get_team_index()
+        if len(index.teams) == self._indexed_teams:
+            return
+
+        vocabulary = {}
+
+        def add(phrase: str, display: str):
+            for key in {normalize(phrase), strip_stopwords(normalize(phrase))}:
+                if key and key not in AMBIGUOUS_ALIASES:
+                    vocabulary.setdefault(key, display)
+
+        for team in KNOWN_TEAMS:
+            add(team, team)
+        for info in index.teams.values():
+            add(info["name"], info["name"])
+        for alias, canonical in BUILTIN_ALIASES.items():
+            add(alias, canonical)
+
+        self._vocabulary = vocabulary
+        self._max_tokens = max(len(key.split()) for key in vocabulary)
+        self._indexed_teams = len(index.teams)
+
+    def find_teams(self, text: str) -> list:
+        """Times citados na pergunta, na ordem em que aparecem (maior correspondência primeiro)."""
+        self._build_vocabulary()
+        tokens = normalize(text).split()
+        teams = []
+        position = 0
+
+        while position < len(tokens):
+            for size in range(min(self._max_tokens, len(tokens) - position), 0, -1):
+                phrase = " ".join(tokens[position:position + size])
+                team = self._vocabulary.get(phrase)
+                if team:
+                    if team not in teams:
+                        teams.append(team)
+                    position += size
+                    break
+            else:
+                position += 1
+
+        return teams
+
+    def _unknown_names(self, question: str, teams: list) -> list:
+        """Palavras com maiúscula que não foram reconhecidas: indício de time fora do dicionário."""
+        known = " ".join(normalize(team) for team in teams)
+        unknown = []
+        for word in CAPITALIZED_PATTERN.findall(question):
+            normalized = normalize(word)
+            if normalized in NON_TEAM_WORDS or normalized in known or normalized in self._vocabulary:
+                continue
+            unknown.append(word)
+        return unknown
+
+    def _league_query(self, text: str) -> dict:
+        """Ação de liga para perguntas sem time: mercado citado, forma ou (padrão) classificação."""
+        padded = f" {text} "
+        over = OVER_PATTERN.search(text)
+        market = f"over_{over.group(1)}_5" if over else next(
+            (market for market, keywords in LEAGUE_MARKET_KEYWORDS + LEAGUE_GOAL_KEYWORDS
+             if any(f" {k} " in padded for k in keywords)), None
+        )
+        if market:
+            query = {"analysis_type": "league", "question_type": "league_markets", "market": market}
+            if LEAST_PATTERN.search(text):
+                query["ascending"] = True
+            return query
+        if any(f" {keyword} " in padded for keyword in LEAGUE_FORM_KEYWORDS):
+            return {"analysis_type": "league", "question_type": "league_form"}
+        return {"analysis_type": "league", "question_type": "league_table"}
+
+    def extract(self, question: str, hoje: str, trinta_dias_atras: str):
+        """Retorna (params, confiança)."""
+        text = normalize(question)
+        teams = self.find_teams(question)
+
+        league_id = next((league for keyword, league in LEAGUE_KEYWORDS if keyword in text), None)
+
+        analysis_type, question_type = "recent_performance", "general"
+        intent_found = False
+        padded = f" {text} "
+        for intent, qtype, keywords in INTENTS:
+            if any(f" {keyword} " in padded for keyword in keywords):
+                analysis_type, question_type = intent, qtype
+                intent_found = True
+                break
+
+        season = SEASON_PATTERN.search(text)
+        params = {
+            "teams": teams,
+            "league_id": league_id,
+            "season": int(season.group(1)) if season else DEFAULT_SEASON,
+            "date_from": None,
+            "date_to": None,
+            "analysis_type": analysis_type,
+            "question_type": question_type
+        }
+
+        last_n = LAST_N_PATTERN.search(text)
+        if last_n:
+            params["last_n_games"] = int(last_n.group(1))
+        if last_n or LAST_GAMES_PATTERN.search(text):
+            params["date_from"] = trinta_dias_atras
+        if TODAY_PATTERN.search(text):
+            params["date_to"] = hoje
+
+        # Sem time, mas com liga: a pergunta é sobre a liga inteira
+        league_question = not teams and league_id is not None
+        if league_question:
+            params.update(self._league_query(text))
+
+        # Confiança: times (ou a liga) reconhecidos são o essencial; intenção e "X vs Y" reforçam
+        confidence = 0.0
+        if teams or league_question:
+            confidence += 0.6
+        if intent_found:
+            confidence += 0.2
+        versus = VERSUS_PATTERN.search(f" {question} ")
+        if versus and len(teams) == 2:
+            confidence += 0.2
+        elif versus and len(teams) < 2:
+            confidence -= 0.4
+        if not versus and len(teams) <= 1:
+            confidence += 0.1
+        if self._unknown_names(question, teams):
+            confidence -= 0.4
+
+        return params, round(max(0.0, min(1.0, confidence)), 2)
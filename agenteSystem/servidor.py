@@ -0,0 +1,288 @@
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tools.football.football_cache import get_cache
+from tools.football.football_http import get_http_client
+from tools.telemetry.telemetry import configure_logging, get_telemetry
+
+MAX_BODY_BYTES = 64 * 1024
+
+
+class ServiceMetrics:
+    """Contadores e latências (janela das últimas requisições) do serviço."""
+
+    def __init__(self, window: int = 1000):
+        self.counters = {"requests": 0, "ok": 0, "errors": 0, "rejected": 0}
+        self.in_flight = 0
+        self.latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def incr(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, seconds: float, ok: bool):
+        with self._lock:
+            self.in_flight -= 1
+            self.counters["ok" if ok else "errors"] += 1
+            self.latencies.append(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            latencies = sorted(self.latencies)
+            data = dict(self.counters)
+            data["in_flight"] = self.in_flight
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+
+        data["latency_s"] = {
+            "avg": round(sum(latencies) / len(latencies), 3) if latencies else None,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "max": round(latencies[-1], 3) if latencies else None,
+        }
+        return data
+
+
+class FootballService:
+    """Pool de SystemAgents construídos uma vez; cada requisição usa um agente exclusivo.
+
+    O tamanho do pool é o limite de concorrência: sem agente livre dentro de
+    `queue_timeout` segundos, a requisição é recusada (503).
+    """
+
+    def __init__(self, pool_size: int = 4, queue_timeout: float = 2.0, agent_factory=None):
+        if agent_factory is None:
+            from agenteSystem.agente_system_plan import SystemAgent
+            agent_factory = lambda: SystemAgent().warm()
+
+        self.pool_size = pool_size
+        self.queue_timeout = queue_timeout
+        self.agents = queue.Queue()
+        for _ in range(pool_size):
+            self.agents.put(agent_factory())
+        self.metrics = ServiceMetrics()
+        self.started_at = time.time()
+
+    def acquire(self):
+        """Agente livre ou None se o limite de concorrência foi atingido."""
+        try:
+            return self.agents.get(timeout=self.queue_timeout)
+        except queue.Empty:
+            self.metrics.incr("rejected")
+            return None
+
+    def release(self, agent):
+        self.agents.put(agent)
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "agentes_livres": self.agents.qsize(),
+            "max_concorrencia": self.pool_size
+        }
+
+    def metrics_snapshot(self) -> dict:
+        from agents.llm.llm_cache import get_llm_cache
+
+        metrics = {
+            "service": self.metrics.snapshot(),
+            "football_http": get_http_client().metrics(),
+            "football_cache": get_cache().stats(),
+            "llm_cache": get_llm_cache().stats()
+        }
+        if get_telemetry().enabled:
+            metrics["telemetry"] = get_telemetry().snapshot()
+        return metrics
+
+    def prometheus_text(self) -> str:
+        """Telemetria do processo mais os contadores do serviço no formato do Prometheus."""
+        service = self.metrics.snapshot()
+        lines = ["# TYPE agente_football_service_requests_total counter"]
+        for name in ("requests", "ok", "errors", "rejected"):
+            lines.append(f'agente_football_service_requests_total{{result="{name}"}} {service[name]}')
+        lines += ["# TYPE agente_football_service_in_flight gauge",
+                  f"agente_football_service_in_flight {service['in_flight']}",
+                  "# TYPE agente_football_service_free_agents gauge",
+                  f"agente_football_service_free_agents {self.agents.qsize()}"]
+        return "\n".join(lines) + "\n" + get_telemetry().prometheus_text()
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """GET /health, GET /metrics (?format=prometheus) e POST /perguntar {"pergunta": "..."} (?stream=1 para NDJSON)."""
+
+    server_version = "AgenteFootball/1.0"
+
+    @property
+    def service(self) -> FootballService:
+        return self.server.service
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_text(self, status: int, text: str, content_type: str):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload, headers: dict = None):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        if path == "/health":
+            self._send_json(200, self.service.health())
+        elif path == "/metrics" and "format=prometheus" in query.split("&"):
+            self._send_text(200, self.service.prometheus_text(), "text/plain; version=0.0.4; charset=utf-8")
+        elif path == "/metrics":
+            self._send_json(200, self.service.metrics_snapshot())
+        else:
+            self._send_json(404, {"error": "Rota não encontrada."})
+
+    def _read_question(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_BODY_BYTES:
+            return None
+        try:
+            payload = json.loads(self.rfile.read(length))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return None
+        if not isinstance(payload, dict):
+            return None
+        question = payload.get("pergunta") or payload.get("question")
+        return question if isinstance(question, str) and question.strip() else None
+
+    def do_POST(self):
+        path, _, query = self.path.partition("?")
+        if path != "/perguntar":
+            self._send_json(404, {"error": "Rota não encontrada."})
+            return
+
+        self.service.metrics.incr("requests")
+        question = self._read_question()
+        if question is None:
+            self.service.metrics.incr("errors")
+            self._send_json(400, {"error": "Envie um JSON com o campo 'pergunta'."})
+            return
+
+        agent = self.service.acquire()
+        if agent is None:
+            self._send_json(503, {"error": "Servidor ocupado, tente novamente."},
+                            headers={"Retry-After": str(max(1, round(self.service.queue_timeout)))})
+            return
+
+        start = time.perf_counter()
+        self.service.metrics.started()
+        ok = False
+        try:
+            if "stream=1" in query.split("&"):
+                ok = self._stream(agent, question)
+            else:
+                result = agent.run(question)
+                ok = isinstance(result, dict) and "error" not in result
+                self._send_json(200, result)
+        except Exception as e:
+            self._send_json(500, {"error": str(e)})
+        finally:
+            self.service.metrics.finished(time.perf_counter() - start, ok)
+            self.service.release(agent)
+
+    def _write_event(self, event: dict):
+        self.wfile.write((json.dumps(event, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def _stream(self, agent, question: str) -> bool:
+        """Envia cada evento de SystemAgent.stream como uma linha JSON assim que fica pronto.
+
+        Depois dos cabeçalhos não dá mais para responder 500: uma falha vira a
+        última linha, {"event": "error", "error": ...}, e a conexão é fechada.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        ok = False
+        try:
+            for event in agent.stream(question):
+                if event["event"] == "result":
+                    ok = isinstance(event["data"], dict) and "error" not in event["data"]
+                self._write_event(event)
+        except Exception as e:
+            try:
+                self._write_event({"event": "error", "error": str(e)})
+            except OSError:
+                # Cliente já desconectou
+                pass
+            return False
+        return ok
+
+
+class FootballHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service: FootballService, verbose: bool = False):
+        super().__init__(address, ServiceHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor HTTP do sistema de análise de futebol.")
+    parser.add_argument("--host", default=os.getenv("SERVIDOR_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVIDOR_PORT", "8000")))
+    parser.add_argument("--max-concorrencia", type=int, default=int(os.getenv("SERVIDOR_MAX_CONCORRENCIA", "4")),
+                        help="Perguntas processadas ao mesmo tempo (agentes no pool)")
+    parser.add_argument("--fila-timeout", type=float, default=2.0,
+                        help="Segundos esperando um agente livre antes de responder 503")
+    parser.add_argument("--verbose", action="store_true", help="Loga cada requisição")
+    parser.add_argument("--telemetry", action="store_true",
+                        help="Liga spans e métricas (também via TELEMETRY_ENABLED=1)")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    if args.telemetry:
+        get_telemetry().enable()
+
+    print(f"⏳ Construindo {args.max_concorrencia} agentes...")
+    service = FootballService(args.max_concorrencia, args.fila_timeout)
+    server = FootballHTTPServer((args.host, args.port), service, args.verbose)
+    print(f"⚽ Servindo em http://{args.host}:{args.port} (POST /perguntar, GET /health, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Encerrando o servidor...")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
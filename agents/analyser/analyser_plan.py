@@ -1,15 +1,15 @@
-import json
-import re
-from langchain_openai import ChatOpenAI
+from agents.llm.llm_cache import CachedLLM, LazyChatOpenAI
+from agents.analyser.analysis_schema import RelatorioAnalise
 
 class AnalyserPlanAgent:
     def __init__(self):
-        self.llm = ChatOpenAI(
+        self.llm = CachedLLM(LazyChatOpenAI(
             model='gpt-4o-mini',
             temperature=0.3 
-        )
+        ))
+        self.structured_llm = self.llm.with_structured_output(RelatorioAnalise)
 
-        self.system_prompt = '''
+        self.profile_prompt = '''
         Backstory:
             Você é o FootballAnalyser Pro, uma IA especializada em análise de futebol e apostas esportivas.
             Você combina análise estatística profunda com conhecimento tático para gerar insights valiosos.
@@ -17,7 +17,7 @@ class AnalyserPlanAgent:
         Expected Behavior:
             - Analise desempenho recente dos times (sequências, gols marcados/sofridos, aproveitamento)
             - Identifique padrões: times que marcam muito, defesas sólidas, jogos com muitos gols
-            - Calcule médias: gols por jogo, escanteios, cartões
+            - Interprete as médias e probabilidades já calculadas nos dados
             - Para previsões de jogos, considere: forma recente, histórico de confrontos, local da partida
             - Para apostas, sugira mercados baseados em estatísticas concretas
             - Seja honesto sobre a incerteza - futebol é imprevisível
@@ -31,53 +31,9 @@ class AnalyserPlanAgent:
             - Cartões Over/Under
             - Primeiro a Marcar
             - Gols no 1º/2º Tempo
+'''
 
-        Output Format (JSON):
-            {
-                "resumo_desempenho": {
-                    "time1": {
-                        "ultimos_jogos": "resumo dos últimos 5-10 jogos",
-                        "gols_marcados": 0,
-                        "gols_sofridos": 0,
-                        "media_gols_por_jogo": 0.0,
-                        "vitorias": 0,
-                        "empates": 0,
-                        "derrotas": 0,
-                        "sequencia_atual": "descrição"
-                    },
-                    "time2": {...}
-                },
-                "confrontos_diretos": {
-                    "total_jogos": 0,
-                    "vitorias_time1": 0,
-                    "vitorias_time2": 0,
-                    "empates": 0,
-                    "ultimo_resultado": "..."
-                },
-                "previsao_partida": {
-                    "favorito": "time1 ou time2 ou empate",
-                    "confianca": "alta/média/baixa",
-                    "placar_provavel": "X-X",
-                    "justificativa": "..."
-                },
-                "sugestoes_apostas": [
-                    {
-                        "mercado": "Over 2.5 Gols",
-                        "sugestao": "SIM/NÃO",
-                        "confianca": "alta/média/baixa",
-                        "justificativa": "estatísticas que fundamentam"
-                    }
-                ],
-                "padroes_identificados": [
-                    "Time1 marcou em 8 dos últimos 10 jogos",
-                    "Jogos entre esses times costumam ter muitos gols"
-                ],
-                "alertas": [
-                    "Time1 está com desfalques importantes",
-                    "Time2 joga em casa com ótimo retrospecto"
-                ]
-            }
-
+        self.style_prompt = '''
         Style Guide:
             - Seja objetivo mas completo
             - Baseie TUDO em dados fornecidos
@@ -86,40 +42,29 @@ class AnalyserPlanAgent:
             - Nunca garanta vitória - apresente probabilidades baseadas em dados
         '''
 
-    def run(self, data):
-        """Executa a análise dos dados e retorna relatório completo."""
-        try:
-            if isinstance(data, (dict, list)):
-                data_str = json.dumps(data, ensure_ascii=False)
-            else:
-                data_str = data
-
-            prompt = f"""{self.system_prompt}
+    def _analysis_prompt(self, question: str, context: str) -> str:
+        return f"""{self.profile_prompt}{self.style_prompt}
 
-                Analise os seguintes dados e gere um relatório completo seguindo o formato JSON especificado:
+                Pergunta do usuário: "{question}"
 
                 DADOS:
-                {data_str}
+                {context}
 
                 IMPORTANTE:
-                - Calcule todas as estatísticas com base nos dados fornecidos
-                - Identifique padrões claros (ex: "time marca em 90% dos jogos")
-                - Para apostas, justifique cada sugestão com números concretos
+                - Em "resposta", responda a pergunta de forma clara e direta, com as estatísticas relevantes
+                - Em "analise", explique as estatísticas e probabilidades fornecidas (não recalcule)
+                - Se for sobre apostas, sugira mercados com base nos dados; se for sobre previsão, fundamente a análise
                 - Se algum dado estiver faltando, indique como "não disponível"
-                - Retorne APENAS JSON válido
                 """
 
-            response = self.llm.invoke(prompt)
-            
-            result_text = response.content if hasattr(response, 'content') else str(response)
-            
-            try:
-                return json.loads(result_text)
-            except json.JSONDecodeError:
-                json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-                if json_match:
-                    return json.loads(json_match.group())
-                return {"resposta": result_text}
+    def analyse(self, question: str, context: str) -> RelatorioAnalise:
+        """Gera análise e resposta final ao usuário em uma única chamada com saída estruturada.
+
+        O formato é imposto pelo schema (RelatorioAnalise), sem recuperação por regex;
+        erros de validação ou da API são propagados ao chamador.
+        """
+        return self.structured_llm.invoke(self._analysis_prompt(question, context))
 
-        except Exception as e:
-            return {"error": f"Erro na análise: {str(e)}"}
\ No newline at end of file
+    def analyse_stream(self, question: str, context: str):
+        """Versão em streaming de analyse: dicts parciais e, por último, o RelatorioAnalise."""
+        return self.structured_llm.stream(self._analysis_prompt(question, context))
@@ -0,0 +1,79 @@
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
+
+# Os modelos seguem as restrições do modo estrito de structured outputs da OpenAI:
+# todos os campos obrigatórios (opcionais como Optional) e nenhum dict livre.
+
+Confianca = Literal["alta", "média", "baixa"]
+
+
+class DesempenhoTime(BaseModel):
+    time: str
+    ultimos_jogos: str = Field(description="Resumo dos últimos 5-10 jogos")
+    gols_marcados: int
+    gols_sofridos: int
+    media_gols_por_jogo: float
+    vitorias: int
+    empates: int
+    derrotas: int
+    sequencia_atual: str
+
+
+class ConfrontosDiretos(BaseModel):
+    total_jogos: int
+    vitorias_time1: int
+    vitorias_time2: int
+    empates: int
+    ultimo_resultado: str
+
+
+class PrevisaoPartida(BaseModel):
+    favorito: str = Field(description="Nome do time favorito ou 'empate'")
+    confianca: Confianca
+    placar_provavel: str = Field(description="Formato X-X")
+    justificativa: str
+
+
+class SugestaoAposta(BaseModel):
+    mercado: str = Field(description="Ex: Over 2.5 Gols, Ambas Marcam, Resultado Final")
+    sugestao: str
+    confianca: Confianca
+    justificativa: str = Field(description="Estatísticas que fundamentam a sugestão")
+
+
+class Estatistica(BaseModel):
+    nome: str
+    valor: str
+
+
+class Analise(BaseModel):
+    resumo_desempenho: List[DesempenhoTime]
+    confrontos_diretos: Optional[ConfrontosDiretos] = Field(description="null se não houver dois times")
+    previsao_partida: Optional[PrevisaoPartida] = Field(description="null se a pergunta não pedir previsão")
+    padroes_identificados: List[str]
+    alertas: List[str]
+
+
+class RespostaFinal(BaseModel):
+    resposta_direta: str = Field(description="Resposta clara e direta à pergunta do usuário")
+    estatisticas: List[Estatistica] = Field(description="Estatísticas relevantes para a resposta")
+    sugestoes_apostas: List[SugestaoAposta] = Field(description="Vazio se a pergunta não for sobre apostas")
+    confianca_analise: Confianca
+    observacoes: str
+
+
+class RelatorioAnalise(BaseModel):
+    """Análise completa e resposta ao usuário, geradas em uma única chamada.
+
+    A resposta vem antes da análise para que o streaming entregue o texto ao
+    usuário logo no início da geração (o modelo segue a ordem do schema).
+    """
+    resposta: RespostaFinal
+    analise: Analise
+
+    def to_output(self) -> dict:
+        """Formato de saída de SystemAgent.run (estatísticas como dict nome -> valor)."""
+        resposta = self.resposta.model_dump()
+        resposta["estatisticas"] = {e.nome: e.valor for e in self.resposta.estatisticas}
+        resposta["analise"] = self.analise.model_dump()
+        return resposta
@@ -0,0 +1,247 @@
+import json
+
+DEFAULT_TOKEN_BUDGET = 1500
+
+LEGEND = (
+    "Legenda: j=jogos v/e/d=vitórias/empates/derrotas gm/gs=gols marcados/sofridos "
+    "mgm/mgs=médias de gols seq=resultados do mais recente ao mais antigo "
+    "cs=jogos sem sofrer gol btts=ambas marcam oX.5=over X.5 gols local C=casa F=fora "
+    "j_est=jogos com estatísticas (médias por jogo) esc=escanteios cart=cartões sof/adv=do adversário tot=soma dos dois times "
+    "elo=rating Elo atq/def=força de ataque/defesa (1=média; def<1 sofre menos) f5/f10=forma e pontos nos últimos 5/10"
+)
+# Linhas de handicap que não repetem o 1X2 (-0.5, 0 e +0.5 saem direto dele)
+HANDICAP_CONTEXT_LINES = ("-1.5", "-1", "+1", "+1.5")
+
+_encoding = None
+_encoding_loaded = False
+
+
+def count_tokens(text: str) -> int:
+    """Conta tokens com o tokenizer do gpt-4o-mini; sem ele (ex: offline), estima ~4 caracteres por token."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = None
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return max(1, len(text) // 4)
+
+
+def compact_json(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _table(header: list, rows: list) -> list:
+    return ["|".join(header)] + ["|".join("" if v is None else str(v) for v in row) for row in rows]
+
+
+def _stale_note(data: dict) -> str:
+    """Aviso no título quando os dados vieram do cache vencido (cota da API esgotada)."""
+    if not data.get("stale"):
+        return ""
+    return f" [desatualizado: cache vencido há {round(data.get('stale_seconds', 0) / 3600, 1)}h]"
+
+
+def _team_blocks(name: str, data: dict):
+    """Resumo (prioritário) e linhas de jogos (descartáveis) de get_team_recent_matches."""
+    stats = data.get("statistics", {})
+    summary = [f"## {name} (últimos {stats.get('total_jogos', 0)} jogos){_stale_note(data)}"]
+    summary += _table(
+        ["j", "v", "e", "d", "gm", "gs", "mgm", "mgs", "aprov%", "seq", "cs%", "btts%", "o1.5%", "o2.5%", "o3.5%"],
+        [[stats.get("total_jogos"), stats.get("vitorias"), stats.get("empates"), stats.get("derrotas"),
+          stats.get("gols_marcados"), stats.get("gols_sofridos"), stats.get("media_gols_marcados"),
+          stats.get("media_gols_sofridos"), stats.get("aproveitamento"), stats.get("sequencia"),
+          stats.get("clean_sheets_pct"), stats.get("btts_pct"), stats.get("over_1_5_pct"),
+          stats.get("over_2_5_pct"), stats.get("over_3_5_pct")]]
+    )
+    splits = [[side, s.get("jogos"), s.get("vitorias"), s.get("empates"), s.get("derrotas"),
+               s.get("media_gols_marcados"), s.get("media_gols_sofridos")]
+              for side, s in (("casa", stats.get("casa")), ("fora", stats.get("fora"))) if s]
+    if splits:
+        summary += _table(["local", "j", "v", "e", "d", "mgm", "mgs"], splits)
+
+    rating = data.get("rating")
+    if rating:
+        summary += _table(
+            ["elo", "atq", "def", "f5", "pts5", "f10", "pts10"],
+            [[rating.get("elo"), rating.get("forca_ataque"), rating.get("forca_defesa"),
+              rating["forma_5"]["sequencia"], rating["forma_5"]["pontos"],
+              rating["forma_10"]["sequencia"], rating["forma_10"]["pontos"]]]
+        )
+
+    detailed = data.get("estatisticas_detalhadas")
+    if detailed:
+        summary += _table(
+            ["j_est", "esc", "esc_sof", "esc_tot", "cart", "cart_adv", "chutes", "no_gol", "chutes_sof", "posse%", "xg", "xg_sof"],
+            [[detailed.get("jogos"), detailed.get("media_escanteios"), detailed.get("media_escanteios_sofridos"),
+              detailed.get("media_escanteios_total"), detailed.get("media_cartoes"), detailed.get("media_cartoes_adversario"),
+              detailed.get("media_chutes"), detailed.get("media_chutes_no_gol"), detailed.get("media_chutes_sofridos"),
+              detailed.get("media_posse"), detailed.get("media_xg"), detailed.get("media_xg_sofrido")]]
+        )
+
+    rows = [[m.get("date", "")[:10], m.get("opponent"), "C" if m.get("home_away") == "Casa" else "F",
+             m.get("score"), m.get("result")] for m in data.get("matches", [])]
+    return summary, ["data|adversario|local|placar|res"], rows
+
+
+def _head_to_head_blocks(data: dict):
+    stats = data.get("statistics", {})
+    team1, team2 = data.get("team1"), data.get("team2")
+    summary = [f"## Confronto direto {team1} x {team2}{_stale_note(data)}"]
+    summary += _table(
+        ["v_" + str(team1), "v_" + str(team2), "e", "g_" + str(team1), "g_" + str(team2), "btts%", "o2.5%"],
+        [[stats.get("vitorias_team1"), stats.get("vitorias_team2"), stats.get("empates"),
+          stats.get("gols_team1"), stats.get("gols_team2"), stats.get("btts_pct"), stats.get("over_2_5_pct")]]
+    )
+    detailed = data.get("estatisticas_detalhadas")
+    if detailed:
+        summary += _table(
+            ["j_est", "esc_tot", "esc_" + str(team1), "esc_" + str(team2), "cart_tot", "chutes_tot",
+             "xg_" + str(team1), "xg_" + str(team2)],
+            [[detailed.get("jogos"), detailed.get("media_escanteios_total"), detailed.get("media_escanteios_team1"),
+              detailed.get("media_escanteios_team2"), detailed.get("media_cartoes_total"),
+              detailed.get("media_chutes_total"), detailed.get("media_xg_team1"), detailed.get("media_xg_team2")]]
+        )
+    rows = [[m.get("date", "")[:10], m.get("home"), m.get("away"), m.get("score")] for m in data.get("matches", [])]
+    return summary, ["data|mandante|visitante|placar"], rows
+
+
+def _prediction_blocks(data: dict):
+    """Probabilidades do modelo Dixon-Coles (predict_match): só resumo, sem linhas descartáveis."""
+    model, over_under = data.get("modelo", {}), data.get("over_under", {})
+    one_x_two, goals = data.get("1x2", {}), data.get("gols_esperados", {})
+    summary = [f"## Modelo Dixon-Coles {data.get('home')} (mandante) x {data.get('away')}: "
+               f"% prontos, {model.get('jogos_ajuste')} jogos; ah=handicap do mandante ganha/devolve/perde"
+               f"{_stale_note(data)}"]
+    handicaps = data.get("handicap_asiatico_casa", {})
+    lines = [line for line in HANDICAP_CONTEXT_LINES if line in handicaps]
+    summary += _table(
+        ["xg", "1", "X", "2", "btts", "o1.5", "o2.5", "o3.5", "placar"] + [f"ah{line}" for line in lines],
+        [[f"{goals.get('casa')}-{goals.get('fora')}", one_x_two.get("casa"), one_x_two.get("empate"),
+          one_x_two.get("fora"), data.get("btts", {}).get("sim"),
+          *(over_under.get(line, {}).get("over") for line in ("1.5", "2.5", "3.5")),
+          f"{data.get('placar_provavel')} ({data.get('placar_provavel_pct')})"]
+         + ["/".join(str(handicaps[line][k]) for k in ("ganha", "devolve", "perde")) for line in lines]]
+    )
+    if data.get("aviso"):
+        summary.append(f"aviso: {data['aviso']}")
+    return summary, [], []
+
+
+def _league_blocks(data: dict):
+    """Classificação/rankings da liga: título e cabeçalho no resumo, uma linha por time (descartáveis)."""
+    kind, window = data.get("tipo"), data.get("ultimos_jogos")
+    title = {"tabela": "classificação", "forma": "ranking de forma", "mercado": f"ranking {data.get('mercado')}"}.get(kind, kind)
+    if data.get("crescente"):
+        title += " (menor primeiro)"
+    scope = f", últimos {window} jogos de cada time" if window else ""
+    summary = [f"## Liga {data.get('league_id')} {data.get('season')}: {title} "
+               f"({data.get('jogos_liga')} jogos{scope}){_stale_note(data)}"]
+    if kind == "mercado" and data.get("mercado") in ("gols_marcados", "gols_sofridos"):
+        header = "pos|time|j|gols|media"
+        rows = [[r["posicao"], r["team"], r["jogos"], r[data["mercado"]], r["media"]] for r in data.get("ranking", [])]
+    elif kind == "mercado":
+        header = "pos|time|j|casos|%"
+        rows = [[r["posicao"], r["team"], r["jogos"], r["casos"], r["pct"]] for r in data.get("ranking", [])]
+    elif kind == "forma":
+        header = "pos|time|j|pts|aprov%|seq|gm|gs"
+        rows = [[r["posicao"], r["team"], r["jogos"], r["pontos"], r["aproveitamento"], r["sequencia"],
+                 r["gols_marcados"], r["gols_sofridos"]] for r in data.get("ranking", [])]
+    else:
+        header = "pos|time|j|pts|v|e|d|gm|gs|sg"
+        rows = [[r["posicao"], r["team"], r["jogos"], r["pontos"], r["vitorias"], r["empates"], r["derrotas"],
+                 r["gols_marcados"], r["gols_sofridos"], r["saldo"]] for r in data.get("ranking", [])]
+    return summary, [header], rows
+
+
+def _generic_blocks(label: str, data):
+    """Formatos sem codificação própria (erros, saída textual do agente ReAct)."""
+    if isinstance(data, dict) and isinstance(data.get("output"), str):
+        data = data["output"]
+    text = data if isinstance(data, str) else compact_json(data)
+    return [f"## {label}", text], [], []
+
+
+def encode_context(data_collection: list, params: dict = None, budget: int = DEFAULT_TOKEN_BUDGET,
+                   with_savings: bool = False):
+    """Converte a coleta de dados em tabelas compactas dentro de um orçamento de tokens.
+
+    Resumos pré-agregados têm prioridade e entram em ordem enquanto couberem (um
+    resumo que estoura o orçamento fica só com o título); linhas de jogos entram
+    da mais recente para a mais antiga com o que sobrar. Retorna (texto, relatório).
+    A economia frente ao JSON original sai sempre no relatório, estimada em ~4
+    caracteres por token; with_savings a conta com o tokenizer (mais caro).
+    """
+    blocks = [([LEGEND], [], [])]
+    if params:
+        context = {k: v for k, v in params.items() if v not in (None, [], "")}
+        blocks.append((["## contexto", compact_json(context)], [], []))
+
+    for entry in data_collection:
+        data = entry.get("data", {})
+        if isinstance(data, dict) and "error" in data:
+            blocks.append(([f"## {entry.get('team', entry.get('type', 'dados'))}: erro - {data['error']}"], [], []))
+        elif entry.get("type") == "head_to_head" and isinstance(data, dict) and "statistics" in data:
+            blocks.append(_head_to_head_blocks(data))
+        elif entry.get("type") == "liga" and isinstance(data, dict) and "ranking" in data:
+            blocks.append(_league_blocks(data))
+        elif entry.get("type") == "previsao_modelo" and isinstance(data, dict) and "1x2" in data:
+            blocks.append(_prediction_blocks(data))
+        elif "team" in entry and isinstance(data, dict) and "statistics" in data:
+            blocks.append(_team_blocks(entry["team"], data))
+        else:
+            blocks.append(_generic_blocks(entry.get("team", entry.get("type", "dados")), data))
+
+    total_rows = sum(len(rows) for _, _, rows in blocks)
+
+    # Resumos também contam no orçamento (+1 por quebra de linha); a legenda (1º bloco) entra sempre
+    used, summaries_dropped = 0, 0
+    for i, (summary, header, rows) in enumerate(blocks):
+        cost = count_tokens("\n".join(summary)) + len(summary)
+        if i and used + cost > budget:
+            summary = [f"{summary[0]} [omitido: excede o orçamento de tokens]"]
+            blocks[i] = (summary, header, [])
+            cost = count_tokens(summary[0]) + 1
+            summaries_dropped += 1
+        used += cost
+
+    # Linhas de jogos: rodada a rodada (1ª linha de cada bloco, depois a 2ª...) até o orçamento acabar
+    included = [0] * len(blocks)
+    headers_cost = {i: count_tokens(header[0]) + 1 for i, (_, header, rows) in enumerate(blocks) if rows}
+    depth, full = 0, False
+    while not full and any(depth < len(rows) for _, _, rows in blocks):
+        for i, (_, _, rows) in enumerate(blocks):
+            if depth >= len(rows):
+                continue
+            cost = count_tokens("|".join(str(v) for v in rows[depth])) + 1 + (headers_cost[i] if depth == 0 else 0)
+            if used + cost > budget:
+                full = True
+                break
+            used += cost
+            included[i] += 1
+        depth += 1
+
+    lines = []
+    for (summary, header, rows), count in zip(blocks, included):
+        lines += summary
+        if count:
+            lines += _table(header[0].split("|"), rows[:count])
+
+    text = "\n".join(lines)
+    compact = count_tokens(text)
+    report = {
+        "tokens_compact": compact,
+        "budget": budget,
+        "rows_included": sum(included),
+        "rows_dropped": total_rows - sum(included),
+        "summaries_dropped": summaries_dropped
+    }
+    original_json = json.dumps(data_collection, indent=2, default=str)
+    original = count_tokens(original_json) if with_savings else max(1, len(original_json) // 4)
+    report.update(tokens_original=original, tokens_saved=max(0, original - compact), savings_estimated=not with_savings)
+    return text, report
+
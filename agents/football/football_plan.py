@@ -1,9 +1,10 @@
 import os
+import json
+import threading
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain.agents import initialize_agent, AgentType
 
-from tools.football.football_game_tool import FootballAPI
+from tools.football.football_game_tool import FootballAPI, ACTION_REQUIRED_PARAMS
+from tools.telemetry.telemetry import get_telemetry
 
 load_dotenv()
 
@@ -30,24 +31,70 @@ Expected result:
 '''
 
 class FootballPlanAgent:
-    def __init__(self):
-        self.llm = ChatOpenAI(
-            model='gpt-4o-mini',
-            temperature=0.1
-        )
+    """Consultas estruturadas vão direto à FootballAPI; o agente ReAct (e o import de
+    langchain/langchain_openai) só é construído na primeira consulta em texto livre."""
+
+    def __init__(self, verbose: bool = None):
+        # Log passo a passo do agente ReAct (FOOTBALL_AGENT_VERBOSE=1)
+        self.verbose = os.getenv("FOOTBALL_AGENT_VERBOSE", "0") == "1" if verbose is None else verbose
+        self.football_api = FootballAPI()
 
         self.tools_football = [
-            FootballAPI()
+            self.football_api
         ]
 
-        self.agent_football = initialize_agent(
-            tools=self.tools_football,
-            llm=self.llm,
-            agent_type=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
-            verbose=True,
-            agent_kwargs={'system_message': SYSTEM_PROMPT}
-        )
+        self._agent_football = None
+        self._agent_lock = threading.Lock()
+
+    @property
+    def agent_football(self):
+        with self._agent_lock:
+            if self._agent_football is None:
+                from langchain_openai import ChatOpenAI
+                from langchain.agents import initialize_agent, AgentType
+
+                self.llm = ChatOpenAI(
+                    model='gpt-4o-mini',
+                    temperature=0.1
+                )
+
+                self._agent_football = initialize_agent(
+                    tools=self.tools_football,
+                    llm=self.llm,
+                    agent_type=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+                    verbose=self.verbose,
+                    agent_kwargs={'system_message': SYSTEM_PROMPT}
+                )
+            return self._agent_football
+
+    @staticmethod
+    def parse_action(query):
+        """Retorna o payload se a consulta já for uma ação completa da FootballAPI, senão None."""
+        if isinstance(query, dict):
+            payload = query
+        else:
+            try:
+                payload = json.loads(query)
+            except (TypeError, ValueError):
+                return None
+
+        if not isinstance(payload, dict):
+            return None
+
+        required = ACTION_REQUIRED_PARAMS.get(payload.get("action"))
+        if required is None:
+            return None
+        for fields in required:
+            options = fields if isinstance(fields, tuple) else (fields,)
+            if all(payload.get(field) in (None, "") for field in options):
+                return None
+        return payload
 
     def run(self, query: str):
-        """Executa uma consulta através do agente."""
-        return self.agent_football.invoke(query)
+        """Executa uma consulta: ações estruturadas vão direto à ferramenta; texto livre passa pelo agente."""
+        payload = self.parse_action(query)
+        if payload is not None:
+            with get_telemetry().span("football.acao", action=payload["action"]):
+                return self.football_api._run(json.dumps(payload))
+        with get_telemetry().span("football.agente_react"):
+            return self.agent_football.invoke(query)
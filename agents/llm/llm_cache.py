@@ -0,0 +1,210 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+
+from tools.football.football_cache import DiskCache
+from tools.telemetry.telemetry import get_telemetry
+
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 60 * 60)))
+
+
+class LazyChatOpenAI:
+    """ChatOpenAI construído (e langchain_openai importado) só no primeiro uso real.
+
+    Modelo e temperatura ficam disponíveis antes disso, o que basta para
+    montar a chave do cache: respostas em cache não pagam o import.
+    """
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.model_name = kwargs.get("model")
+        self.temperature = kwargs.get("temperature")
+        self._llm = None
+        self._llm_lock = threading.Lock()
+
+    @property
+    def llm(self):
+        with self._llm_lock:
+            if self._llm is None:
+                from langchain_openai import ChatOpenAI
+                self._llm = ChatOpenAI(**self.kwargs)
+            return self._llm
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+
+class CachedLLM:
+    """Envolve um chat model e reaproveita a resposta de prompts idênticos.
+
+    A chave combina modelo, temperatura e o hash do prompt com espaços
+    normalizados (os prompts são f-strings indentadas). Demais atributos
+    são delegados ao modelo original.
+    """
+
+    def __init__(self, llm, cache: DiskCache = None, ttl: int = LLM_CACHE_TTL):
+        self.llm = llm
+        self.cache = cache or get_llm_cache()
+        self.ttl = ttl
+        self.tokens_saved = 0
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    def cache_key(self, prompt) -> str:
+        text = prompt if isinstance(prompt, str) else json.dumps(prompt, default=str, sort_keys=True)
+        normalized = re.sub(r"\s+", " ", text).strip()
+        model = getattr(self.llm, "model_name", None) or getattr(self.llm, "model", "")
+        temperature = getattr(self.llm, "temperature", None)
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"llm:{model}:{temperature}:{digest}"
+
+    def _record_hit(self, entry: dict):
+        saved = entry.get("usage", {}).get("total_tokens", 0)
+        with self._lock:
+            self.tokens_saved += saved
+        telemetry = get_telemetry()
+        telemetry.incr("cache_lookups_total", cache="llm", result="hit")
+        telemetry.incr("llm_tokens_saved_total", saved)
+
+    def _record_usage(self, usage: dict):
+        telemetry = get_telemetry()
+        telemetry.incr("cache_lookups_total", cache="llm", result="miss")
+        telemetry.incr("llm_calls_total")
+        telemetry.incr("llm_tokens_total", usage.get("input_tokens", 0), type="input")
+        telemetry.incr("llm_tokens_total", usage.get("output_tokens", 0), type="output")
+
+    def invoke(self, prompt, **kwargs):
+        key = self.cache_key(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            entry = json.loads(cached)
+            self._record_hit(entry)
+            from langchain_core.messages import AIMessage
+            return AIMessage(content=entry["content"], response_metadata={"cache_hit": True})
+
+        with get_telemetry().span("llm.chamada", modo="invoke"):
+            response = self.llm.invoke(prompt, **kwargs)
+        content = response.content if hasattr(response, "content") else str(response)
+        usage = dict(getattr(response, "usage_metadata", None) or {})
+        self._record_usage(usage)
+        self.cache.set(key, json.dumps({"content": content, "usage": usage}, ensure_ascii=False), self.ttl)
+        return response
+
+    def with_structured_output(self, schema, **kwargs):
+        """Saída estruturada (Pydantic) com o mesmo cache; a chave inclui o nome do schema."""
+        return CachedStructuredLLM(
+            self, schema, lambda: self.llm.with_structured_output(schema, include_raw=True, **kwargs)
+        )
+
+    def stats(self) -> dict:
+        stats = self.cache.stats()
+        stats["tokens_saved"] = self.tokens_saved
+        return stats
+
+
+class CachedStructuredLLM:
+    """Runnable de with_structured_output com cache do objeto validado (armazenado como JSON)."""
+
+    def __init__(self, parent: CachedLLM, schema, runnable_factory):
+        self.parent = parent
+        self.schema = schema
+        self._runnable_factory = runnable_factory
+        self._runnable = None
+
+    @property
+    def runnable(self):
+        # Construído no primeiro cache miss
+        if self._runnable is None:
+            self._runnable = self._runnable_factory()
+        return self._runnable
+
+    @runnable.setter
+    def runnable(self, value):
+        self._runnable = value
+
+    def _cache_key(self, prompt) -> str:
+        return f"{self.parent.cache_key(prompt)}:{self.schema.__name__}"
+
+    def _from_cache(self, key):
+        cached = self.parent.cache.get(key)
+        if cached is None:
+            return None
+        entry = json.loads(cached)
+        self.parent._record_hit(entry)
+        return self.schema.model_validate_json(entry["parsed"])
+
+    def _store(self, key, parsed, usage: dict):
+        self.parent._record_usage(usage)
+        entry = {"parsed": parsed.model_dump_json(), "usage": usage}
+        self.parent.cache.set(key, json.dumps(entry, ensure_ascii=False), self.parent.ttl)
+
+    def invoke(self, prompt, **kwargs):
+        key = self._cache_key(prompt)
+        cached = self._from_cache(key)
+        if cached is not None:
+            return cached
+
+        with get_telemetry().span("llm.chamada", modo="structured", schema=self.schema.__name__):
+            result = self.runnable.invoke(prompt, **kwargs)
+        if result.get("parsing_error") is not None:
+            raise result["parsing_error"]
+
+        parsed = result["parsed"]
+        self._store(key, parsed, dict(getattr(result.get("raw"), "usage_metadata", None) or {}))
+        return parsed
+
+    def stream(self, prompt, **kwargs):
+        """Gera dicts parciais à medida que o JSON chega e, por último, o objeto validado.
+
+        Em cache hit, gera apenas o objeto validado.
+        """
+        key = self._cache_key(prompt)
+        cached = self._from_cache(key)
+        if cached is not None:
+            yield cached
+            return
+
+        from langchain_core.utils.json import parse_partial_json
+
+        content, aggregate = "", None
+        # Sem span aqui (o gerador é suspenso entre pedaços): mede 1º token e duração total
+        telemetry = get_telemetry()
+        start = time.perf_counter()
+        first_token = None
+        for chunk in self.parent.llm.stream(prompt, response_format=self.schema, **kwargs):
+            if first_token is None:
+                first_token = time.perf_counter() - start
+                telemetry.observe("llm_first_token_seconds", first_token)
+            aggregate = chunk if aggregate is None else aggregate + chunk
+            if not chunk.content:
+                continue
+            content += chunk.content
+            partial = parse_partial_json(content)
+            if isinstance(partial, dict):
+                yield partial
+
+        telemetry.observe("llm_stream_seconds", time.perf_counter() - start)
+        parsed = self.schema.model_validate_json(content)
+        self._store(key, parsed, dict(getattr(aggregate, "usage_metadata", None) or {}))
+        yield parsed
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> DiskCache:
+    """Cache compartilhado de respostas do LLM (caminho configurável em LLM_CACHE_PATH)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = DiskCache(
+                os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite")),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+            )
+        return _default_cache
@@ -0,0 +1,283 @@
+"""Benchmark offline de ponta a ponta do SystemAgent.
+
+    python benchmarks/e2e.py                     # roda e compara com benchmarks/baseline.json
+    python benchmarks/e2e.py --gate-timing       # idem, reprovando também tempos (baseline desta máquina)
+    python benchmarks/e2e.py --save-baseline     # grava o resultado como nova baseline
+    python benchmarks/e2e.py --record            # regrava as respostas da API (exige FOOTBALL_API_KEY)
+
+As respostas da API-Football vêm de benchmarks/fixtures/api_responses.json e o
+ChatOpenAI é trocado por um modelo determinístico (FakeChatModel) com latência
+configurável. Antes das medições, cada pergunta roda uma vez sem medir (imports
+tardios e inicializações do primeiro uso). Cada pergunta roda a frio (caches
+vazios, em diretório temporário) e em seguida a quente (mesmos caches); uma
+execução extra a frio mede o pico de memória com tracemalloc.
+
+Só as contagens (chamadas à API/LLM, tokens do prompt) reprovam por padrão: são
+determinísticas. Os tempos da baseline são milissegundos absolutos da máquina que
+a gravou, então aparecem na comparação só como informação; --gate-timing (com
+--repeat >= 3) os usa como critério quando a baseline foi gravada na mesma máquina.
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+from contextlib import redirect_stdout
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("FOOTBALL_API_KEY", "benchmark")
+
+from benchmarks.offline import FakeChatModel, RecordingSession, ReplaySession, load_recordings  # noqa: E402
+
+FIXTURES_PATH = os.path.join(ROOT, "benchmarks", "fixtures", "api_responses.json")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+QUESTIONS = {
+    "time_unico": "Como está a forma recente do Flamengo?",
+    "time_unico_ultimos_n": "Quantos gols o Palmeiras fez nos últimos 5 jogos?",
+    "dois_times_h2h": "Flamengo x Palmeiras: quem ganha?",
+    "apostas_h2h": "Quais apostas posso fazer no jogo Corinthians x São Paulo?",
+    "liga": "Como está o Brasileirão 2022?",
+}
+
+# Métricas comparadas com a baseline (tempo em ms, contagens e memória)
+COMPARED = ["total_ms", "api_calls", "llm_calls", "prompt_tokens"]
+# Mínimo de repetições para --gate-timing reprovar por tempo (uma execução é só ruído)
+MIN_REPEAT_FOR_TIMING = 3
+
+
+def isolated_state(directory: str, session):
+    """Aponta caches/índices para `directory` e recria os singletons com o transporte dado."""
+    from tools.football import football_cache, football_http, fixture_store, ratings, team_index
+    from agents.llm import llm_cache
+
+    os.environ["FOOTBALL_CACHE_PATH"] = os.path.join(directory, "football_api.sqlite")
+    os.environ["FOOTBALL_STORE_PATH"] = os.path.join(directory, "fixtures.sqlite")
+    os.environ["FOOTBALL_TEAM_INDEX_PATH"] = os.path.join(directory, "team_index.json")
+    os.environ["FOOTBALL_RATINGS_PATH"] = os.path.join(directory, "ratings.sqlite")
+    os.environ["LLM_CACHE_PATH"] = os.path.join(directory, "llm_cache.sqlite")
+
+    football_cache._default_cache = None
+    fixture_store._default_store = None
+    ratings._default_store = None
+    team_index._default_index = None
+    llm_cache._default_cache = None
+
+    client = football_http.FootballHTTPClient()
+    client.session = session
+    football_http._default_client = client
+    return client
+
+
+def build_agent(llm_options: dict):
+    from agenteSystem.agente_system_plan import SystemAgent
+
+    agent = SystemAgent()
+    fakes = {
+        "analise": FakeChatModel(temperature=0.3, **llm_options),
+        "extracao": FakeChatModel(temperature=0.1, **llm_options),
+    }
+    agent.analyser_agent.llm.llm = fakes["analise"]
+    agent.llm.llm = fakes["extracao"]
+    return agent, fakes
+
+
+def run_question(agent, fakes: dict, client, question: str) -> dict:
+    """Executa uma pergunta via stream e mede etapas, chamadas e tokens."""
+    api_before = client.stats["requests"]
+    llm_before = {name: dict(fake.stats) for name, fake in fakes.items()}
+    marks = {}
+    result, context_report = None, {}
+
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        for event in agent.stream(question):
+            now = (time.perf_counter() - start) * 1000
+            if event["event"] == "params":
+                marks["extracao"] = now
+            elif event["event"] == "data":
+                marks["coleta"] = now
+            elif event["event"] == "token":
+                marks.setdefault("primeiro_token", now)
+            elif event["event"] == "result":
+                result = event["data"]
+                context_report = event.get("context_report") or {}
+    total = (time.perf_counter() - start) * 1000
+
+    def delta(field):
+        return sum(fake.stats[field] - llm_before[name][field] for name, fake in fakes.items())
+
+    extraction = marks.get("extracao", total)
+    collection = marks.get("coleta", extraction)
+    return {
+        "status": "ok" if isinstance(result, dict) and "error" not in result else "error",
+        "total_ms": round(total, 2),
+        "extracao_ms": round(extraction, 2),
+        "coleta_ms": round(collection - extraction, 2),
+        "analise_ms": round(total - collection, 2),
+        "primeiro_token_ms": round(marks["primeiro_token"], 2) if "primeiro_token" in marks else None,
+        "api_calls": client.stats["requests"] - api_before,
+        "llm_calls": delta("calls"),
+        "prompt_tokens": delta("prompt_tokens"),
+        "completion_tokens": delta("completion_tokens"),
+        "context_tokens": context_report.get("tokens_compact"),
+        "context_tokens_saved": context_report.get("tokens_saved"),
+    }
+
+
+def _median(runs: list) -> dict:
+    summary = {"status": runs[-1]["status"]}
+    for key, value in runs[-1].items():
+        if key == "status":
+            continue
+        values = [run[key] for run in runs if run[key] is not None]
+        summary[key] = round(statistics.median(values), 2) if values else None
+    return summary
+
+
+def benchmark(questions: dict, repeat: int, api_latency_ms: float, llm_options: dict) -> dict:
+    recordings = load_recordings(FIXTURES_PATH)
+    report = {}
+
+    # Aquecimento não medido: o custo do primeiro uso não cai na primeira pergunta
+    for question in questions.values():
+        with tempfile.TemporaryDirectory() as directory:
+            client = isolated_state(directory, ReplaySession(recordings, 0.0))
+            agent, fakes = build_agent({})
+            run_question(agent, fakes, client, question)
+
+    for name, question in questions.items():
+        cold, warm = [], []
+        unmatched = set()
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as directory:
+                session = ReplaySession(recordings, api_latency_ms)
+                client = isolated_state(directory, session)
+                agent, fakes = build_agent(llm_options)
+                cold.append(run_question(agent, fakes, client, question))
+                warm.append(run_question(agent, fakes, client, question))
+                unmatched.update(session.unmatched)
+
+        with tempfile.TemporaryDirectory() as directory:
+            client = isolated_state(directory, ReplaySession(recordings, api_latency_ms))
+            agent, fakes = build_agent(llm_options)
+            tracemalloc.start()
+            run_question(agent, fakes, client, question)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        report[name] = {
+            "question": question,
+            "cold": _median(cold),
+            "warm": _median(warm),
+            "peak_memory_kb": round(peak / 1024, 1),
+            "unmatched_requests": sorted(unmatched),
+        }
+    return report
+
+
+def record(questions: dict):
+    """Roda as perguntas contra a API real e acrescenta as respostas em FIXTURES_PATH.
+
+    Cada pergunta grava a partir de caches vazios, como na execução a frio do
+    benchmark; assim as requisições gravadas são as mesmas que o replay fará.
+    """
+    session = RecordingSession()
+    for question in questions.values():
+        with tempfile.TemporaryDirectory() as directory:
+            client = isolated_state(directory, session)
+            agent, fakes = build_agent({})
+            run_question(agent, fakes, client, question)
+    os.makedirs(os.path.dirname(FIXTURES_PATH), exist_ok=True)
+    session.save(FIXTURES_PATH, load_recordings(FIXTURES_PATH))
+    return len(session.recordings)
+
+
+def compare(report: dict, baseline: dict, tolerance: float, min_delta_ms: float, gate_timing: bool = False) -> list:
+    """Linhas de comparação e a lista de regressões: contagens sempre; tempos e memória só com gate_timing."""
+    lines, regressions = [], []
+    for name, current in report.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for phase in ("cold", "warm"):
+            for metric in COMPARED:
+                old, new = previous[phase].get(metric), current[phase].get(metric)
+                if old is None or new is None:
+                    continue
+                change = (new - old) / old if old else (0.0 if new == old else float("inf"))
+                lines.append(f"{name:22} {phase:4} {metric:14} {old:>10} -> {new:>10} ({change:+.0%})")
+                # Contagens não podem crescer; tempos toleram ruído relativo e absoluto
+                if metric.endswith("_ms"):
+                    regressed = gate_timing and change > tolerance and new - old > min_delta_ms
+                else:
+                    regressed = change > 0
+                if regressed:
+                    regressions.append(f"{name} {phase} {metric}: {old} -> {new} ({change:+.0%})")
+        old_peak, new_peak = previous.get("peak_memory_kb"), current.get("peak_memory_kb")
+        if gate_timing and old_peak and new_peak and (new_peak - old_peak) / old_peak > tolerance:
+            regressions.append(f"{name} peak_memory_kb: {old_peak} -> {new_peak}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark offline do pipeline (API gravada + LLM determinístico).")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="*", choices=sorted(QUESTIONS), help="Roda só estas perguntas")
+    parser.add_argument("--api-latency-ms", type=float, default=0.0, help="Latência simulada por requisição")
+    parser.add_argument("--llm-first-token-ms", type=float, default=0.0, help="Latência até o 1º token do LLM")
+    parser.add_argument("--llm-chunk-ms", type=float, default=0.0, help="Latência por pedaço do streaming")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Piora aceita nos tempos (fração)")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Piora mínima (ms) para contar como regressão")
+    parser.add_argument("--gate-timing", action="store_true",
+                        help="Reprova também por tempo/memória (só faz sentido com baseline gravada nesta máquina)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--record", action="store_true", help="Regrava as respostas da API real")
+    parser.add_argument("--json", dest="json_path", default=None, help="Grava o relatório neste arquivo")
+    args = parser.parse_args(argv)
+
+    questions = {name: QUESTIONS[name] for name in (args.only or QUESTIONS)}
+
+    if args.record:
+        print(f"Respostas gravadas: {record(questions)} ({FIXTURES_PATH})")
+        return 0
+
+    llm_options = {"first_token_ms": args.llm_first_token_ms, "chunk_ms": args.llm_chunk_ms}
+    report = benchmark(questions, args.repeat, args.api_latency_ms, llm_options)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Baseline gravada em {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        return 0
+    with open(BASELINE_PATH, encoding="utf-8") as f:
+        baseline = json.load(f)
+    gate_timing = args.gate_timing and args.repeat >= MIN_REPEAT_FOR_TIMING
+    lines, regressions = compare(report, baseline, args.tolerance, args.min_delta_ms, gate_timing)
+    print("\nComparação com a baseline:")
+    if args.gate_timing and not gate_timing:
+        print(f"(--gate-timing ignorado: use --repeat >= {MIN_REPEAT_FOR_TIMING})")
+    if not gate_timing:
+        print("(tempos e memória só informativos; só as contagens reprovam)")
+    print("\n".join(lines))
+    for regression in regressions:
+        print(f"❌ Regressão: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""Peças para rodar o pipeline sem rede: replay de respostas gravadas da API-Football,
+gravação dessas respostas e um chat model determinístico no lugar do ChatOpenAI."""
+import os
+import json
+import time
+import threading
+from urllib.parse import urlencode, urlsplit
+
+import requests
+
+from agents.analyser.context_encoder import count_tokens
+
+
+def request_key(url: str, params: dict = None) -> str:
+    """Chave estável de uma requisição: endpoint + parâmetros ordenados (sem host nem chave de API)."""
+    endpoint = urlsplit(url).path.lstrip("/")
+    query = urlencode(sorted((k, str(v)) for k, v in (params or {}).items() if v is not None))
+    return f"{endpoint}?{query}" if query else endpoint
+
+
+class RecordedResponse:
+    """Resposta com a mesma interface usada de requests.Response (status_code, headers, content, json)."""
+
+    def __init__(self, data: dict, status_code: int = 200, headers: dict = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self._data = data
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class ReplaySession:
+    """Substitui requests.Session no FootballHTTPClient servindo respostas gravadas.
+
+    Requisições sem gravação recebem o formato de erro da API (200 com "errors")
+    e ficam registradas em `unmatched`.
+    """
+
+    def __init__(self, recordings: dict, latency_ms: float = 0.0):
+        self.recordings = recordings
+        self.latency_ms = latency_ms
+        self.unmatched = []
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        key = request_key(url, params)
+        data = self.recordings.get(key)
+        if data is None:
+            with self._lock:
+                self.unmatched.append(key)
+            data = {"errors": {"replay": f"requisição não gravada: {key}"}, "results": 0, "response": []}
+        return RecordedResponse(data)
+
+
+class RecordingSession:
+    """Envolve uma sessão real e guarda cada resposta válida para replay posterior."""
+
+    def __init__(self, session=None):
+        self.session = session or requests.Session()
+        self.recordings = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        response = self.session.get(url, headers=headers, params=params, timeout=timeout)
+        if response.status_code == 200:
+            data = response.json()
+            if not data.get("errors"):
+                with self._lock:
+                    self.recordings[request_key(url, params)] = data
+        return response
+
+    def save(self, path: str, existing: dict = None):
+        data = dict(existing or {})
+        data.update(self.recordings)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+def load_recordings(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FakeChatModel:
+    """Stand-in determinístico do ChatOpenAI com latência configurável.
+
+    - invoke: responde o prompt de extração com os parâmetros do extrator local;
+    - stream(response_format=schema): emite o JSON de um relatório fixo em pedaços;
+    - with_structured_output(schema, include_raw=True): mesmo relatório, sem streaming.
+
+    Conta chamadas e tokens de prompt/resposta (mesmo contador do context_encoder).
+    """
+
+    def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0.0,
+                 first_token_ms: float = 0.0, chunk_ms: float = 0.0, chunk_chars: int = 16):
+        self.model_name = model
+        self.temperature = temperature
+        self.first_token_ms = first_token_ms
+        self.chunk_ms = chunk_ms
+        self.chunk_chars = chunk_chars
+        self.stats = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, prompt, completion: str) -> dict:
+        prompt_tokens = count_tokens(prompt if isinstance(prompt, str) else json.dumps(prompt, default=str))
+        completion_tokens = count_tokens(completion)
+        with self._lock:
+            self.stats["calls"] += 1
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["completion_tokens"] += completion_tokens
+        return {"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens}
+
+    def _extraction_reply(self, prompt: str) -> str:
+        from agenteSystem.query_extractor import QueryExtractor
+
+        question = prompt.split('Pergunta: "', 1)[-1].split('"', 1)[0]
+        params, _ = QueryExtractor().extract(question, "2022-07-11", "2022-05-23")
+        return json.dumps(params, ensure_ascii=False)
+
+    def _report(self, schema):
+        return schema.model_validate({
+            "resposta": {
+                "resposta_direta": "Resposta gerada pelo modelo determinístico do benchmark, "
+                                   "baseada nas estatísticas do contexto.",
+                "estatisticas": [{"nome": "jogos analisados", "valor": "10"}],
+                "sugestoes_apostas": [{"mercado": "Over 2.5 Gols", "sugestao": "NÃO", "confianca": "média",
+                                       "justificativa": "Média de gols abaixo de 2.5 nos últimos jogos"}],
+                "confianca_analise": "média",
+                "observacoes": "Benchmark offline."
+            },
+            "analise": {
+                "resumo_desempenho": [],
+                "confrontos_diretos": None,
+                "previsao_partida": None,
+                "padroes_identificados": ["Padrão fixo do benchmark"],
+                "alertas": []
+            }
+        })
+
+    def invoke(self, prompt, **kwargs):
+        from langchain_core.messages import AIMessage
+
+        time.sleep((self.first_token_ms + self.chunk_ms) / 1000)
+        content = self._extraction_reply(prompt)
+        return AIMessage(content=content, usage_metadata=self._count(prompt, content))
+
+    def stream(self, prompt, response_format=None, **kwargs):
+        from langchain_core.messages import AIMessageChunk
+
+        content = self._report(response_format).model_dump_json()
+        usage = self._count(prompt, content)
+        time.sleep(self.first_token_ms / 1000)
+        for i in range(0, len(content), self.chunk_chars):
+            if self.chunk_ms:
+                time.sleep(self.chunk_ms / 1000)
+            yield AIMessageChunk(content=content[i:i + self.chunk_chars])
+        yield AIMessageChunk(content="", usage_metadata=usage)
+
+    def with_structured_output(self, schema, include_raw: bool = False, **kwargs):
+        model = self
+
+        class _Structured:
+            def invoke(self, prompt, **kwargs):
+                from langchain_core.messages import AIMessage
+
+                time.sleep((model.first_token_ms + model.chunk_ms) / 1000)
+                parsed = model._report(schema)
+                raw = AIMessage(content=parsed.model_dump_json(),
+                                usage_metadata=model._count(prompt, parsed.model_dump_json()))
+                return {"raw": raw, "parsed": parsed, "parsing_error": None} if include_raw else parsed
+
+        return _Structured()
@@ -0,0 +1,107 @@
+"""Benchmark de inicialização: tempo de import e de construção do SystemAgent em processos novos.
+
+    python benchmarks/startup.py                 # relatório
+    python benchmarks/startup.py --max-ms 300    # falha (exit 1) se o import passar do limite
+
+Cada alvo roda em um interpretador limpo (sem cache de módulos) e o valor
+reportado é a mediana das repetições. Também verifica que módulos pesados
+(langchain_openai, langchain.agents) não são carregados só por importar e
+construir o SystemAgent.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["langchain_openai", "langchain.agents", "openai"]
+
+TARGETS = {
+    "import_system_agent": "import agenteSystem.agente_system_plan",
+    "construct_system_agent": "from agenteSystem.agente_system_plan import SystemAgent; SystemAgent()",
+    "import_cli": "import teste",
+    "import_football_tool": "import tools.football.football_game_tool",
+}
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    env.setdefault("FOOTBALL_API_KEY", "benchmark")
+    return env
+
+
+def measure(code: str, repeat: int) -> dict:
+    """Mediana (ms) de `repeat` execuções de `code` em interpretadores novos."""
+    samples, heavy = [], []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(code=code, heavy=HEAVY_MODULES)],
+            cwd=ROOT, env=_env(), capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        heavy = result["heavy"]
+    return {"median_ms": round(statistics.median(samples), 1), "min_ms": round(min(samples), 1),
+            "heavy_modules_loaded": heavy}
+
+
+def slowest_imports(module: str, top: int) -> list:
+    """Módulos com maior tempo cumulativo segundo `python -X importtime`."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        rows.append((int(cumulative), name))
+    rows.sort(reverse=True)
+    return [{"module": name, "cumulative_ms": round(us / 1000, 1)} for us, name in rows[:top]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede o tempo de inicialização do sistema.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Quantos imports mais lentos listar")
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="Limite para import_system_agent; acima dele o benchmark falha")
+    parser.add_argument("--json", dest="json_path", default=None, help="Grava o relatório neste arquivo")
+    args = parser.parse_args(argv)
+
+    report = {name: measure(code, args.repeat) for name, code in TARGETS.items()}
+    report["slowest_imports"] = slowest_imports("agenteSystem.agente_system_plan", args.top)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    failures = []
+    for name in ("import_system_agent", "construct_system_agent"):
+        if report[name]["heavy_modules_loaded"]:
+            failures.append(f"{name} carregou {report[name]['heavy_modules_loaded']}")
+    if args.max_ms is not None and report["import_system_agent"]["median_ms"] > args.max_ms:
+        failures.append(f"import_system_agent levou {report['import_system_agent']['median_ms']} ms "
+                        f"(limite {args.max_ms} ms)")
+
+    for failure in failures:
+        print(f"❌ {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,19 @@
 from agenteSystem.agente_system_plan import SystemAgent
+from tools.telemetry.telemetry import configure_logging
 import json
 
-def print_resultado(resultado):
-    """Imprime o resultado de forma bonita e legível."""
+def print_resultado(resultado, mostrar_resposta=True):
+    """Imprime o resultado de forma bonita e legível.
+
+    mostrar_resposta=False omite a resposta direta (já exibida em streaming).
+    """
     print("\n" + "="*70)
     print("📊 RESPOSTA DO SISTEMA")
     print("="*70 + "\n")
     
     if isinstance(resultado, dict):
         # Resposta direta
-        if "resposta_direta" in resultado:
+        if "resposta_direta" in resultado and mostrar_resposta:
             print("💬 RESPOSTA:")
             print(f"   {resultado['resposta_direta']}\n")
         
@@ -38,6 +42,9 @@ def print_resultado(resultado):
         # Confiança
         if "confianca_analise" in resultado:
             print(f"🎯 CONFIANÇA DA ANÁLISE: {resultado['confianca_analise'].upper()}\n")
+
+        if "dados_desatualizados" in resultado:
+            print(f"⚠️  DADOS DESATUALIZADOS (cota da API esgotada): {', '.join(map(str, resultado['dados_desatualizados']))}\n")
         
         # Se houver erro
         if "error" in resultado:
@@ -53,7 +60,37 @@ def print_resultado(resultado):
     
     print("="*70 + "\n")
 
+def print_evento(evento, estado):
+    """Exibe cada evento de SystemAgent.stream assim que ele chega."""
+    tipo = evento["event"]
+
+    if tipo == "params":
+        times = ", ".join(evento["params"].get("teams", [])) or "nenhum"
+        print(f"\n🔎 Times identificados: {times}")
+
+    elif tipo == "data":
+        nome = evento.get("team") or {"liga": "Liga", "head_to_head": "Confronto direto"}.get(evento.get("type"), evento.get("type"))
+        dados = evento.get("data", {})
+        if isinstance(dados, dict) and "error" in dados:
+            print(f"   ⚠️ {nome}: {dados['error']}")
+        else:
+            jogos = dados.get("statistics", {}).get("total_jogos") if isinstance(dados, dict) else None
+            print(f"   ✔️ {nome}: dados recebidos" + (f" ({jogos} jogos)" if jogos is not None else ""))
+
+    elif tipo == "token":
+        if not estado["resposta_iniciada"]:
+            estado["resposta_iniciada"] = True
+            print("\n💬 RESPOSTA:\n   ", end="")
+        print(evento["text"], end="", flush=True)
+
+    elif tipo == "result":
+        if estado["resposta_iniciada"]:
+            print()
+        print_resultado(evento["data"], mostrar_resposta=not estado["resposta_iniciada"])
+
 def main():
+    # Progresso detalhado: LOG_LEVEL=INFO; spans e métricas: TELEMETRY_ENABLED=1
+    configure_logging()
     system_agent = SystemAgent()
     
     print("\n" + "⚽"*35)
@@ -78,8 +115,9 @@ def main():
         print("\n⏳ Processando sua pergunta...")
         
         try:
-            resultado = system_agent.run(user_input)
-            print_resultado(resultado)
+            estado = {"resposta_iniciada": False}
+            for evento in system_agent.stream(user_input):
+                print_evento(evento, estado)
         except Exception as e:
             print(f"\n❌ Erro ao processar: {str(e)}\n")
 
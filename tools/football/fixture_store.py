@@ -0,0 +1,300 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+from tools.football.fixture_record import FINISHED_STATUSES, FixtureRecord, dumps, loads
+
+SCHEDULED_STATUSES = ("NS", "TBD")
+
+# Janela incremental: volta alguns dias (jogos adiados/corrigidos) e avança para pegar a agenda
+SYNC_OVERLAP_DAYS = 3
+SYNC_AHEAD_DAYS = 30
+# Próximos jogos só são respondidos localmente se todas as competições do time foram sincronizadas há pouco
+UPCOMING_MAX_AGE = 12 * 60 * 60
+# Jogos recentes idem, com a mesma validade da busca "last" da API (jogos terminam a toda hora)
+RECENT_MAX_AGE = 30 * 60
+
+
+class FixtureStore:
+    """Armazém local (SQLite) de jogos da API-Football, sincronizado por liga/temporada.
+
+    Cada jogo guarda o FixtureRecord como array JSON (coluna raw) e as consultas
+    devolvem FixtureRecord, o mesmo formato que FootballAPI obtém da API.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS fixtures (
+                fixture_id INTEGER PRIMARY KEY,
+                league_id INTEGER,
+                season INTEGER,
+                timestamp INTEGER NOT NULL,
+                status TEXT,
+                home_id INTEGER NOT NULL,
+                away_id INTEGER NOT NULL,
+                team_lo INTEGER NOT NULL,
+                team_hi INTEGER NOT NULL,
+                home_goals INTEGER,
+                away_goals INTEGER,
+                raw TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_fixtures_home_ts ON fixtures(home_id, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_fixtures_away_ts ON fixtures(away_id, timestamp);
+            CREATE INDEX IF NOT EXISTS idx_fixtures_league_season ON fixtures(league_id, season);
+            CREATE INDEX IF NOT EXISTS idx_fixtures_pair ON fixtures(team_lo, team_hi, timestamp);
+
+            CREATE TABLE IF NOT EXISTS fixture_stats (
+                fixture_id INTEGER PRIMARY KEY,
+                record TEXT NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS sync_state (
+                league_id INTEGER NOT NULL,
+                season INTEGER NOT NULL,
+                synced_to TEXT NOT NULL,
+                synced_at REAL NOT NULL,
+                PRIMARY KEY (league_id, season)
+            );
+            """
+        )
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def upsert(self, records: list) -> int:
+        """Insere/atualiza jogos (FixtureRecord)."""
+        rows = [
+            (r.fixture_id, r.league_id, r.season, r.timestamp, r.status, r.home_id, r.away_id,
+             min(r.home_id, r.away_id), max(r.home_id, r.away_id), r.home_goals, r.away_goals, dumps(list(r)))
+            for r in records
+        ]
+
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO fixtures VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+        return len(rows)
+
+    def save_statistics(self, records: dict) -> int:
+        """Guarda estatísticas normalizadas de jogos encerrados ({fixture_id: registro}); não mudam mais."""
+        rows = [(int(fixture_id), json.dumps(record, ensure_ascii=False)) for fixture_id, record in records.items()]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO fixture_stats VALUES (?, ?)", rows)
+            self._conn.commit()
+        return len(rows)
+
+    def sync_league(self, league_id: int, season: int, fetch, today: str = None) -> dict:
+        """Sincroniza uma liga/temporada. fetch(date_from, date_to) -> {"errors", "response": [FixtureRecord]}
+        (None = temporada toda).
+
+        A primeira carga traz a temporada inteira; as seguintes só a janela entre a
+        última sincronização (com folga) e os próximos dias.
+        """
+        today = today or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        state = self.sync_state(league_id, season)
+
+        if state is None:
+            date_from, date_to = None, None
+        else:
+            start = datetime.strptime(state["synced_to"], "%Y-%m-%d") - timedelta(days=SYNC_OVERLAP_DAYS)
+            end = datetime.strptime(today, "%Y-%m-%d") + timedelta(days=SYNC_AHEAD_DAYS)
+            date_from, date_to = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+        data = fetch(date_from, date_to)
+        if data.get("errors"):
+            return {"error": data["errors"]}
+
+        total = self.upsert(data.get("response") or [])
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                (league_id, season, today, time.time())
+            )
+            self._conn.commit()
+
+        return {
+            "league_id": league_id,
+            "season": season,
+            "mode": "full" if state is None else "incremental",
+            "date_from": date_from,
+            "date_to": date_to,
+            "fixtures_synced": total
+        }
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def sync_state(self, league_id: int, season: int):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_to, synced_at FROM sync_state WHERE league_id = ? AND season = ?",
+                (league_id, season)
+            ).fetchone()
+        return {"synced_to": row[0], "synced_at": row[1]} if row else None
+
+    def _team_leagues_synced_at(self, team_id: int, season: int = None):
+        """Maior synced_at entre as ligas sincronizadas em que o time aparece (None se nenhuma)."""
+        season_filter = "AND f.season = ?" if season is not None else ""
+        args = (team_id, season) if season is not None else (team_id,)
+        query = f"""
+            SELECT MAX(s.synced_at) FROM sync_state s
+            WHERE EXISTS (SELECT 1 FROM fixtures f WHERE f.home_id = ? {season_filter}
+                          AND f.league_id = s.league_id AND f.season = s.season)
+        """
+        with self._lock:
+            home = self._conn.execute(query, args).fetchone()[0]
+            away = self._conn.execute(query.replace("f.home_id", "f.away_id"), args).fetchone()[0]
+        values = [v for v in (home, away) if v is not None]
+        return max(values) if values else None
+
+    def covers(self, team_id: int, season: int = None, max_age: float = None) -> bool:
+        """O time aparece em alguma liga/temporada já sincronizada (há no máximo max_age segundos)?"""
+        synced_at = self._team_leagues_synced_at(team_id, season)
+        if synced_at is None:
+            return False
+        return max_age is None or time.time() - synced_at <= max_age
+
+    def synced_all(self, league_ids: list, season: int, max_age: float = None) -> bool:
+        """Todas as ligas pedidas estão sincronizadas na temporada (há no máximo max_age segundos)?"""
+        now = time.time()
+        for league_id in set(league_ids):
+            state = self.sync_state(league_id, season)
+            if state is None or (max_age is not None and now - state["synced_at"] > max_age):
+                return False
+        return True
+
+    def _select(self, query: str, args: tuple) -> list:
+        with self._lock:
+            rows = self._conn.execute(query, args).fetchall()
+        return [_record(row[0]) for row in rows]
+
+    def recent(self, team_id: int, last_n: int, season: int = None) -> list:
+        """Últimos N jogos encerrados do time (mais recente primeiro)."""
+        statuses = ",".join("?" * len(FINISHED_STATUSES))
+        season_filter = "AND season = ?" if season is not None else ""
+        season_args = (season,) if season is not None else ()
+        query = f"""
+            SELECT raw, timestamp FROM fixtures WHERE home_id = ? {season_filter} AND status IN ({statuses})
+            UNION ALL
+            SELECT raw, timestamp FROM fixtures WHERE away_id = ? {season_filter} AND status IN ({statuses})
+            ORDER BY timestamp DESC LIMIT ?
+        """
+        args = (team_id, *season_args, *FINISHED_STATUSES, team_id, *season_args, *FINISHED_STATUSES, last_n)
+        return self._select(query, args)
+
+    def head_to_head(self, team1_id: int, team2_id: int, last: int) -> list:
+        """Últimos confrontos encerrados entre dois times (mais recente primeiro)."""
+        statuses = ",".join("?" * len(FINISHED_STATUSES))
+        query = f"""
+            SELECT raw FROM fixtures WHERE team_lo = ? AND team_hi = ? AND status IN ({statuses})
+            ORDER BY timestamp DESC LIMIT ?
+        """
+        args = (min(team1_id, team2_id), max(team1_id, team2_id), *FINISHED_STATUSES, last)
+        return self._select(query, args)
+
+    def finished(self, league_id: int = None, season: int = None) -> list:
+        """Todos os jogos encerrados guardados (opcionalmente de uma liga/temporada), em ordem cronológica."""
+        filters, args = [f"status IN ({','.join('?' * len(FINISHED_STATUSES))})"], list(FINISHED_STATUSES)
+        if league_id is not None:
+            filters.append("league_id = ?")
+            args.append(league_id)
+        if season is not None:
+            filters.append("season = ?")
+            args.append(season)
+        return self._select(f"SELECT raw FROM fixtures WHERE {' AND '.join(filters)} ORDER BY timestamp ASC", tuple(args))
+
+    def finished_fixture(self, fixture_id) -> bool:
+        """O jogo consta como encerrado (nos jogos sincronizados ou nas estatísticas guardadas)?"""
+        try:
+            fixture_id = int(fixture_id)
+        except (TypeError, ValueError):
+            return False
+        statuses = ",".join("?" * len(FINISHED_STATUSES))
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT 1 FROM fixtures WHERE fixture_id = ? AND status IN ({statuses})", (fixture_id, *FINISHED_STATUSES)
+            ).fetchone()
+            if row is None:
+                row = self._conn.execute("SELECT 1 FROM fixture_stats WHERE fixture_id = ?", (fixture_id,)).fetchone()
+        return row is not None
+
+    def statistics(self, fixture_ids: list) -> dict:
+        """Estatísticas já guardadas dos jogos pedidos: {fixture_id: registro}."""
+        ids = [int(fixture_id) for fixture_id in fixture_ids]
+        if not ids:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT fixture_id, record FROM fixture_stats WHERE fixture_id IN ({','.join('?' * len(ids))})", ids
+            ).fetchall()
+        return {row[0]: loads(row[1]) for row in rows}
+
+    def upcoming(self, team_id: int, next_n: int, league_ids: list, season: int, now: float = None) -> list:
+        """Próximos N jogos agendados do time, só se todas as competições dele (league_ids) na
+        temporada foram sincronizadas há no máximo UPCOMING_MAX_AGE; senão None."""
+        if not league_ids or not self.synced_all(league_ids, season, UPCOMING_MAX_AGE):
+            return None
+
+        now = int(now or time.time())
+        statuses = ",".join("?" * len(SCHEDULED_STATUSES))
+        query = f"""
+            SELECT raw, timestamp FROM fixtures WHERE home_id = ? AND timestamp >= ? AND status IN ({statuses})
+            UNION ALL
+            SELECT raw, timestamp FROM fixtures WHERE away_id = ? AND timestamp >= ? AND status IN ({statuses})
+            ORDER BY timestamp ASC LIMIT ?
+        """
+        args = (team_id, now, *SCHEDULED_STATUSES, team_id, now, *SCHEDULED_STATUSES, next_n)
+        return self._select(query, args)
+
+    def scheduled(self, league_id: int, season: int, now: float = None) -> list:
+        """Jogos agendados (a partir de agora) de uma liga/temporada, em ordem cronológica."""
+        statuses = ",".join("?" * len(SCHEDULED_STATUSES))
+        query = f"""
+            SELECT raw FROM fixtures WHERE league_id = ? AND season = ? AND timestamp >= ? AND status IN ({statuses})
+            ORDER BY timestamp ASC
+        """
+        return self._select(query, (league_id, season, int(now or time.time()), *SCHEDULED_STATUSES))
+
+    def stats(self) -> dict:
+        with self._lock:
+            fixtures = self._conn.execute("SELECT COUNT(*) FROM fixtures").fetchone()[0]
+            leagues = self._conn.execute("SELECT league_id, season, synced_to FROM sync_state").fetchall()
+        return {
+            "fixtures": fixtures,
+            "leagues": [{"league_id": l, "season": s, "synced_to": d} for l, s, d in leagues]
+        }
+
+
+def _record(raw: str) -> FixtureRecord:
+    return FixtureRecord(*loads(raw))
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_fixture_store() -> FixtureStore:
+    """Armazém compartilhado (caminho configurável em FOOTBALL_STORE_PATH)."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = FixtureStore(
+                os.getenv("FOOTBALL_STORE_PATH", os.path.join(".cache", "fixtures.sqlite"))
+            )
+        return _default_store
@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime, timezone
+
+from tools.football.fixture_record import FINISHED_STATUSES
+
+# TTLs em segundos. None = nunca expira (dados imutáveis, ex: jogos encerrados).
+TTL_FOREVER = None
+TTL_UPCOMING = 10 * 60
+TTL_TEAM_LAST_N = 30 * 60
+TTL_HEAD_TO_HEAD = 60 * 60
+TTL_LEAGUE_OPEN = 60 * 60
+TTL_TEAMS = 7 * 24 * 60 * 60
+TTL_TEAM_COMPETITIONS = 24 * 60 * 60
+TTL_DEFAULT = 15 * 60
+# Por quanto tempo uma entrada vencida ainda serve de reserva quando a cota da API acaba
+STALE_TTL = 7 * 24 * 60 * 60
+# last_access só é regravado se estiver mais velho que isso (evita escrita a cada leitura)
+ACCESS_UPDATE_INTERVAL = 60
+
+
+class DiskCache:
+    """Cache persistente em SQLite com TTL por entrada e limite de tamanho (LRU).
+
+    Entradas vencidas não são servidas por get(), mas ficam guardadas por mais
+    `stale_ttl` segundos para get_stale() (reserva quando a cota da API acaba).
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000, stale_ttl: float = STALE_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_access ON cache(last_access)")
+        self._conn.commit()
+
+    def get(self, key: str):
+        """Retorna o valor armazenado ou None se ausente/expirado."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, last_access FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or (row[1] is not None and row[1] <= now):
+                self.misses += 1
+                return None
+
+            self._touch(key, row[2], now)
+            self.hits += 1
+            return row[0]
+
+    def get_stale(self, key: str):
+        """Retorna (valor, segundos desde que venceu) mesmo para entradas vencidas, ou None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at, last_access FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._touch(key, row[2], now)
+            self.stale_hits += 1
+            expired_for = max(0.0, now - row[1]) if row[1] is not None else 0.0
+            return row[0], expired_for
+
+    def _touch(self, key: str, last_access: float, now: float):
+        """Atualiza o LRU no máximo uma vez por ACCESS_UPDATE_INTERVAL por entrada."""
+        if now - last_access < ACCESS_UPDATE_INTERVAL:
+            return
+        self._conn.execute("UPDATE cache SET last_access = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+
+    def set(self, key: str, value, ttl: float = None):
+        """Armazena um valor. ttl=None mantém a entrada até ser removida por LRU."""
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Remove entradas vencidas há mais de stale_ttl e, se necessário, as menos usadas recentemente."""
+        self._conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                           (time.time() - self.stale_ttl,))
+        total = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        excess = total - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+            self.evictions += excess
+
+    def invalidate(self, prefix: str = ""):
+        """Remove as entradas cuja chave começa com o prefixo (todas, se vazio)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+            self._conn.commit()
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
+
+
+def cache_key(endpoint: str, params: dict) -> str:
+    """Chave estável para (endpoint, parâmetros). O prefixo permite invalidar por endpoint."""
+    canonical = json.dumps(params or {}, sort_keys=True, default=str)
+    digest = hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+    return f"{endpoint}:{digest}"
+
+
+def _all_finished(data: dict) -> bool:
+    fixtures = data.get("response") or []
+    return bool(fixtures) and all(
+        f.get("fixture", {}).get("status", {}).get("short") in FINISHED_STATUSES for f in fixtures
+    )
+
+
+def _window_closed(date_to) -> bool:
+    if not date_to:
+        return False
+    try:
+        end = datetime.strptime(str(date_to), "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return False
+    return end.date() < datetime.now(timezone.utc).date()
+
+
+def ttl_for(endpoint: str, params: dict, data: dict, finished: bool = False):
+    """Regras de validade por endpoint da API-Football.
+
+    finished: o chamador sabe que o jogo pedido já terminou (a resposta de
+    /fixtures/statistics não traz o status do jogo).
+    """
+    params = params or {}
+
+    # Estatísticas só são imutáveis depois do apito final; antes/durante o jogo mudam ou vêm vazias
+    if endpoint == "fixtures/statistics":
+        return TTL_FOREVER if data.get("response") and finished else TTL_DEFAULT
+
+    if endpoint == "teams":
+        return TTL_TEAMS
+
+    # Competições de um time na temporada (/leagues?team=&season=) quase não mudam
+    if endpoint == "leagues":
+        return TTL_TEAM_COMPETITIONS
+
+    if endpoint == "fixtures/headtohead":
+        return TTL_HEAD_TO_HEAD
+
+    if endpoint == "fixtures":
+        if "next" in params:
+            return TTL_UPCOMING
+        if "last" in params:
+            return TTL_TEAM_LAST_N
+        # Busca por id(s): jogos encerrados são imutáveis
+        if ("id" in params or "ids" in params) and _all_finished(data):
+            return TTL_FOREVER
+        # Liga/temporada: só é imutável se a janela de datas já fechou
+        if _window_closed(params.get("to")) and _all_finished(data):
+            return TTL_FOREVER
+        return TTL_LEAGUE_OPEN
+
+    return TTL_DEFAULT
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache() -> DiskCache:
+    """Cache compartilhado da ferramenta (caminho configurável em FOOTBALL_CACHE_PATH)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = DiskCache(
+                os.getenv("FOOTBALL_CACHE_PATH", os.path.join(".cache", "football_api.sqlite")),
+                max_entries=int(os.getenv("FOOTBALL_CACHE_MAX_ENTRIES", "5000")),
+                stale_ttl=float(os.getenv("FOOTBALL_CACHE_STALE_TTL", str(STALE_TTL)))
+            )
+        return _default_cache
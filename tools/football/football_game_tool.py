@@ -1,14 +1,62 @@
 import os
-import json
-import requests
+import asyncio
+import contextvars
 from typing import Type
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
-from langchain.tools import BaseTool
+from langchain_core.tools import BaseTool
 from dotenv import load_dotenv
 
+from tools.football.football_cache import get_cache, cache_key, ttl_for
+from tools.football.football_http import (
+    get_http_client, get_async_http_client, current_priority, request_priority,
+    QuotaExceededError, PRIORITY_PREFETCH
+)
+from tools.football.team_index import get_team_index, normalize, strip_stopwords
+from tools.football.football_stats import (
+    FixtureBatch, team_stats, team_summary, LEAGUE_MARKETS, LEAGUE_GOAL_RANKINGS, standings_order, market_order, league_rows
+)
+from tools.football.fixture_store import get_fixture_store, RECENT_MAX_AGE, UPCOMING_MAX_AGE
+from tools.football.fixture_record import fixture_records, loads
+from tools.football.match_stats import attach, chunks, fixture_ids, has_statistics, no_statistics_record, normalize_fixture
+from tools.football.ratings import get_ratings_store
+from tools.football.prediction import DixonColesModel
+from tools.telemetry.telemetry import get_telemetry
+
 load_dotenv()
 
+BASE_URL = "https://v3.football.api-sports.io"
+
+# Parâmetros obrigatórios de cada ação (usado para despacho direto, sem LLM).
+# Uma tupla significa "qualquer um destes".
+ACTION_REQUIRED_PARAMS = {
+    "get_fixtures": ["league_id"],
+    "get_team_recent_matches": ["team_name"],
+    "head_to_head": ["team1", "team2"],
+    "get_upcoming_matches": ["team_name"],
+    "get_match_statistics": ["fixture_id"],
+    "load_teams": ["league_id"],
+    "sync_league": ["league_id"],
+    "cache_stats": [],
+    "enrich_match_statistics": ["fixture_ids"],
+    "get_team_rating": [("team_name", "team_id")],
+    "rebuild_ratings": [],
+    "predict_match": ["team1", "team2"],
+    "predict_league": ["league_id"],
+    "league_table": ["league_id"],
+    "league_form": ["league_id"],
+    "league_markets": ["league_id", "market"],
+}
+
+# Idades (s) das respostas vencidas servidas durante a ação em andamento
+_stale_reads = contextvars.ContextVar("football_stale_reads", default=None)
+
+
+def _limit_reached(status_code: int, data: dict) -> bool:
+    """429 ou erro de cota no corpo (a API-Football responde 200 com errors.requests)."""
+    errors = data.get("errors") if isinstance(data, dict) else None
+    return status_code == 429 or (isinstance(errors, dict) and "requests" in errors)
+
 class FootballAPIInput(BaseModel):
     """Entrada para buscar dados de futebol."""
     query: str = Field(..., description="JSON com parâmetros de busca")
@@ -22,155 +70,513 @@ class FootballAPI(BaseTool):
         "2. Buscar jogos recentes de um time específico "
         "3. Buscar confronto direto entre dois times "
         "4. Buscar próximos jogos "
-        "5. Buscar estatísticas detalhadas de partidas"
+        "5. Buscar estatísticas detalhadas de partidas "
+        "6. Buscar estatísticas detalhadas de vários jogos em lote (enrich_match_statistics) "
+        "7. Consultar rating Elo, força de ataque/defesa e forma de um time (get_team_rating) "
+        "8. Probabilidades de 1X2, ambas marcam, over/under e handicap asiático de um jogo "
+        "pelo modelo Dixon-Coles (predict_match; team1 = mandante) "
+        "9. Probabilidades de todos os próximos jogos de uma liga (predict_league) "
+        "10. Classificação, ranking de forma e ranking de mercados (over/btts/clean sheets) ou de gols "
+        "marcados/sofridos de todos os times de uma liga com uma única busca de jogos "
+        "(league_table, league_form, league_markets)"
     )
     args_schema: Type[BaseModel] = FootballAPIInput
 
+    # ------------------------------------------------------------------
+    # Transporte (cache + HTTP), versões síncrona e assíncrona
+    # ------------------------------------------------------------------
+
+    def _cached(self, endpoint: str, req_params: dict, refresh: bool):
+        if refresh:
+            return None
+        cached = get_cache().get(cache_key(endpoint, req_params))
+        get_telemetry().incr("cache_lookups_total", cache="football_api", result="miss" if cached is None else "hit")
+        return loads(cached) if cached is not None else None
+
+    def _store(self, endpoint: str, req_params: dict, status_code: int, content: bytes, data: dict):
+        # Só armazena respostas válidas (a API retorna 200 com "errors" ao estourar a cota)
+        if status_code == 200 and not data.get("errors"):
+            finished = endpoint == "fixtures/statistics" and get_fixture_store().finished_fixture(req_params.get("fixture"))
+            get_cache().set(cache_key(endpoint, req_params), content, ttl_for(endpoint, req_params, data, finished))
+
+    def _request(self, endpoint: str, req_params: dict, headers: dict, refresh: bool = False, store: bool = True):
+        """Faz GET na API-Football passando pelo cache em disco. Retorna (status_code, data).
+
+        Chamadas concorrentes com o mesmo endpoint/parâmetros compartilham uma única requisição.
+        Sem cota, serve a resposta vencida do cache (a ação sai marcada com "stale").
+        store=False não grava a resposta bruta (quem chama guarda uma versão normalizada).
+        """
+        data = self._cached(endpoint, req_params, refresh)
+        if data is not None:
+            return 200, data
+
+        status_code, data, stale_for = get_http_client().coalesce(
+            cache_key(endpoint, req_params),
+            lambda: self._fetch(endpoint, req_params, headers, refresh, store)
+        )
+        self._note_stale(stale_for)
+        return status_code, data
+
+    def _fetch(self, endpoint: str, req_params: dict, headers: dict, refresh: bool, store: bool = True):
+        # Outra chamada pode ter gravado o cache entre a consulta e a entrada no single-flight
+        data = self._recheck(endpoint, req_params, refresh)
+        if data is not None:
+            return 200, data, None
+
+        client = get_http_client()
+        if client.rate.budget_low(current_priority()):
+            stale = self._stale(endpoint, req_params)
+            if stale is not None:
+                return stale
+
+        try:
+            response = client.get(f"{BASE_URL}/{endpoint}", headers=headers, params=req_params)
+        except QuotaExceededError:
+            stale = self._stale(endpoint, req_params)
+            if stale is None:
+                raise
+            return stale
+        return self._handle_response(endpoint, req_params, response, store)
+
+    async def _arequest(self, endpoint: str, req_params: dict, headers: dict, refresh: bool = False, store: bool = True):
+        """Versão assíncrona de _request."""
+        data = self._cached(endpoint, req_params, refresh)
+        if data is not None:
+            return 200, data
+
+        status_code, data, stale_for = await get_http_client().acoalesce(
+            cache_key(endpoint, req_params),
+            lambda: self._afetch(endpoint, req_params, headers, refresh, store)
+        )
+        self._note_stale(stale_for)
+        return status_code, data
+
+    async def _afetch(self, endpoint: str, req_params: dict, headers: dict, refresh: bool, store: bool = True):
+        data = self._recheck(endpoint, req_params, refresh)
+        if data is not None:
+            return 200, data, None
+
+        if get_http_client().rate.budget_low(current_priority()):
+            stale = self._stale(endpoint, req_params)
+            if stale is not None:
+                return stale
+
+        try:
+            response = await get_async_http_client().get(f"{BASE_URL}/{endpoint}", headers=headers, params=req_params)
+        except QuotaExceededError:
+            stale = self._stale(endpoint, req_params)
+            if stale is None:
+                raise
+            return stale
+        return self._handle_response(endpoint, req_params, response, store)
+
+    def _handle_response(self, endpoint: str, req_params: dict, response, store: bool = True):
+        data = loads(response.content)
+        if _limit_reached(response.status_code, data):
+            if response.status_code == 200:
+                get_http_client().rate.exhaust()
+            stale = self._stale(endpoint, req_params)
+            if stale is not None:
+                return stale
+        if store:
+            self._store(endpoint, req_params, response.status_code, response.content, data)
+        return response.status_code, data, None
+
+    def _request_fixtures(self, endpoint: str, req_params: dict, headers: dict, refresh: bool = False):
+        """_request para listas de jogos: `response` volta como FixtureRecord e os dicts da API são descartados.
+
+        O envelope é copiado porque o decodificado pode ser compartilhado pelo single-flight.
+        """
+        status_code, data = self._request(endpoint, req_params, headers, refresh)
+        return status_code, dict(data, response=fixture_records(data))
+
+    async def _arequest_fixtures(self, endpoint: str, req_params: dict, headers: dict, refresh: bool = False):
+        status_code, data = await self._arequest(endpoint, req_params, headers, refresh)
+        return status_code, dict(data, response=fixture_records(data))
+
+    def _recheck(self, endpoint: str, req_params: dict, refresh: bool):
+        if refresh:
+            return None
+        cached = get_cache().get(cache_key(endpoint, req_params))
+        return loads(cached) if cached is not None else None
+
+    def _stale(self, endpoint: str, req_params: dict):
+        """Resposta vencida do cache como (200, data, segundos vencida), ou None."""
+        stale = get_cache().get_stale(cache_key(endpoint, req_params))
+        if stale is None:
+            return None
+        get_http_client()._count("stale_served")
+        get_telemetry().incr("cache_lookups_total", cache="football_api", result="stale")
+        content, expired_for = stale
+        return 200, loads(content), expired_for
+
+    def _note_stale(self, expired_for):
+        reads = _stale_reads.get()
+        if expired_for is not None and reads is not None:
+            reads.append(expired_for)
+
+    # ------------------------------------------------------------------
+    # Resolução de times
+    # ------------------------------------------------------------------
+
+    def _team_search_term(self, team_name: str) -> str:
+        # A busca da API só aceita letras, números e espaços
+        return strip_stopwords(normalize(get_team_index().canonical_name(team_name)))
+
+    def _remember_team(self, team_name: str, search: str, data: dict):
+        index = get_team_index()
+        best = index.best_match(search, data.get("response") or [])
+        if not best:
+            return None
+
+        team = best["team"]
+        index.add_team(team["id"], team["name"], team.get("code"), team.get("country"))
+        index.add_alias(team_name, team["id"])
+        index.save()
+        return team["id"]
+
     def _get_team_id(self, team_name: str, headers: dict) -> int:
-        """Busca o ID de um time pelo nome."""
-        url = "https://v3.football.api-sports.io/teams"
-        response = requests.get(url, headers=headers, params={"search": team_name})
-        data = response.json()
-        
-        if data.get("response"):
-            return data["response"][0]["team"]["id"]
-        return None
+        """Busca o ID de um time pelo nome: índice local primeiro, /teams?search= só em caso de falta."""
+        if not team_name:
+            return None
+
+        team_id = get_team_index().lookup(team_name)
+        if team_id is not None:
+            return team_id
+
+        search = self._team_search_term(team_name)
+        _, data = self._request("teams", {"search": search}, headers)
+        return self._remember_team(team_name, search, data)
+
+    async def _aget_team_id(self, team_name: str, headers: dict) -> int:
+        if not team_name:
+            return None
+
+        team_id = get_team_index().lookup(team_name)
+        if team_id is not None:
+            return team_id
+
+        search = self._team_search_term(team_name)
+        _, data = await self._arequest("teams", {"search": search}, headers)
+        return self._remember_team(team_name, search, data)
+
+    def _load_teams(self, params: dict, headers: dict) -> dict:
+        """Carrega no índice local todos os times de uma liga/temporada."""
+        league_id = params.get("league_id")
+        season = params.get("season", 2024)
+        if not league_id:
+            return {"error": "Informe league_id para carregar os times"}
+
+        def fetch(endpoint, req_params):
+            return self._request(endpoint, req_params, headers, params.get("refresh", False))[1]
+
+        total = get_team_index().bulk_load(league_id, season, fetch)
+        return {"league_id": league_id, "season": season, "teams_loaded": total}
+
+    # ------------------------------------------------------------------
+    # Despacho das ações
+    # ------------------------------------------------------------------
+
+    def _prepare(self, query: str):
+        """Interpreta a consulta. Retorna (params, headers, action) ou um dict de erro."""
+        params = loads(query) if isinstance(query, str) else dict(query)
+        api_key = os.getenv("FOOTBALL_API_KEY")
+
+        if not api_key:
+            return {"error": "API key não configurada em FOOTBALL_API_KEY"}
+
+        headers = {"x-apisports-key": api_key}
+        action = params.get("action", "get_fixtures")
+        return params, headers, action
 
     def _run(self, query: str) -> dict:
+        token = _stale_reads.set([])
         try:
-            params = json.loads(query)
-            api_key = os.getenv("FOOTBALL_API_KEY")
-            
-            if not api_key:
-                return {"error": "API key não configurada em FOOTBALL_API_KEY"}
+            return self._mark_stale(self._dispatch(query))
+        finally:
+            _stale_reads.reset(token)
 
-            headers = {"x-apisports-key": api_key}
-            action = params.get("action", "get_fixtures")
+    async def _arun(self, query: str) -> dict:
+        """Execução assíncrona nativa: mesmas ações e mesmo parsing de _run, com HTTP via httpx."""
+        token = _stale_reads.set([])
+        try:
+            return self._mark_stale(await self._adispatch(query))
+        finally:
+            _stale_reads.reset(token)
+
+    def _mark_stale(self, result):
+        """Marca o resultado quando alguma resposta veio do cache vencido por falta de cota."""
+        reads = _stale_reads.get()
+        if reads and isinstance(result, dict) and "error" not in result:
+            result = dict(result, stale=True, stale_seconds=round(max(reads)))
+        return result
+
+    def _dispatch(self, query: str) -> dict:
+        try:
+            prepared = self._prepare(query)
+            if isinstance(prepared, dict):
+                return prepared
+            params, headers, action = prepared
 
             # Ação 1: Buscar fixtures por liga/temporada
             if action == "get_fixtures":
                 return self._get_fixtures(params, headers)
-            
+
             # Ação 2: Buscar jogos recentes de um time
             elif action == "get_team_recent_matches":
-                return self._get_team_recent_matches(params, headers)
-            
+                return self._with_statistics(self._get_team_recent_matches(params, headers), params, headers)
+
             # Ação 3: Confronto direto
             elif action == "head_to_head":
-                return self._get_head_to_head(params, headers)
-            
+                return self._with_statistics(self._get_head_to_head(params, headers), params, headers)
+
             # Ação 4: Próximos jogos
             elif action == "get_upcoming_matches":
                 return self._get_upcoming_matches(params, headers)
-            
+
             # Ação 5: Estatísticas de uma partida
             elif action == "get_match_statistics":
                 return self._get_match_statistics(params, headers)
-            
+
+            # Ação 6: Carregar índice de times de uma liga
+            elif action == "load_teams":
+                with request_priority(max(current_priority(), PRIORITY_PREFETCH)):
+                    return self._load_teams(params, headers)
+
+            # Ação 7: Métricas do cache de respostas
+            elif action == "cache_stats":
+                return get_cache().stats()
+
+            # Ação 8: Sincronizar o armazém local de jogos de uma liga
+            elif action == "sync_league":
+                with request_priority(max(current_priority(), PRIORITY_PREFETCH)):
+                    return self._sync_league(params, headers)
+
+            # Ação 9: Estatísticas detalhadas de vários jogos de uma vez
+            elif action == "enrich_match_statistics":
+                return self._enrich_match_statistics(params, headers)
+
+            # Ação 10: Rating (Elo, ataque/defesa) e forma atuais de um time
+            elif action == "get_team_rating":
+                return self._get_team_rating(params, headers)
+
+            # Ação 11: Recalcular os ratings a partir do armazém local de jogos
+            elif action == "rebuild_ratings":
+                return self._rebuild_ratings()
+
+            # Ação 12: Probabilidades dos mercados de um jogo (modelo Dixon-Coles)
+            elif action == "predict_match":
+                return self._predict_match(params, headers)
+
+            # Ação 13: Probabilidades de todos os jogos agendados de uma liga
+            elif action == "predict_league":
+                return self._predict_league(params, headers)
+
+            # Ações 14-16: visão da liga inteira (uma busca de jogos para todos os times)
+            elif action == "league_table":
+                return self._league_table(params, headers)
+
+            elif action == "league_form":
+                return self._league_form(params, headers)
+
+            elif action == "league_markets":
+                return self._league_markets(params, headers)
+
             else:
                 return {"error": f"Ação '{action}' não suportada"}
 
         except Exception as e:
             return {"error": str(e)}
 
-    def _get_fixtures(self, params: dict, headers: dict) -> dict:
-        """Busca fixtures básicas por liga/temporada."""
+    async def _adispatch(self, query: str) -> dict:
+        try:
+            prepared = self._prepare(query)
+            if isinstance(prepared, dict):
+                return prepared
+            params, headers, action = prepared
+
+            if action == "get_fixtures":
+                return await self._aget_fixtures(params, headers)
+
+            elif action == "get_team_recent_matches":
+                result = await self._aget_team_recent_matches(params, headers)
+                return await self._awith_statistics(result, params, headers)
+
+            elif action == "head_to_head":
+                result = await self._aget_head_to_head(params, headers)
+                return await self._awith_statistics(result, params, headers)
+
+            elif action == "enrich_match_statistics":
+                return await self._aenrich_match_statistics(params, headers)
+
+            elif action == "get_upcoming_matches":
+                return await self._aget_upcoming_matches(params, headers)
+
+            elif action == "get_match_statistics":
+                return await self._aget_match_statistics(params, headers)
+
+            elif action == "predict_match":
+                return await self._apredict_match(params, headers)
+
+            elif action == "cache_stats":
+                return self._dispatch(query)
+
+            # Ações raras reaproveitam o caminho síncrono numa thread: baixam a temporada via
+            # requests e/ou ajustam o modelo, o que travaria o event loop
+            elif action in ("load_teams", "sync_league", "get_team_rating", "rebuild_ratings",
+                            "predict_league", "league_table", "league_form", "league_markets"):
+                return await asyncio.to_thread(self._dispatch, query)
+
+            else:
+                return {"error": f"Ação '{action}' não suportada"}
+
+        except Exception as e:
+            return {"error": str(e)}
+
+    # ------------------------------------------------------------------
+    # Ação 1: fixtures por liga/temporada
+    # ------------------------------------------------------------------
+
+    def _fixtures_params(self, params: dict) -> dict:
         league_id = params.get("league_id")
         season = params.get("season", 2024)
         date_from = params.get("date_from")
         date_to = params.get("date_to")
+        status = params.get("status", "FT")
 
-        url = "https://v3.football.api-sports.io/fixtures"
         req_params = {
             "league": league_id,
-            "season": season,
-            "status": "FT"
+            "season": season
         }
-        
+
+        if status:
+            req_params["status"] = status
         if date_from:
             req_params["from"] = date_from
         if date_to:
             req_params["to"] = date_to
+        return req_params
 
-        response = requests.get(url, headers=headers, params=req_params)
-        data = response.json()
-
-        if response.status_code != 200 or not data.get("response"):
+    def _parse_fixtures(self, status_code: int, data: dict) -> dict:
+        if status_code != 200 or not data.get("response"):
             return {"error": data.get("errors", "Erro desconhecido")}
 
+        records = data["response"]
+        get_ratings_store().ingest(records)
+
         fixtures = []
-        for fixture in data["response"]:
+        for record in records:
             fixtures.append({
-                "fixture_id": fixture["fixture"]["id"],
-                "date": fixture["fixture"]["date"],
-                "home_team": fixture["teams"]["home"]["name"],
-                "away_team": fixture["teams"]["away"]["name"],
-                "score": fixture["score"]["fulltime"],
-                "status": fixture["fixture"]["status"]["short"]
+                "fixture_id": record.fixture_id,
+                "date": record.date,
+                "home_team": record.home_name,
+                "away_team": record.away_name,
+                "score": {"home": record.home_goals, "away": record.away_goals},
+                "status": record.status
             })
 
         return {"fixtures": fixtures, "total": len(fixtures)}
 
-    def _get_team_recent_matches(self, params: dict, headers: dict) -> dict:
-        """Busca últimos N jogos de um time."""
-        team_name = params.get("team_name")
-        last_n = params.get("last_n_games", 10)
+    def _get_fixtures(self, params: dict, headers: dict) -> dict:
+        """Busca fixtures básicas por liga/temporada."""
+        status_code, data = self._request_fixtures("fixtures", self._fixtures_params(params), headers, params.get("refresh", False))
+        return self._parse_fixtures(status_code, data)
+
+    async def _aget_fixtures(self, params: dict, headers: dict) -> dict:
+        status_code, data = await self._arequest_fixtures("fixtures", self._fixtures_params(params), headers, params.get("refresh", False))
+        return self._parse_fixtures(status_code, data)
+
+    def _sync_league(self, params: dict, headers: dict) -> dict:
+        """Carrega/atualiza no armazém local todos os jogos (de qualquer status) de uma liga/temporada."""
+        league_id = params.get("league_id")
         season = params.get("season", 2024)
-        
-        # Buscar ID do time
-        team_id = self._get_team_id(team_name, headers)
-        if not team_id:
-            return {"error": f"Time '{team_name}' não encontrado"}
 
-        # Buscar jogos do time
-        url = "https://v3.football.api-sports.io/fixtures"
-        req_params = {
+        def fetch(date_from, date_to):
+            req_params = self._fixtures_params({
+                "league_id": league_id,
+                "season": season,
+                "date_from": date_from,
+                "date_to": date_to,
+                "status": None
+            })
+            data = self._request_fixtures("fixtures", req_params, headers, refresh=True)[1]
+            get_ratings_store().ingest(data["response"])
+            return data
+
+        return get_fixture_store().sync_league(league_id, season, fetch)
+
+    # ------------------------------------------------------------------
+    # Ação 2: jogos recentes de um time
+    # ------------------------------------------------------------------
+
+    def _competitions_params(self, team_id: int, params: dict) -> dict:
+        return {"team": team_id, "season": params.get("season", 2024)}
+
+    def _may_use_local_recent(self, team_id: int, params: dict) -> bool:
+        # Checagem barata antes de perguntar à API as competições do time
+        return not params.get("refresh") and get_fixture_store().covers(team_id, params.get("season", 2024), RECENT_MAX_AGE)
+
+    def _local_recent_from(self, team_id: int, params: dict, status_code: int, data: dict):
+        """Jogos recentes do armazém local, só se todas as competições do time na temporada
+        (/leagues?team=&season=) estiverem sincronizadas há pouco; senão None (vai à API).
+
+        Com uma copa ou torneio continental fora do armazém, os "últimos N" locais
+        seriam diferentes dos da busca team=&season=&last= da API.
+        """
+        season = params.get("season", 2024)
+        competitions = [item["league"]["id"] for item in data.get("response") or []]
+        store = get_fixture_store()
+        if status_code != 200 or not competitions or not store.synced_all(competitions, season, RECENT_MAX_AGE):
+            return None
+        return {"response": store.recent(team_id, params.get("last_n_games", 10), season)}
+
+    def _local_recent_matches(self, team_id: int, params: dict, headers: dict):
+        if not self._may_use_local_recent(team_id, params):
+            return None
+        status_code, data = self._request("leagues", self._competitions_params(team_id, params), headers)
+        return self._local_recent_from(team_id, params, status_code, data)
+
+    async def _alocal_recent_matches(self, team_id: int, params: dict, headers: dict):
+        if not self._may_use_local_recent(team_id, params):
+            return None
+        status_code, data = await self._arequest("leagues", self._competitions_params(team_id, params), headers)
+        return self._local_recent_from(team_id, params, status_code, data)
+
+    def _recent_matches_params(self, team_id: int, params: dict) -> dict:
+        return {
             "team": team_id,
-            "season": season,
-            "last": last_n,
+            "season": params.get("season", 2024),
+            "last": params.get("last_n_games", 10),
             "status": "FT"
         }
 
-        response = requests.get(url, headers=headers, params=req_params)
-        data = response.json()
-
-        if response.status_code != 200:
+    def _parse_recent_matches(self, team_name: str, team_id: int, status_code: int, data: dict) -> dict:
+        if status_code != 200:
             return {"error": "Erro ao buscar jogos do time"}
 
+        records = data.get("response", [])
+        get_ratings_store().ingest(records)
         matches = []
-        stats = {
-            "gols_marcados": 0,
-            "gols_sofridos": 0,
-            "vitorias": 0,
-            "empates": 0,
-            "derrotas": 0
-        }
 
-        for fixture in data.get("response", []):
-            home = fixture["teams"]["home"]
-            away = fixture["teams"]["away"]
-            score = fixture["score"]["fulltime"]
-            
-            is_home = home["name"] == team_name
-            team_goals = score["home"] if is_home else score["away"]
-            opponent_goals = score["away"] if is_home else score["home"]
-            opponent = away["name"] if is_home else home["name"]
-            
-            stats["gols_marcados"] += team_goals or 0
-            stats["gols_sofridos"] += opponent_goals or 0
-            
+        for record in records:
+            is_home = record.home_id == team_id
+            team_goals = record.home_goals if is_home else record.away_goals
+            opponent_goals = record.away_goals if is_home else record.home_goals
+            opponent = record.away_name if is_home else record.home_name
+
+            if team_goals is None or opponent_goals is None:
+                continue
+
             if team_goals > opponent_goals:
-                stats["vitorias"] += 1
                 result = "V"
             elif team_goals < opponent_goals:
-                stats["derrotas"] += 1
                 result = "D"
             else:
-                stats["empates"] += 1
                 result = "E"
 
             matches.append({
-                "date": fixture["fixture"]["date"],
+                "fixture_id": record.fixture_id,
+                "date": record.date,
                 "opponent": opponent,
                 "home_away": "Casa" if is_home else "Fora",
                 "result": result,
@@ -179,121 +585,549 @@ class FootballAPI(BaseTool):
                 "opponent_goals": opponent_goals
             })
 
-        stats["total_jogos"] = len(matches)
-        stats["media_gols_marcados"] = round(stats["gols_marcados"] / max(len(matches), 1), 2)
-        stats["media_gols_sofridos"] = round(stats["gols_sofridos"] / max(len(matches), 1), 2)
-        stats["aproveitamento"] = round((stats["vitorias"] * 3 + stats["empates"]) / (len(matches) * 3) * 100, 1)
+        table = team_stats(FixtureBatch.from_records(records), team_ids=[team_id])
+        stats = team_summary(table, team_id)
 
         return {
             "team": team_name,
+            "team_id": team_id,
             "matches": matches,
             "statistics": stats
         }
 
-    def _get_head_to_head(self, params: dict, headers: dict) -> dict:
-        """Busca histórico de confrontos entre dois times."""
-        team1_name = params.get("team1")
-        team2_name = params.get("team2")
-        
-        team1_id = self._get_team_id(team1_name, headers)
-        team2_id = self._get_team_id(team2_name, headers)
-        
-        if not team1_id or not team2_id:
-            return {"error": "Um dos times não foi encontrado"}
+    def _get_team_recent_matches(self, params: dict, headers: dict) -> dict:
+        """Busca últimos N jogos de um time."""
+        team_name = params.get("team_name")
 
-        url = "https://v3.football.api-sports.io/fixtures/headtohead"
-        req_params = {
+        # Buscar ID do time
+        team_id = self._get_team_id(team_name, headers)
+        if not team_id:
+            return {"error": f"Time '{team_name}' não encontrado"}
+
+        local = self._local_recent_matches(team_id, params, headers)
+        if local is not None:
+            return self._parse_recent_matches(team_name, team_id, 200, local)
+
+        # Buscar jogos do time
+        status_code, data = self._request_fixtures("fixtures", self._recent_matches_params(team_id, params), headers, params.get("refresh", False))
+        return self._parse_recent_matches(team_name, team_id, status_code, data)
+
+    async def _aget_team_recent_matches(self, params: dict, headers: dict) -> dict:
+        team_name = params.get("team_name")
+
+        team_id = await self._aget_team_id(team_name, headers)
+        if not team_id:
+            return {"error": f"Time '{team_name}' não encontrado"}
+
+        local = await self._alocal_recent_matches(team_id, params, headers)
+        if local is not None:
+            return self._parse_recent_matches(team_name, team_id, 200, local)
+
+        status_code, data = await self._arequest_fixtures("fixtures", self._recent_matches_params(team_id, params), headers, params.get("refresh", False))
+        return self._parse_recent_matches(team_name, team_id, status_code, data)
+
+    # ------------------------------------------------------------------
+    # Ação 3: confronto direto
+    # ------------------------------------------------------------------
+
+    def _head_to_head_params(self, team1_id: int, team2_id: int) -> dict:
+        return {
             "h2h": f"{team1_id}-{team2_id}",
             "last": 10
         }
 
-        response = requests.get(url, headers=headers, params=req_params)
-        data = response.json()
+    def _stored_head_to_head(self, team1_id: int, team2_id: int, params: dict):
+        """Confrontos guardados, se o armazém tem o histórico pedido e os dois times sincronizados
+        há pouco (checagem barata, sem API); senão None."""
+        store = get_fixture_store()
+        season = params.get("season", 2024)
+        if params.get("refresh") or not all(store.covers(team_id, season, RECENT_MAX_AGE) for team_id in (team1_id, team2_id)):
+            return None
+        last = self._head_to_head_params(team1_id, team2_id)["last"]
+        fixtures = store.head_to_head(team1_id, team2_id, last)
+        return fixtures if len(fixtures) >= last else None
+
+    def _local_head_to_head_from(self, fixtures: list, params: dict, answers: list):
+        """Confrontos do armazém local, só se todas as competições dos dois times na temporada
+        (respostas de /leagues?team=&season=) estiverem sincronizadas há pouco; senão None (vai à API).
+
+        Um confronto recente numa copa fora do armazém ficaria de fora dos "últimos N" locais.
+        """
+        competitions = []
+        for status_code, data in answers:
+            if status_code != 200:
+                return None
+            competitions += [item["league"]["id"] for item in data.get("response") or []]
+        if not competitions or not get_fixture_store().synced_all(competitions, params.get("season", 2024), RECENT_MAX_AGE):
+            return None
+        return {"response": fixtures}
+
+    def _local_head_to_head(self, team1_id: int, team2_id: int, params: dict, headers: dict):
+        fixtures = self._stored_head_to_head(team1_id, team2_id, params)
+        if fixtures is None:
+            return None
+        answers = [self._request("leagues", self._competitions_params(team_id, params), headers)
+                   for team_id in (team1_id, team2_id)]
+        return self._local_head_to_head_from(fixtures, params, answers)
+
+    async def _alocal_head_to_head(self, team1_id: int, team2_id: int, params: dict, headers: dict):
+        fixtures = self._stored_head_to_head(team1_id, team2_id, params)
+        if fixtures is None:
+            return None
+        answers = await asyncio.gather(*[
+            self._arequest("leagues", self._competitions_params(team_id, params), headers)
+            for team_id in (team1_id, team2_id)
+        ])
+        return self._local_head_to_head_from(fixtures, params, answers)
 
-        if response.status_code != 200:
+    def _parse_head_to_head(self, team1_name: str, team2_name: str, team1_id: int, team2_id: int,
+                            status_code: int, data: dict) -> dict:
+        if status_code != 200:
             return {"error": "Erro ao buscar confrontos diretos"}
 
+        records = data.get("response", [])
+        get_ratings_store().ingest(records)
         matches = []
-        stats = {
-            "vitorias_team1": 0,
-            "vitorias_team2": 0,
-            "empates": 0,
-            "gols_team1": 0,
-            "gols_team2": 0
-        }
-
-        for fixture in data.get("response", []):
-            home = fixture["teams"]["home"]["name"]
-            away = fixture["teams"]["away"]["name"]
-            score = fixture["score"]["fulltime"]
-            
-            if home == team1_name:
-                t1_goals, t2_goals = score["home"], score["away"]
-            else:
-                t1_goals, t2_goals = score["away"], score["home"]
-            
-            stats["gols_team1"] += t1_goals or 0
-            stats["gols_team2"] += t2_goals or 0
-            
-            if t1_goals > t2_goals:
-                stats["vitorias_team1"] += 1
-            elif t1_goals < t2_goals:
-                stats["vitorias_team2"] += 1
-            else:
-                stats["empates"] += 1
 
+        for record in records:
             matches.append({
-                "date": fixture["fixture"]["date"],
-                "home": home,
-                "away": away,
-                "score": f"{score['home']}-{score['away']}"
+                "fixture_id": record.fixture_id,
+                "date": record.date,
+                "home": record.home_name,
+                "away": record.away_name,
+                "score": record.score
             })
 
+        # Estatísticas do ponto de vista do team1
+        team1 = team_summary(team_stats(FixtureBatch.from_records(records), team_ids=[team1_id]), team1_id)
+        stats = {
+            "vitorias_team1": team1["vitorias"],
+            "vitorias_team2": team1["derrotas"],
+            "empates": team1["empates"],
+            "gols_team1": team1["gols_marcados"],
+            "gols_team2": team1["gols_sofridos"],
+            "btts_pct": team1["btts_pct"],
+            "over_2_5_pct": team1["over_2_5_pct"]
+        }
+
         return {
             "team1": team1_name,
             "team2": team2_name,
+            "team1_id": team1_id,
+            "team2_id": team2_id,
             "matches": matches,
             "statistics": stats
         }
 
-    def _get_upcoming_matches(self, params: dict, headers: dict) -> dict:
-        """Busca próximos jogos de um time."""
-        team_name = params.get("team_name")
-        next_n = params.get("next_n_games", 5)
-        
-        team_id = self._get_team_id(team_name, headers)
-        if not team_id:
-            return {"error": f"Time '{team_name}' não encontrado"}
+    def _get_head_to_head(self, params: dict, headers: dict) -> dict:
+        """Busca histórico de confrontos entre dois times."""
+        team1_name = params.get("team1")
+        team2_name = params.get("team2")
 
-        url = "https://v3.football.api-sports.io/fixtures"
-        req_params = {
+        team1_id = self._get_team_id(team1_name, headers)
+        team2_id = self._get_team_id(team2_name, headers)
+
+        if not team1_id or not team2_id:
+            return {"error": "Um dos times não foi encontrado"}
+
+        local = self._local_head_to_head(team1_id, team2_id, params, headers)
+        if local is not None:
+            return self._parse_head_to_head(team1_name, team2_name, team1_id, team2_id, 200, local)
+
+        status_code, data = self._request_fixtures("fixtures/headtohead", self._head_to_head_params(team1_id, team2_id), headers, params.get("refresh", False))
+        return self._parse_head_to_head(team1_name, team2_name, team1_id, team2_id, status_code, data)
+
+    async def _aget_head_to_head(self, params: dict, headers: dict) -> dict:
+        team1_name = params.get("team1")
+        team2_name = params.get("team2")
+
+        team1_id, team2_id = await asyncio.gather(
+            self._aget_team_id(team1_name, headers),
+            self._aget_team_id(team2_name, headers)
+        )
+
+        if not team1_id or not team2_id:
+            return {"error": "Um dos times não foi encontrado"}
+
+        local = await self._alocal_head_to_head(team1_id, team2_id, params, headers)
+        if local is not None:
+            return self._parse_head_to_head(team1_name, team2_name, team1_id, team2_id, 200, local)
+
+        status_code, data = await self._arequest_fixtures("fixtures/headtohead", self._head_to_head_params(team1_id, team2_id), headers, params.get("refresh", False))
+        return self._parse_head_to_head(team1_name, team2_name, team1_id, team2_id, status_code, data)
+
+    # ------------------------------------------------------------------
+    # Ação 4: próximos jogos
+    # ------------------------------------------------------------------
+
+    def _upcoming_matches_params(self, team_id: int, params: dict) -> dict:
+        return {
             "team": team_id,
-            "next": next_n
+            "next": params.get("next_n_games", 5)
         }
 
-        response = requests.get(url, headers=headers, params=req_params)
-        data = response.json()
+    def _may_use_local_upcoming(self, team_id: int, params: dict) -> bool:
+        return not params.get("refresh") and get_fixture_store().covers(team_id, params.get("season", 2024), UPCOMING_MAX_AGE)
+
+    def _local_upcoming_from(self, team_id: int, params: dict, status_code: int, data: dict):
+        """Próximos jogos do armazém local, só se a agenda de todas as competições do time na
+        temporada (/leagues?team=&season=) estiver recente; senão None (vai à API)."""
+        if status_code != 200:
+            return None
+        competitions = [item["league"]["id"] for item in data.get("response") or []]
+        fixtures = get_fixture_store().upcoming(team_id, params.get("next_n_games", 5), competitions, params.get("season", 2024))
+        return {"response": fixtures} if fixtures is not None else None
+
+    def _local_upcoming_matches(self, team_id: int, params: dict, headers: dict):
+        if not self._may_use_local_upcoming(team_id, params):
+            return None
+        status_code, data = self._request("leagues", self._competitions_params(team_id, params), headers)
+        return self._local_upcoming_from(team_id, params, status_code, data)
+
+    async def _alocal_upcoming_matches(self, team_id: int, params: dict, headers: dict):
+        if not self._may_use_local_upcoming(team_id, params):
+            return None
+        status_code, data = await self._arequest("leagues", self._competitions_params(team_id, params), headers)
+        return self._local_upcoming_from(team_id, params, status_code, data)
 
+    def _parse_upcoming_matches(self, team_name: str, data: dict) -> dict:
         upcoming = []
-        for fixture in data.get("response", []):
+        for record in data.get("response", []):
             upcoming.append({
-                "date": fixture["fixture"]["date"],
-                "home_team": fixture["teams"]["home"]["name"],
-                "away_team": fixture["teams"]["away"]["name"],
-                "league": fixture["league"]["name"]
+                "date": record.date,
+                "home_team": record.home_name,
+                "away_team": record.away_name,
+                "league": record.league_name
             })
 
         return {"team": team_name, "upcoming_matches": upcoming}
 
+    def _get_upcoming_matches(self, params: dict, headers: dict) -> dict:
+        """Busca próximos jogos de um time."""
+        team_name = params.get("team_name")
+
+        team_id = self._get_team_id(team_name, headers)
+        if not team_id:
+            return {"error": f"Time '{team_name}' não encontrado"}
+
+        local = self._local_upcoming_matches(team_id, params, headers)
+        if local is not None:
+            return self._parse_upcoming_matches(team_name, local)
+
+        _, data = self._request_fixtures("fixtures", self._upcoming_matches_params(team_id, params), headers, params.get("refresh", False))
+        return self._parse_upcoming_matches(team_name, data)
+
+    async def _aget_upcoming_matches(self, params: dict, headers: dict) -> dict:
+        team_name = params.get("team_name")
+
+        team_id = await self._aget_team_id(team_name, headers)
+        if not team_id:
+            return {"error": f"Time '{team_name}' não encontrado"}
+
+        local = await self._alocal_upcoming_matches(team_id, params, headers)
+        if local is not None:
+            return self._parse_upcoming_matches(team_name, local)
+
+        _, data = await self._arequest_fixtures("fixtures", self._upcoming_matches_params(team_id, params), headers, params.get("refresh", False))
+        return self._parse_upcoming_matches(team_name, data)
+
+    # ------------------------------------------------------------------
+    # Ação 5: estatísticas de uma partida
+    # ------------------------------------------------------------------
+
     def _get_match_statistics(self, params: dict, headers: dict) -> dict:
         """Busca estatísticas detalhadas de uma partida."""
         fixture_id = params.get("fixture_id")
-        
-        url = "https://v3.football.api-sports.io/fixtures/statistics"
-        response = requests.get(url, headers=headers, params={"fixture": fixture_id})
-        data = response.json()
+
+        _, data = self._request("fixtures/statistics", {"fixture": fixture_id}, headers, params.get("refresh", False))
+
+        return data.get("response", {})
+
+    async def _aget_match_statistics(self, params: dict, headers: dict) -> dict:
+        fixture_id = params.get("fixture_id")
+
+        _, data = await self._arequest("fixtures/statistics", {"fixture": fixture_id}, headers, params.get("refresh", False))
 
         return data.get("response", {})
 
-    async def _arun(self, query: str):
-        raise NotImplementedError("Execução assíncrona não suportada.")
\ No newline at end of file
+    # ------------------------------------------------------------------
+    # Ação 9: estatísticas detalhadas em lote
+    # ------------------------------------------------------------------
+
+    def _statistics_request_ids(self, params: dict):
+        """IDs pedidos (lista ou "1-2-3") e os que faltam no armazém local (marcadores de
+        jogo sem estatísticas contam como guardados)."""
+        ids = params.get("fixture_ids") or []
+        if isinstance(ids, str):
+            ids = ids.split("-")
+        ids = list(dict.fromkeys(int(fixture_id) for fixture_id in ids))
+        stored = {} if params.get("refresh") else get_fixture_store().statistics(ids)
+        return ids, stored, [fixture_id for fixture_id in ids if fixture_id not in stored]
+
+    def _collect_statistics(self, ids: list, records: dict, responses: list) -> dict:
+        """Normaliza as respostas de /fixtures?ids=, guarda as de jogos encerrados e monta a saída.
+
+        Jogos encerrados sem estatísticas também são guardados (como marcador), para
+        não voltarem à API; na saída aparecem em "sem_estatisticas".
+        """
+        finished = {}
+        for data in responses:
+            for fixture in data.get("response") or []:
+                record = normalize_fixture(fixture) or no_statistics_record(fixture)
+                if record is None:
+                    continue
+                records[record["fixture_id"]] = record
+                if record["finished"]:
+                    finished[record["fixture_id"]] = record
+        if finished:
+            get_fixture_store().save_statistics(finished)
+
+        errors = [data["errors"] for data in responses if data.get("errors")]
+        if errors and not records:
+            return {"error": errors[0]}
+        return {
+            "statistics": {str(fixture_id): records[fixture_id] for fixture_id in ids
+                           if fixture_id in records and has_statistics(records[fixture_id])},
+            "sem_estatisticas": [fixture_id for fixture_id in ids
+                                 if fixture_id in records and not has_statistics(records[fixture_id])],
+            "missing": [fixture_id for fixture_id in ids if fixture_id not in records]
+        }
+
+    def _enrich_match_statistics(self, params: dict, headers: dict) -> dict:
+        """Estatísticas de vários jogos com /fixtures?ids= (até 20 por chamada); jogos já guardados não gastam cota."""
+        ids, records, missing = self._statistics_request_ids(params)
+        responses = [
+            self._request("fixtures", {"ids": "-".join(map(str, chunk))}, headers, params.get("refresh", False), store=False)[1]
+            for chunk in chunks(missing)
+        ]
+        return self._collect_statistics(ids, records, responses)
+
+    async def _aenrich_match_statistics(self, params: dict, headers: dict) -> dict:
+        ids, records, missing = self._statistics_request_ids(params)
+        results = await asyncio.gather(*[
+            self._arequest("fixtures", {"ids": "-".join(map(str, chunk))}, headers, params.get("refresh", False), store=False)
+            for chunk in chunks(missing)
+        ])
+        return self._collect_statistics(ids, records, [data for _, data in results])
+
+    def _with_statistics(self, result: dict, params: dict, headers: dict) -> dict:
+        """Com with_statistics, junta escanteios/cartões/chutes/xG aos jogos do resultado."""
+        if not params.get("with_statistics") or not isinstance(result, dict) or "error" in result:
+            return result
+        enrichment = self._enrich_match_statistics({"fixture_ids": fixture_ids([result])}, headers)
+        return attach(result, enrichment.get("statistics", {}))
+
+    async def _awith_statistics(self, result: dict, params: dict, headers: dict) -> dict:
+        if not params.get("with_statistics") or not isinstance(result, dict) or "error" in result:
+            return result
+        enrichment = await self._aenrich_match_statistics({"fixture_ids": fixture_ids([result])}, headers)
+        return attach(result, enrichment.get("statistics", {}))
+
+    # ------------------------------------------------------------------
+    # Ações 10/11: ratings dos times
+    # ------------------------------------------------------------------
+
+    def _get_team_rating(self, params: dict, headers: dict) -> dict:
+        """Rating e forma mantidos localmente; não consulta jogos na API (só a busca do time, se desconhecido)."""
+        team_name = params.get("team_name")
+        team_id = params.get("team_id") or self._get_team_id(team_name, headers)
+        if not team_id:
+            return {"error": f"Time '{team_name}' não encontrado"}
+
+        rating = get_ratings_store().get(team_id)
+        if rating is None:
+            return {"error": f"Sem jogos avaliados para '{team_name or team_id}'"}
+        return {"team": team_name or rating["name"], **rating}
+
+    def _rebuild_ratings(self) -> dict:
+        """Recalcula os ratings do zero com todos os jogos encerrados do armazém local.
+
+        O recálculo substitui o estado inteiro, então usa o histórico completo
+        (sem filtro de liga) e recusa rodar com o armazém vazio.
+        """
+        fixtures = get_fixture_store().finished()
+        if not fixtures:
+            return {"error": "Armazém local sem jogos encerrados; sincronize as ligas (sync_league) antes"}
+        store = get_ratings_store()
+        before = store.verify(fixtures)
+        return {"verificacao_antes": before, **store.rebuild(fixtures)}
+
+    # ------------------------------------------------------------------
+    # Ações 12/13: probabilidades do modelo Dixon-Coles
+    # ------------------------------------------------------------------
+
+    def _local_prediction_history(self, team1_id: int, team2_id: int, params: dict):
+        """Jogos encerrados da temporada no armazém local, se os dois times estiverem cobertos."""
+        season = params.get("season", 2024)
+        store = get_fixture_store()
+        if params.get("refresh") or not (store.covers(team1_id, season) and store.covers(team2_id, season)):
+            return None
+        return store.finished(params.get("league_id"), season) or None
+
+    def _match_prediction(self, team1_name: str, team2_name: str, team1_id: int, team2_id: int, history: list) -> dict:
+        try:
+            model = DixonColesModel.fit(history)
+        except ValueError as e:
+            return {"error": str(e)}
+        prediction = model.predict([team1_id], [team2_id])[0]
+        return {"home": team1_name, "away": team2_name, "modelo": model.describe(), **prediction}
+
+    def _predict_match(self, params: dict, headers: dict) -> dict:
+        """Probabilidades dos mercados do jogo team1 (mandante) x team2.
+
+        O ajuste usa a temporada inteira do armazém local quando os dois times
+        estão cobertos; senão os jogos recentes de cada um e o confronto direto,
+        com os mesmos parâmetros da coleta (respostas já em cache).
+        """
+        team1_name = params.get("team1")
+        team2_name = params.get("team2")
+
+        team1_id = self._get_team_id(team1_name, headers)
+        team2_id = self._get_team_id(team2_name, headers)
+        if not team1_id or not team2_id:
+            return {"error": "Um dos times não foi encontrado"}
+
+        history = self._local_prediction_history(team1_id, team2_id, params)
+        if history is None:
+            refresh = params.get("refresh", False)
+            history = []
+            for endpoint, req_params in (
+                ("fixtures", self._recent_matches_params(team1_id, params)),
+                ("fixtures", self._recent_matches_params(team2_id, params)),
+                ("fixtures/headtohead", self._head_to_head_params(team1_id, team2_id))
+            ):
+                history += self._request_fixtures(endpoint, req_params, headers, refresh)[1]["response"]
+        return self._match_prediction(team1_name, team2_name, team1_id, team2_id, history)
+
+    async def _apredict_match(self, params: dict, headers: dict) -> dict:
+        team1_name = params.get("team1")
+        team2_name = params.get("team2")
+
+        team1_id, team2_id = await asyncio.gather(
+            self._aget_team_id(team1_name, headers),
+            self._aget_team_id(team2_name, headers)
+        )
+        if not team1_id or not team2_id:
+            return {"error": "Um dos times não foi encontrado"}
+
+        history = self._local_prediction_history(team1_id, team2_id, params)
+        if history is None:
+            refresh = params.get("refresh", False)
+            responses = await asyncio.gather(
+                self._arequest_fixtures("fixtures", self._recent_matches_params(team1_id, params), headers, refresh),
+                self._arequest_fixtures("fixtures", self._recent_matches_params(team2_id, params), headers, refresh),
+                self._arequest_fixtures("fixtures/headtohead", self._head_to_head_params(team1_id, team2_id), headers, refresh)
+            )
+            history = [record for _, data in responses for record in data["response"]]
+        return self._match_prediction(team1_name, team2_name, team1_id, team2_id, history)
+
+    def _predict_league(self, params: dict, headers: dict) -> dict:
+        """Probabilidades de todos os jogos agendados da liga/temporada, num único ajuste e numa
+        única passada vetorizada. Sincroniza a liga no armazém local se ainda não foi."""
+        league_id = params.get("league_id")
+        season = params.get("season", 2024)
+        store = get_fixture_store()
+
+        if store.sync_state(league_id, season) is None:
+            synced = self._sync_league(params, headers)
+            if "error" in synced:
+                return synced
+
+        # A temporada anterior (se sincronizada) ajuda no começo do campeonato; o decaimento a pondera
+        history = store.finished(league_id, int(season) - 1) + store.finished(league_id, season)
+        try:
+            model = DixonColesModel.fit(history)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        upcoming = store.scheduled(league_id, season)
+        if params.get("next_n_games"):
+            upcoming = upcoming[:params["next_n_games"]]
+        predictions = model.predict(
+            [record.home_id for record in upcoming],
+            [record.away_id for record in upcoming]
+        ) if upcoming else []
+
+        return {
+            "league_id": league_id,
+            "season": season,
+            "modelo": model.describe(),
+            "previsoes": [
+                {
+                    "fixture_id": record.fixture_id,
+                    "date": record.date,
+                    "home": record.home_name,
+                    "away": record.away_name,
+                    **prediction
+                }
+                for record, prediction in zip(upcoming, predictions)
+            ],
+            "total": len(upcoming)
+        }
+
+    # ------------------------------------------------------------------
+    # Ações 14-16: classificação e rankings da liga
+    # ------------------------------------------------------------------
+
+    def _league_fixtures(self, params: dict, headers: dict) -> dict:
+        """Jogos encerrados da liga/temporada: do armazém local se sincronizada; senão uma única
+        chamada /fixtures pelo mesmo caminho de get_fixtures (liga/temporada, status FT)."""
+        league_id = params.get("league_id")
+        season = params.get("season", 2024)
+        store = get_fixture_store()
+        if not params.get("refresh") and store.sync_state(league_id, season) is not None:
+            fixtures = store.finished(league_id, season)
+            if fixtures:
+                return {"response": fixtures}
+
+        req_params = self._fixtures_params({"league_id": league_id, "season": season})
+        status_code, data = self._request_fixtures("fixtures", req_params, headers, params.get("refresh", False))
+        if status_code != 200 or not data.get("response"):
+            return {"error": data.get("errors") or f"Nenhum jogo encerrado da liga {league_id} em {season}"}
+
+        get_ratings_store().ingest(data["response"])
+        return data
+
+    def _league_result(self, params: dict, headers: dict, kind: str, market: str = None) -> dict:
+        data = self._league_fixtures(params, headers)
+        if "error" in data:
+            return data
+
+        records = data["response"]
+        names = {}
+        for record in records:
+            names[record.home_id] = record.home_name
+            names[record.away_id] = record.away_name
+
+        window = params.get("last_n_games") or (5 if kind == "forma" else None)
+        table = team_stats(FixtureBatch.from_records(records), window)
+        ascending = bool(market and params.get("ascending"))
+        order = market_order(table, market, ascending) if market else standings_order(table)
+
+        return {
+            "league_id": params.get("league_id"),
+            "season": params.get("season", 2024),
+            "tipo": kind,
+            "mercado": market,
+            "crescente": ascending,
+            "ultimos_jogos": window,
+            "jogos_liga": len(records),
+            "ranking": league_rows(table, order, names, market)[:params.get("top") or None]
+        }
+
+    def _league_table(self, params: dict, headers: dict) -> dict:
+        """Classificação calculada dos jogos encerrados (pontos, vitórias, saldo, gols marcados)."""
+        return self._league_result(params, headers, "tabela")
+
+    def _league_form(self, params: dict, headers: dict) -> dict:
+        """Ranking de forma: pontos nos últimos N jogos de cada time (padrão 5)."""
+        return self._league_result(params, headers, "forma")
+
+    def _league_markets(self, params: dict, headers: dict) -> dict:
+        """Times que mais (ou, com ascending, menos) batem um mercado (btts, clean_sheets, sem_marcar,
+        over_X_5) em % dos jogos, ou que mais marcam/sofrem gols por jogo (gols_marcados, gols_sofridos)."""
+        market = params.get("market")
+        markets = LEAGUE_MARKETS + LEAGUE_GOAL_RANKINGS
+        if market not in markets:
+            return {"error": f"Mercado '{market}' não suportado. Use um de: {', '.join(markets)}"}
+        return self._league_result(params, headers, "mercado", market)
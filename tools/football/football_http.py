@@ -0,0 +1,467 @@
+import os
+import time
+import random
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tools.telemetry.telemetry import get_telemetry
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MINUTE_WINDOW = 60.0
+
+# Prioridades das chamadas (menor = mais urgente)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_PREFETCH = 2
+
+# Fração da cota diária que cada prioridade deixa para as mais urgentes: abaixo
+# dela a chamada é recusada (QuotaExceededError) e o chamador recorre ao cache vencido
+DAILY_RESERVE = {PRIORITY_INTERACTIVE: 0.0, PRIORITY_BATCH: 0.10, PRIORITY_PREFETCH: 0.25}
+# Faixa acima da reserva em que o cache vencido é preferido a gastar cota
+LOW_BUDGET_MARGIN = 0.05
+# Intervalo de nova tentativa de quem cede a vez para uma prioridade maior
+YIELD_INTERVAL = 0.1
+
+_priority = contextvars.ContextVar("football_api_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Define a prioridade das chamadas à API feitas dentro do bloco (propaga para tarefas/threads com contexto copiado)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class QuotaExceededError(Exception):
+    """A cota diária da API-Football acabou; novas chamadas seriam rejeitadas."""
+
+
+class RateLimitState:
+    """Estado de cota lido dos cabeçalhos da API-Football.
+
+    - x-ratelimit-requests-limit / x-ratelimit-requests-remaining: cota diária
+    - X-RateLimit-Limit / X-RateLimit-Remaining: cota por minuto
+
+    Também ordena quem espera vaga na janela por minuto: enquanto houver chamadas
+    de prioridade maior esperando, as de prioridade menor cedem a vez.
+    """
+
+    def __init__(self, minute_reserve: int = 1, daily_reserve: dict = None):
+        self.minute_reserve = minute_reserve
+        self.daily_reserve = dict(DAILY_RESERVE if daily_reserve is None else daily_reserve)
+        self.waiting = {}
+        self.daily_limit = None
+        self.daily_remaining = None
+        self.daily_day = None
+        self.minute_limit = None
+        self.minute_remaining = None
+        self.sent = deque()
+        self._lock = threading.Lock()
+
+    def update(self, headers):
+        with self._lock:
+            self.daily_limit = _int_header(headers, "x-ratelimit-requests-limit", self.daily_limit)
+            self.daily_remaining = _int_header(headers, "x-ratelimit-requests-remaining", self.daily_remaining)
+            self.minute_limit = _int_header(headers, "X-RateLimit-Limit", self.minute_limit)
+            self.minute_remaining = _int_header(headers, "X-RateLimit-Remaining", self.minute_remaining)
+            self.daily_day = _utc_today()
+
+    def _daily_floor(self, priority: int) -> float:
+        if not self.daily_limit:
+            return 0
+        return self.daily_limit * self.daily_reserve.get(priority, 0.0)
+
+    def _roll_day(self):
+        # A cota diária da API-Football reinicia à meia-noite UTC
+        if self.daily_day is not None and self.daily_day != _utc_today():
+            self.daily_remaining = None
+
+    def budget_low(self, priority: int = PRIORITY_INTERACTIVE) -> bool:
+        """True quando a cota diária restante está perto da reserva desta prioridade."""
+        with self._lock:
+            self._roll_day()
+            if self.daily_remaining is None:
+                return False
+            margin = self.daily_limit * LOW_BUDGET_MARGIN if self.daily_limit else 0
+            return self.daily_remaining <= self._daily_floor(priority) + margin
+
+    def exhaust(self):
+        """Marca a cota diária como esgotada (a API respondeu com erro de limite)."""
+        with self._lock:
+            self.daily_remaining = 0
+            self.daily_day = _utc_today()
+
+    def enqueue(self, priority: int):
+        with self._lock:
+            self.waiting[priority] = self.waiting.get(priority, 0) + 1
+
+    def dequeue(self, priority: int):
+        with self._lock:
+            self.waiting[priority] -= 1
+            if not self.waiting[priority]:
+                del self.waiting[priority]
+
+    def reserve(self, priority: int = PRIORITY_INTERACTIVE) -> float:
+        """Registra um envio e retorna 0, ou retorna quantos segundos esperar antes de enviar."""
+        now = time.time()
+        with self._lock:
+            self._roll_day()
+            if self.daily_remaining is not None and self.daily_remaining <= self._daily_floor(priority):
+                if self.daily_remaining <= 0:
+                    raise QuotaExceededError("Cota diária da API-Football esgotada")
+                raise QuotaExceededError("Cota diária restante reservada para consultas de maior prioridade")
+
+            while self.sent and now - self.sent[0] >= MINUTE_WINDOW:
+                self.sent.popleft()
+
+            wait = 0.0
+            if self.minute_limit and len(self.sent) >= self.minute_limit - self.minute_reserve:
+                wait = self.sent[0] + MINUTE_WINDOW - now
+            elif self.minute_remaining is not None and self.minute_remaining <= self.minute_reserve:
+                wait = (self.sent[0] + MINUTE_WINDOW - now) if self.sent else MINUTE_WINDOW
+                # Depois de esperar a janela, o valor do cabeçalho deixa de valer
+                self.minute_remaining = None
+
+            if wait > 0:
+                return wait
+            if any(count for level, count in self.waiting.items() if level < priority):
+                return YIELD_INTERVAL
+
+            self.sent.append(now)
+            if self.minute_remaining is not None:
+                self.minute_remaining -= 1
+            if self.daily_remaining is not None:
+                self.daily_remaining -= 1
+            return 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "daily_limit": self.daily_limit,
+                "daily_remaining": self.daily_remaining,
+                "minute_limit": self.minute_limit,
+                "minute_remaining": self.minute_remaining,
+                "waiting": dict(self.waiting)
+            }
+
+
+class SingleFlight:
+    """Deduplica chamadas em andamento: quem pede a mesma chave enquanto outra chamada
+    com ela está em voo espera o resultado dessa chamada em vez de repetir o trabalho.
+
+    Serve chamadores em threads (do) e em corrotinas (ado) com o mesmo registro; uma
+    corrotina pode esperar uma chamada feita por thread e vice-versa. Uma chamada
+    síncrona na mesma thread de quem lidera não espera (seria um deadlock no event loop).
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key, same_thread: bool):
+        """Retorna (future, lider). Sem chamada em voo, registra uma nova e o chamador lidera."""
+        with self._lock:
+            entry = self.calls.get(key)
+            if entry is not None and (same_thread or entry[1] != threading.get_ident()):
+                return entry[0], False
+            future = Future()
+            if entry is None:
+                self.calls[key] = (future, threading.get_ident())
+            return future, True
+
+    def _finish(self, key, future: Future, result=None, error: BaseException = None):
+        with self._lock:
+            entry = self.calls.get(key)
+            if entry is not None and entry[0] is future:
+                del self.calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn):
+        """Executa fn() ou espera a chamada em voo com a mesma chave. Retorna (resultado, compartilhado)."""
+        future, leader = self._join(key, same_thread=False)
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result, False
+
+    async def ado(self, key, factory):
+        """Versão assíncrona de do(); `factory()` cria a corrotina só se esta chamada liderar."""
+        future, leader = self._join(key, same_thread=True)
+        if not leader:
+            return await asyncio.wrap_future(future), True
+        try:
+            result = await factory()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result, False
+
+
+class FootballHTTPClient:
+    """Transporte compartilhado: pool keep-alive, timeouts, retries com backoff e controle de cota."""
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 3.05, read_timeout: float = 15.0,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 minute_reserve: int = 1):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate = RateLimitState(minute_reserve)
+        self.stats = {"requests": 0, "retries": 0, "throttled_seconds": 0.0, "coalesced": 0, "stale_served": 0}
+        self._stats_lock = threading.Lock()
+        # Registro de requisições em voo, compartilhado pelos caminhos síncrono e assíncrono
+        self.inflight = SingleFlight()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _count(self, name: str, value=1):
+        with self._stats_lock:
+            self.stats[name] += value
+        get_telemetry().incr(f"api_{name}_total", value)
+
+    def _throttle(self):
+        priority = current_priority()
+        queued = False
+        try:
+            while True:
+                wait = self.rate.reserve(priority)
+                if wait <= 0:
+                    return
+                if not queued:
+                    self.rate.enqueue(priority)
+                    queued = True
+                self._count("throttled_seconds", wait)
+                time.sleep(wait)
+        finally:
+            if queued:
+                self.rate.dequeue(priority)
+
+    def coalesce(self, key, fn):
+        """fn() uma única vez entre chamadores concorrentes com a mesma chave."""
+        result, shared = self.inflight.do(key, fn)
+        if shared:
+            self._count("coalesced")
+        return result
+
+    async def acoalesce(self, key, factory):
+        """Versão assíncrona de coalesce(); espera também chamadas em voo de threads."""
+        result, shared = await self.inflight.ado(key, factory)
+        if shared:
+            self._count("coalesced")
+        return result
+
+    def _backoff(self, attempt: int, retry_after=None) -> float:
+        """Backoff exponencial com jitter completo; respeita Retry-After quando presente."""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max * 4)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(self, url: str, headers: dict = None, params: dict = None) -> requests.Response:
+        telemetry = get_telemetry()
+        if not telemetry.enabled:
+            return self._get(url, headers, params)
+
+        endpoint = urlsplit(url).path.lstrip("/")
+        with telemetry.span("http.request", endpoint=endpoint) as span:
+            response = self._get(url, headers, params)
+            span.set(status=response.status_code)
+        _record_response(telemetry, endpoint, response.status_code, self.rate)
+        return response
+
+    def _get(self, url: str, headers: dict = None, params: dict = None) -> requests.Response:
+        for attempt in range(self.max_retries + 1):
+            self._throttle()
+            self._count("requests")
+            try:
+                response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                self._count("retries")
+                time.sleep(self._backoff(attempt))
+                continue
+
+            self.rate.update(response.headers)
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self._count("retries")
+                time.sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+                continue
+
+            return response
+
+    def metrics(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["rate_limit"] = self.rate.snapshot()
+        return stats
+
+
+class AsyncFootballHTTPClient:
+    """Versão assíncrona do transporte (httpx), com limite de requisições simultâneas.
+
+    Compartilha o RateLimitState do cliente síncrono, então a cota é contada por processo.
+    """
+
+    def __init__(self, rate: RateLimitState, max_concurrency: int = 8, connect_timeout: float = 3.05,
+                 read_timeout: float = 15.0, max_retries: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0):
+        self.rate = rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = {"requests": 0, "retries": 0, "throttled_seconds": 0.0}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        # httpx só é importado quando o caminho assíncrono é usado
+        import httpx
+        self._httpx = httpx
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        )
+
+    async def _throttle(self):
+        priority = current_priority()
+        queued = False
+        try:
+            while True:
+                wait = self.rate.reserve(priority)
+                if wait <= 0:
+                    return
+                if not queued:
+                    self.rate.enqueue(priority)
+                    queued = True
+                self.stats["throttled_seconds"] += wait
+                get_telemetry().incr("api_throttled_seconds_total", wait)
+                await asyncio.sleep(wait)
+        finally:
+            if queued:
+                self.rate.dequeue(priority)
+
+    _backoff = FootballHTTPClient._backoff
+
+    async def get(self, url: str, headers: dict = None, params: dict = None):
+        telemetry = get_telemetry()
+        if not telemetry.enabled:
+            return await self._get(url, headers, params)
+
+        endpoint = urlsplit(url).path.lstrip("/")
+        with telemetry.span("http.request", endpoint=endpoint, transporte="async") as span:
+            response = await self._get(url, headers, params)
+            span.set(status=response.status_code)
+        _record_response(telemetry, endpoint, response.status_code, self.rate)
+        return response
+
+    async def _get(self, url: str, headers: dict = None, params: dict = None):
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self._throttle()
+                self.stats["requests"] += 1
+                get_telemetry().incr("api_requests_total")
+                try:
+                    response = await self.client.get(url, headers=headers, params=params)
+                except (self._httpx.TransportError, self._httpx.TimeoutException):
+                    if attempt == self.max_retries:
+                        raise
+                    self.stats["retries"] += 1
+                    get_telemetry().incr("api_retries_total")
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+
+                self.rate.update(response.headers)
+
+                if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                    self.stats["retries"] += 1
+                    get_telemetry().incr("api_retries_total")
+                    await asyncio.sleep(self._backoff(attempt, response.headers.get("Retry-After")))
+                    continue
+
+                return response
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+def _record_response(telemetry, endpoint: str, status_code: int, rate: RateLimitState):
+    """Contador de respostas por endpoint/status e gauges da cota informada pela API."""
+    telemetry.incr("api_responses_total", endpoint=endpoint, status=status_code)
+    for name, value in rate.snapshot().items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            telemetry.set_gauge(f"api_quota_{name}", value)
+
+
+def _int_header(headers, name: str, default):
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else default
+    except ValueError:
+        return default
+
+
+def _utc_today():
+    return datetime.now(timezone.utc).date()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_http_client() -> FootballHTTPClient:
+    """Cliente HTTP compartilhado por todas as instâncias de FootballAPI."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = FootballHTTPClient()
+        return _default_client
+
+
+_async_clients = {}
+
+
+def get_async_http_client() -> AsyncFootballHTTPClient:
+    """Cliente assíncrono do event loop atual (conexões httpx não podem cruzar loops)."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        # Descarta clientes de loops já encerrados
+        for old_loop in [l for l in _async_clients if l.is_closed()]:
+            del _async_clients[old_loop]
+        client = AsyncFootballHTTPClient(
+            get_http_client().rate,
+            max_concurrency=int(os.getenv("FOOTBALL_API_MAX_CONCURRENCY", "8"))
+        )
+        _async_clients[loop] = client
+    return client
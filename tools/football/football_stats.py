@@ -0,0 +1,212 @@
+import numpy as np
+
+OVER_LINES = (1.5, 2.5, 3.5)
+RESULT_CHARS = np.array(["D", "E", "V"])
+
+
+class FixtureBatch:
+    """Lote colunar de jogos encerrados (um array NumPy por campo)."""
+
+    def __init__(self, fixture_ids, timestamps, home_ids, away_ids, home_goals, away_goals):
+        self.fixture_ids = np.asarray(fixture_ids, dtype=np.int64)
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.home_ids = np.asarray(home_ids, dtype=np.int64)
+        self.away_ids = np.asarray(away_ids, dtype=np.int64)
+        self.home_goals = np.asarray(home_goals, dtype=np.int64)
+        self.away_goals = np.asarray(away_goals, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.fixture_ids)
+
+    @classmethod
+    def from_records(cls, records: list) -> "FixtureBatch":
+        """Monta o lote a partir de FixtureRecord, ignorando jogos sem placar."""
+        rows = [(r.fixture_id, r.timestamp, r.home_id, r.away_id, r.home_goals, r.away_goals)
+                for r in records if r.home_goals is not None and r.away_goals is not None]
+        if not rows:
+            return cls([], [], [], [], [], [])
+        return cls(*zip(*rows))
+
+
+def team_stats(batch: FixtureBatch, window: int = None, team_ids=None) -> dict:
+    """Estatísticas por time em uma passada vetorizada.
+
+    Cada jogo vira duas linhas (mandante e visitante); as linhas são ordenadas por
+    (time, data desc) e, se `window` for informado, só os últimos `window` jogos de
+    cada time entram nas somas. Retorna um dict de colunas indexadas por `team_id`.
+    """
+    team = np.concatenate([batch.home_ids, batch.away_ids])
+    goals_for = np.concatenate([batch.home_goals, batch.away_goals])
+    goals_against = np.concatenate([batch.away_goals, batch.home_goals])
+    is_home = np.concatenate([np.ones(len(batch), dtype=bool), np.zeros(len(batch), dtype=bool)])
+    timestamps = np.concatenate([batch.timestamps, batch.timestamps])
+
+    if team_ids is not None:
+        keep = np.isin(team, np.asarray(list(team_ids), dtype=np.int64))
+        team, goals_for, goals_against = team[keep], goals_for[keep], goals_against[keep]
+        is_home, timestamps = is_home[keep], timestamps[keep]
+
+    order = np.lexsort((-timestamps, team))
+    team, goals_for, goals_against, is_home = team[order], goals_for[order], goals_against[order], is_home[order]
+
+    # Posição de cada jogo dentro do seu time (0 = mais recente)
+    starts = np.flatnonzero(np.r_[True, team[1:] != team[:-1]]) if len(team) else np.array([], dtype=np.int64)
+    counts = np.diff(np.r_[starts, len(team)])
+    rank = np.arange(len(team)) - np.repeat(starts, counts)
+
+    if window is not None:
+        keep = rank < window
+        team, goals_for, goals_against, is_home, rank = team[keep], goals_for[keep], goals_against[keep], is_home[keep], rank[keep]
+
+    teams, idx = np.unique(team, return_inverse=True)
+    size = len(teams)
+
+    def total(mask=None, weights=None):
+        values = weights if weights is not None else np.ones(len(idx))
+        if mask is not None:
+            values = values * mask
+        return np.bincount(idx, weights=values, minlength=size).astype(np.int64)
+
+    win = goals_for > goals_against
+    draw = goals_for == goals_against
+    loss = goals_for < goals_against
+    total_goals = goals_for + goals_against
+    away = ~is_home
+
+    table = {
+        "team_id": teams,
+        "jogos": total(),
+        "vitorias": total(win),
+        "empates": total(draw),
+        "derrotas": total(loss),
+        "gols_marcados": total(weights=goals_for),
+        "gols_sofridos": total(weights=goals_against),
+        "clean_sheets": total(goals_against == 0),
+        "sem_marcar": total(goals_for == 0),
+        "btts": total((goals_for > 0) & (goals_against > 0)),
+        "casa_jogos": total(is_home),
+        "casa_vitorias": total(is_home & win),
+        "casa_empates": total(is_home & draw),
+        "casa_derrotas": total(is_home & loss),
+        "casa_gols_marcados": total(is_home, goals_for),
+        "casa_gols_sofridos": total(is_home, goals_against),
+        "fora_jogos": total(away),
+        "fora_vitorias": total(away & win),
+        "fora_empates": total(away & draw),
+        "fora_derrotas": total(away & loss),
+        "fora_gols_marcados": total(away, goals_for),
+        "fora_gols_sofridos": total(away, goals_against),
+    }
+    for line in OVER_LINES:
+        table[_over_key(line)] = total(total_goals > line)
+
+    table["pontos"] = table["vitorias"] * 3 + table["empates"]
+
+    # Sequência de resultados (mais recente primeiro), já na ordem (time, data desc)
+    results = RESULT_CHARS[np.sign(goals_for - goals_against) + 1]
+    bounds = np.flatnonzero(np.r_[True, idx[1:] != idx[:-1]])[1:] if len(idx) else []
+    table["sequencia"] = np.array(["".join(chunk) for chunk in np.split(results, bounds)] if len(idx) else [], dtype=object)
+
+    return table
+
+
+def _over_key(line: float) -> str:
+    return f"over_{str(line).replace('.', '_')}"
+
+
+def _pct(part, whole) -> float:
+    return round(float(part) / whole * 100, 1) if whole else 0.0
+
+
+def _avg(part, whole) -> float:
+    return round(float(part) / whole, 2) if whole else 0.0
+
+
+def team_summary(table: dict, team_id: int) -> dict:
+    """Converte a linha de um time da tabela colunar no dict de estatísticas das ações."""
+    position = np.searchsorted(table["team_id"], team_id)
+    if position >= len(table["team_id"]) or table["team_id"][position] != team_id:
+        row = {key: 0 for key in table if key not in ("team_id", "sequencia")}
+        row["sequencia"] = ""
+    else:
+        row = {key: column[position] for key, column in table.items()}
+
+    games = int(row["jogos"])
+    summary = {
+        "gols_marcados": int(row["gols_marcados"]),
+        "gols_sofridos": int(row["gols_sofridos"]),
+        "vitorias": int(row["vitorias"]),
+        "empates": int(row["empates"]),
+        "derrotas": int(row["derrotas"]),
+        "total_jogos": games,
+        "media_gols_marcados": _avg(row["gols_marcados"], games),
+        "media_gols_sofridos": _avg(row["gols_sofridos"], games),
+        "aproveitamento": _pct(row["pontos"], games * 3),
+        "sequencia": str(row["sequencia"]),
+        "clean_sheets_pct": _pct(row["clean_sheets"], games),
+        "sem_marcar_pct": _pct(row["sem_marcar"], games),
+        "btts_pct": _pct(row["btts"], games),
+    }
+    for line in OVER_LINES:
+        summary[f"{_over_key(line)}_pct"] = _pct(row[_over_key(line)], games)
+
+    for side in ("casa", "fora"):
+        side_games = int(row[f"{side}_jogos"])
+        summary[side] = {
+            "jogos": side_games,
+            "vitorias": int(row[f"{side}_vitorias"]),
+            "empates": int(row[f"{side}_empates"]),
+            "derrotas": int(row[f"{side}_derrotas"]),
+            "media_gols_marcados": _avg(row[f"{side}_gols_marcados"], side_games),
+            "media_gols_sofridos": _avg(row[f"{side}_gols_sofridos"], side_games),
+        }
+
+    return summary
+
+
+# Mercados do ranking da liga: coluna de contagem em team_stats
+LEAGUE_MARKETS = ("btts", "clean_sheets", "sem_marcar") + tuple(_over_key(line) for line in OVER_LINES)
+# Rankings de gols: mesma ordenação por jogo, mas o valor é média de gols (não % dos jogos)
+LEAGUE_GOAL_RANKINGS = ("gols_marcados", "gols_sofridos")
+
+
+def standings_order(table: dict) -> np.ndarray:
+    """Índices da tabela colunar na ordem de classificação: pontos, vitórias, saldo, gols marcados."""
+    goal_difference = table["gols_marcados"] - table["gols_sofridos"]
+    return np.lexsort((-table["gols_marcados"], -goal_difference, -table["vitorias"], -table["pontos"]))
+
+
+def market_order(table: dict, market: str, ascending: bool = False) -> np.ndarray:
+    """Índices ordenados pela taxa por jogo do mercado (maior primeiro, ou menor com ascending);
+    empate decidido por mais jogos."""
+    rate = table[market] / np.maximum(table["jogos"], 1)
+    return np.lexsort((-table["jogos"], rate if ascending else -rate))
+
+
+def league_rows(table: dict, order, names: dict, market: str = None) -> list:
+    """Linhas do ranking da liga na ordem dada (posição 1 = primeira)."""
+    rows = []
+    for position, i in enumerate(order, 1):
+        team_id, games = int(table["team_id"][i]), int(table["jogos"][i])
+        row = {
+            "posicao": position,
+            "team": names.get(team_id),
+            "team_id": team_id,
+            "jogos": games,
+            "pontos": int(table["pontos"][i]),
+            "vitorias": int(table["vitorias"][i]),
+            "empates": int(table["empates"][i]),
+            "derrotas": int(table["derrotas"][i]),
+            "gols_marcados": int(table["gols_marcados"][i]),
+            "gols_sofridos": int(table["gols_sofridos"][i]),
+            "saldo": int(table["gols_marcados"][i] - table["gols_sofridos"][i]),
+            "aproveitamento": _pct(table["pontos"][i], games * 3),
+            "sequencia": str(table["sequencia"][i]),
+        }
+        if market in LEAGUE_GOAL_RANKINGS:
+            row["media"] = _avg(table[market][i], games)
+        elif market:
+            row["casos"] = int(table[market][i])
+            row["pct"] = _pct(table[market][i], games)
+        rows.append(row)
+    return rows
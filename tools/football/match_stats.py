@@ -0,0 +1,188 @@
+"""Estatísticas detalhadas de partidas (escanteios, cartões, chutes, posse, xG).
+
+Normaliza o bloco `statistics` da API-Football em registros numéricos por jogo
+e agrega esses registros nas saídas de jogos recentes e confronto direto.
+"""
+from tools.football.fixture_record import FINISHED_STATUSES
+
+# Máximo de ids por chamada de /fixtures?ids= na API-Football
+IDS_PER_REQUEST = 20
+
+STAT_FIELDS = {
+    "Shots on Goal": "chutes_no_gol",
+    "Shots off Goal": "chutes_fora",
+    "Total Shots": "chutes",
+    "Blocked Shots": "chutes_bloqueados",
+    "Corner Kicks": "escanteios",
+    "Offsides": "impedimentos",
+    "Fouls": "faltas",
+    "Yellow Cards": "cartoes_amarelos",
+    "Red Cards": "cartoes_vermelhos",
+    "Goalkeeper Saves": "defesas",
+    "Ball Possession": "posse",
+    "Total passes": "passes",
+    "Passes accurate": "passes_certos",
+    "expected_goals": "xg",
+}
+
+
+def chunks(values: list, size: int = IDS_PER_REQUEST):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _number(value):
+    # A API usa null para contagens zeradas e strings como "54%" ou "1.37"
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        value = value.strip().rstrip("%")
+        try:
+            return float(value) if "." in value else int(value)
+        except ValueError:
+            return None
+    return value
+
+
+def _side(block: dict) -> dict:
+    record = {"team_id": block["team"]["id"]}
+    for item in block.get("statistics") or []:
+        field = STAT_FIELDS.get(item.get("type"))
+        if field:
+            value = _number(item.get("value"))
+            if value is not None:
+                record[field] = value
+    record["cartoes"] = record.get("cartoes_amarelos", 0) + record.get("cartoes_vermelhos", 0)
+    return record
+
+
+def normalize_fixture(fixture: dict):
+    """Registro {"fixture_id", "finished", "home": {...}, "away": {...}} de um item de /fixtures?ids=, ou None sem estatísticas."""
+    blocks = fixture.get("statistics") or []
+    if len(blocks) < 2:
+        return None
+
+    home_id = fixture["teams"]["home"]["id"]
+    sides = {block["team"]["id"]: _side(block) for block in blocks if block.get("team")}
+    away_id = fixture["teams"]["away"]["id"]
+    if home_id not in sides or away_id not in sides:
+        return None
+
+    return {
+        "fixture_id": fixture["fixture"]["id"],
+        "finished": fixture["fixture"]["status"]["short"] in FINISHED_STATUSES,
+        "home": sides[home_id],
+        "away": sides[away_id],
+    }
+
+
+def no_statistics_record(fixture: dict):
+    """Marcador de jogo encerrado que veio sem estatísticas (liga sem cobertura), ou None.
+
+    Guardado como as estatísticas normais, evita buscar o mesmo jogo (e gastar
+    cota) a cada pergunta; "home"/"away" vazios indicam a falta de dados.
+    """
+    if fixture["fixture"]["status"]["short"] not in FINISHED_STATUSES:
+        return None
+    return {"fixture_id": fixture["fixture"]["id"], "finished": True, "home": None, "away": None}
+
+
+def has_statistics(record: dict) -> bool:
+    return bool(record.get("home")) and bool(record.get("away"))
+
+
+def fixture_ids(results: list) -> list:
+    """IDs de jogos, sem repetição, das saídas de jogos recentes / confronto direto."""
+    ids = []
+    for result in results:
+        if not isinstance(result, dict):
+            continue
+        for match in result.get("matches", []):
+            fixture_id = match.get("fixture_id")
+            if fixture_id is not None and fixture_id not in ids:
+                ids.append(fixture_id)
+    return ids
+
+
+def _mean(values: list):
+    values = [v for v in values if v is not None]
+    return round(sum(values) / len(values), 2) if values else None
+
+
+def _team_summary(rows: list) -> dict:
+    """rows: lista de (registro do time, registro do adversário)."""
+    def avg(field, own=True):
+        return _mean([(team if own else opponent).get(field) for team, opponent in rows])
+
+    return {
+        "jogos": len(rows),
+        "media_escanteios": avg("escanteios"),
+        "media_escanteios_sofridos": avg("escanteios", own=False),
+        "media_escanteios_total": _mean([t.get("escanteios", 0) + o.get("escanteios", 0) for t, o in rows]),
+        "media_cartoes": avg("cartoes"),
+        "media_cartoes_adversario": avg("cartoes", own=False),
+        "media_chutes": avg("chutes"),
+        "media_chutes_no_gol": avg("chutes_no_gol"),
+        "media_chutes_sofridos": avg("chutes", own=False),
+        "media_faltas": avg("faltas"),
+        "media_posse": avg("posse"),
+        "media_xg": avg("xg"),
+        "media_xg_sofrido": avg("xg", own=False),
+    }
+
+
+def attach_to_recent(result: dict, records: dict) -> dict:
+    """Acrescenta `stats` a cada jogo e `estatisticas_detalhadas` à saída de get_team_recent_matches."""
+    team_id = result.get("team_id")
+    rows = []
+    for match in result.get("matches", []):
+        record = records.get(str(match.get("fixture_id")))
+        if record is None:
+            continue
+        own, other = ("home", "away") if record["home"]["team_id"] == team_id else ("away", "home")
+        match["stats"] = {"team": _strip(record[own]), "opponent": _strip(record[other])}
+        rows.append((record[own], record[other]))
+
+    if rows:
+        result["estatisticas_detalhadas"] = _team_summary(rows)
+    return result
+
+
+def attach_to_head_to_head(result: dict, records: dict) -> dict:
+    """Acrescenta `stats` a cada confronto e médias por jogo (e por time) à saída de head_to_head."""
+    team1_id = result.get("team1_id")
+    rows = []
+    for match in result.get("matches", []):
+        record = records.get(str(match.get("fixture_id")))
+        if record is None:
+            continue
+        match["stats"] = {"home": _strip(record["home"]), "away": _strip(record["away"])}
+        team1, team2 = ("home", "away") if record["home"]["team_id"] == team1_id else ("away", "home")
+        rows.append((record[team1], record[team2]))
+
+    if rows:
+        summary = _team_summary(rows)
+        result["estatisticas_detalhadas"] = {
+            "jogos": summary["jogos"],
+            "media_escanteios_total": summary["media_escanteios_total"],
+            "media_escanteios_team1": summary["media_escanteios"],
+            "media_escanteios_team2": summary["media_escanteios_sofridos"],
+            "media_cartoes_total": _mean([t.get("cartoes", 0) + o.get("cartoes", 0) for t, o in rows]),
+            "media_chutes_total": _mean([t.get("chutes", 0) + o.get("chutes", 0) for t, o in rows]),
+            "media_xg_team1": summary["media_xg"],
+            "media_xg_team2": summary["media_xg_sofrido"],
+        }
+    return result
+
+
+def attach(result: dict, records: dict) -> dict:
+    """Encaixa as estatísticas na saída certa (jogos recentes ou confronto direto)."""
+    if not isinstance(result, dict) or "error" in result:
+        return result
+    if "team1_id" in result:
+        return attach_to_head_to_head(result, records)
+    return attach_to_recent(result, records)
+
+
+def _strip(side: dict) -> dict:
+    return {key: value for key, value in side.items() if key != "team_id"}
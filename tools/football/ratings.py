@@ -0,0 +1,266 @@
+import os
+import json
+import sqlite3
+import threading
+
+from tools.football.fixture_record import FixtureRecord
+
+ELO_START = 1500.0
+ELO_K = 20.0
+ELO_HOME_ADVANTAGE = 60.0
+# Suavização das médias móveis de gols por time e da média global de gols
+EWMA_ALPHA = 0.15
+LEAGUE_ALPHA = 0.02
+GOALS_START = 1.3
+FORM_WINDOW = 10
+
+
+def finished_row(record: FixtureRecord):
+    """(fixture_id, timestamp, home_id, home_name, away_id, away_name, home_goals, away_goals) ou None."""
+    if not record.finished:
+        return None
+    return (record.fixture_id, record.timestamp, record.home_id, record.home_name,
+            record.away_id, record.away_name, record.home_goals, record.away_goals)
+
+
+def _goal_multiplier(difference: int) -> float:
+    # World Football Elo: vitórias largas pesam mais
+    difference = abs(difference)
+    if difference <= 1:
+        return 1.0
+    if difference == 2:
+        return 1.5
+    return (11 + difference) / 8
+
+
+def _result(goals_for: int, goals_against: int) -> str:
+    return "V" if goals_for > goals_against else "D" if goals_for < goals_against else "E"
+
+
+def _form(recent: list, n: int) -> dict:
+    window = recent[:n]
+    points = sum(3 if res == "V" else 1 if res == "E" else 0 for _, res, _, _ in window)
+    return {
+        "jogos": len(window),
+        "sequencia": "".join(res for _, res, _, _ in window),
+        "pontos": points,
+        "aproveitamento": round(points / (len(window) * 3) * 100, 1) if window else 0.0,
+        "gols_marcados": sum(gf for _, _, gf, _ in window),
+        "gols_sofridos": sum(ga for _, _, _, ga in window),
+    }
+
+
+class RatingEngine:
+    """Ratings em memória: Elo, médias móveis de gols marcados/sofridos e os últimos 10 jogos.
+
+    apply() custa O(1) por jogo (atualiza só os dois times). O Elo depende da
+    ordem dos jogos: aplicados fora de ordem, os valores aproximam os de rebuild().
+    """
+
+    def __init__(self):
+        self.teams = {}
+        self.league_goals = GOALS_START
+        self.fixtures = 0
+
+    def _team(self, team_id: int, name: str) -> dict:
+        team = self.teams.get(team_id)
+        if team is None:
+            team = self.teams[team_id] = {
+                "team_id": team_id, "name": name, "elo": ELO_START, "attack": GOALS_START,
+                "defence": GOALS_START, "games": 0, "recent": []
+            }
+        elif name:
+            team["name"] = name
+        return team
+
+    def apply(self, row: tuple):
+        fixture_id, timestamp, home_id, home_name, away_id, away_name, home_goals, away_goals = row
+        home, away = self._team(home_id, home_name), self._team(away_id, away_name)
+
+        expected = 1 / (1 + 10 ** ((away["elo"] - home["elo"] - ELO_HOME_ADVANTAGE) / 400))
+        actual = 1.0 if home_goals > away_goals else 0.0 if home_goals < away_goals else 0.5
+        delta = ELO_K * _goal_multiplier(home_goals - away_goals) * (actual - expected)
+        home["elo"] += delta
+        away["elo"] -= delta
+
+        for team, scored, conceded in ((home, home_goals, away_goals), (away, away_goals, home_goals)):
+            team["attack"] += EWMA_ALPHA * (scored - team["attack"])
+            team["defence"] += EWMA_ALPHA * (conceded - team["defence"])
+            team["games"] += 1
+            self._push(team, [timestamp, _result(scored, conceded), scored, conceded])
+
+        self.league_goals += LEAGUE_ALPHA * ((home_goals + away_goals) / 2 - self.league_goals)
+        self.fixtures += 1
+
+    @staticmethod
+    def _push(team: dict, entry: list):
+        # Janela fixa de 10 jogos, do mais recente ao mais antigo (aceita jogos fora de ordem)
+        recent = team["recent"]
+        position = 0
+        while position < len(recent) and recent[position][0] >= entry[0]:
+            position += 1
+        if position < FORM_WINDOW:
+            recent.insert(position, entry)
+            del recent[FORM_WINDOW:]
+
+    def summary(self, team_id: int):
+        team = self.teams.get(team_id)
+        if team is None:
+            return None
+        return {
+            "team_id": team_id,
+            "name": team["name"],
+            "elo": round(team["elo"], 1),
+            # Força relativa à média de gols por time (1.0 = média; defesa < 1 sofre menos)
+            "forca_ataque": round(team["attack"] / self.league_goals, 2),
+            "forca_defesa": round(team["defence"] / self.league_goals, 2),
+            "jogos_avaliados": team["games"],
+            "forma_5": _form(team["recent"], 5),
+            "forma_10": _form(team["recent"], 10),
+            "ultimo_jogo": team["recent"][0][0] if team["recent"] else None,
+        }
+
+
+class RatingsStore:
+    """Ratings persistentes (SQLite) mantidos incrementalmente a cada jogo encerrado ingerido.
+
+    O estado fica espelhado em memória: leituras por time não tocam o disco nem a API.
+    Cada jogo é aplicado uma única vez (tabela rated_fixtures); rebuild() recalcula
+    tudo a partir de um histórico e verify() compara o estado atual com esse recálculo.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS ratings (
+                team_id INTEGER PRIMARY KEY,
+                state TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rated_fixtures (
+                fixture_id INTEGER PRIMARY KEY
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+        self.engine = self._load()
+
+    def _load(self) -> RatingEngine:
+        engine = RatingEngine()
+        for team_id, state in self._conn.execute("SELECT team_id, state FROM ratings"):
+            engine.teams[team_id] = json.loads(state)
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        engine.league_goals = meta.get("league_goals", GOALS_START)
+        engine.fixtures = int(meta.get("fixtures", 0))
+        return engine
+
+    def _persist(self, engine: RatingEngine, team_ids, fixture_ids):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO ratings VALUES (?, ?)",
+            [(team_id, json.dumps(engine.teams[team_id], ensure_ascii=False)) for team_id in team_ids]
+        )
+        self._conn.executemany("INSERT OR IGNORE INTO rated_fixtures VALUES (?)", [(i,) for i in fixture_ids])
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+            [("league_goals", engine.league_goals), ("fixtures", engine.fixtures)]
+        )
+        self._conn.commit()
+
+    def ingest(self, fixtures: list) -> int:
+        """Aplica os jogos encerrados ainda não avaliados (FixtureRecord). Retorna quantos."""
+        rows = {}
+        for fixture in fixtures:
+            row = finished_row(fixture)
+            if row is not None:
+                rows[row[0]] = row
+        if not rows:
+            return 0
+
+        with self._lock:
+            ids = list(rows)
+            seen = {r[0] for r in self._conn.execute(
+                f"SELECT fixture_id FROM rated_fixtures WHERE fixture_id IN ({','.join('?' * len(ids))})", ids
+            )}
+            new = sorted((row for fixture_id, row in rows.items() if fixture_id not in seen), key=lambda r: r[1])
+            if not new:
+                return 0
+
+            changed = set()
+            for row in new:
+                self.engine.apply(row)
+                changed.update((row[2], row[4]))
+            self._persist(self.engine, changed, [row[0] for row in new])
+        return len(new)
+
+    def get(self, team_id: int):
+        """Rating e forma atuais do time (None se nenhum jogo dele foi ingerido)."""
+        return self.engine.summary(team_id)
+
+    @staticmethod
+    def replay(fixtures: list) -> RatingEngine:
+        """Recalcula os ratings do zero, em ordem cronológica, sem persistir."""
+        engine = RatingEngine()
+        rows = {row[0]: row for row in map(finished_row, fixtures) if row is not None}
+        for row in sorted(rows.values(), key=lambda r: r[1]):
+            engine.apply(row)
+        return engine
+
+    def rebuild(self, fixtures: list) -> dict:
+        """Substitui o estado pelo recálculo completo a partir do histórico informado."""
+        engine = self.replay(fixtures)
+        with self._lock:
+            self._conn.execute("DELETE FROM ratings")
+            self._conn.execute("DELETE FROM rated_fixtures")
+            rated = [row[0] for row in map(finished_row, fixtures) if row is not None]
+            self._persist(engine, list(engine.teams), rated)
+            self.engine = engine
+        return {"teams": len(engine.teams), "fixtures": engine.fixtures}
+
+    def verify(self, fixtures: list) -> dict:
+        """Diferença entre o estado incremental e o recálculo completo do mesmo histórico."""
+        reference = self.replay(fixtures)
+        elo_diffs, form_mismatches = [], []
+        for team_id, team in reference.teams.items():
+            current = self.engine.teams.get(team_id)
+            if current is None:
+                form_mismatches.append(team_id)
+                continue
+            elo_diffs.append(abs(current["elo"] - team["elo"]))
+            if [r[:2] for r in current["recent"]] != [r[:2] for r in team["recent"]]:
+                form_mismatches.append(team_id)
+        return {
+            "teams": len(reference.teams),
+            "max_elo_diff": round(max(elo_diffs), 2) if elo_diffs else 0.0,
+            "form_mismatches": form_mismatches
+        }
+
+    def stats(self) -> dict:
+        return {"teams": len(self.engine.teams), "fixtures": self.engine.fixtures,
+                "league_goals": round(self.engine.league_goals, 3)}
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_ratings_store() -> RatingsStore:
+    """Ratings compartilhados (caminho configurável em FOOTBALL_RATINGS_PATH)."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = RatingsStore(
+                os.getenv("FOOTBALL_RATINGS_PATH", os.path.join(".cache", "ratings.sqlite"))
+            )
+        return _default_store
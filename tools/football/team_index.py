@@ -0,0 +1,222 @@
+import os
+import re
+import json
+import difflib
+import threading
+import unicodedata
+
+# Palavras genéricas de nomes de clubes ignoradas na comparação ("CR Flamengo" == "Flamengo")
+STOPWORDS = {
+    "fc", "cf", "cr", "ec", "sc", "se", "ac", "afc", "cd", "ca", "club", "clube",
+    "de", "do", "da", "dos", "das", "futebol", "regatas", "esporte", "associacao"
+}
+
+# Apelidos comuns -> nome usado pela API-Football
+BUILTIN_ALIASES = {
+    "fla": "Flamengo",
+    "mengao": "Flamengo",
+    "verdao": "Palmeiras",
+    "porco": "Palmeiras",
+    "timao": "Corinthians",
+    "spfc": "Sao Paulo",
+    "tricolor paulista": "Sao Paulo",
+    "peixe": "Santos",
+    "galo": "Atletico-MG",
+    "atletico mineiro": "Atletico-MG",
+    "furacao": "Atletico Paranaense",
+    "athletico paranaense": "Atletico Paranaense",
+    "fogao": "Botafogo",
+    "vasco": "Vasco DA Gama",
+    "flu": "Fluminense",
+    "inter": "Internacional",
+    "colorado": "Internacional",
+    "tricolor gaucho": "Gremio",
+    "raposa": "Cruzeiro",
+    "river": "River Plate",
+    "boca": "Boca Juniors",
+    "real": "Real Madrid",
+    "barca": "Barcelona",
+}
+
+FUZZY_CUTOFF = 0.85
+
+
+def normalize(name: str) -> str:
+    """Minúsculas, sem acentos e sem pontuação."""
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^a-z0-9]+", " ", text.lower())
+    return " ".join(text.split())
+
+
+def strip_stopwords(normalized: str) -> str:
+    tokens = [t for t in normalized.split() if t not in STOPWORDS]
+    return " ".join(tokens) or normalized
+
+
+class TeamIndex:
+    """Índice persistente nome/apelido -> ID de time, consultado em memória."""
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.teams = {}
+        self.keys = {}
+        self.loaded_leagues = set()
+        # Chaves vindas de nomes de times (não de apelidos), por primeiro token: busca "contido"
+        self._name_keys = {}
+        self._by_first_token = {}
+        # Todas as chaves pela primeira letra: candidatos do fuzzy
+        self._by_initial = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.teams = {int(team_id): info for team_id, info in data.get("teams", {}).items()}
+        for key, team_id in data.get("keys", {}).items():
+            self._add_key(key, int(team_id))
+        for team_id, info in self.teams.items():
+            self._add_name_keys(team_id, info["name"])
+        self.loaded_leagues = set(data.get("loaded_leagues", []))
+
+    def save(self):
+        if not self.path:
+            return
+        # Snapshot e gravação sob o mesmo lock: a última gravação é sempre o estado mais novo,
+        # e gravações concorrentes não compartilham o arquivo temporário
+        with self._save_lock:
+            with self._lock:
+                data = json.dumps({
+                    "teams": self.teams,
+                    "keys": self.keys,
+                    "loaded_leagues": sorted(self.loaded_leagues)
+                }, ensure_ascii=False)
+
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+
+    def _add_key(self, key: str, team_id: int, replace: bool = True):
+        """Registra uma chave de busca (quem chama segura _lock, exceto no _load)."""
+        if not key or (not replace and key in self.keys):
+            return
+        self.keys[key] = team_id
+        self._by_initial.setdefault(key[0], set()).add(key)
+
+    def _add_name_keys(self, team_id: int, name: str):
+        normalized = normalize(name)
+        for key in (normalized, strip_stopwords(normalized)):
+            if key:
+                self._name_keys[key] = team_id
+                self._by_first_token.setdefault(key.split()[0], set()).add(key)
+
+    def add_team(self, team_id: int, name: str, code: str = None, country: str = None):
+        """Registra um time e suas chaves de busca (nome normalizado, sem stopwords e código)."""
+        with self._lock:
+            self.teams[team_id] = {"name": name, "code": code, "country": country}
+            normalized = normalize(name)
+            self._add_key(normalized, team_id)
+            self._add_key(strip_stopwords(normalized), team_id, replace=False)
+            if code:
+                self._add_key(normalize(code), team_id, replace=False)
+            self._add_name_keys(team_id, name)
+
+    def add_alias(self, alias: str, team_id: int):
+        with self._lock:
+            self._add_key(normalize(alias), team_id)
+
+    def canonical_name(self, name: str) -> str:
+        """Resolve apelidos conhecidos para o nome usado pela API."""
+        normalized = normalize(name)
+        return BUILTIN_ALIASES.get(normalized, BUILTIN_ALIASES.get(strip_stopwords(normalized), name))
+
+    def lookup(self, name: str):
+        """Retorna o ID do time ou None. Exato -> sem stopwords -> apelido -> fuzzy."""
+        normalized = normalize(name)
+        if not normalized:
+            return None
+
+        team_id = self.keys.get(normalized)
+        if team_id is not None:
+            return team_id
+
+        stripped = strip_stopwords(normalized)
+        team_id = self.keys.get(stripped)
+        if team_id is not None:
+            return team_id
+
+        canonical = self.canonical_name(name)
+        if canonical != name:
+            team_id = self.keys.get(normalize(canonical))
+            if team_id is not None:
+                return team_id
+
+        # Nome de time contido na busca ("Flamengo RJ" -> "flamengo"); só nomes, não apelidos,
+        # e só se um único time casar ("inter" memorizado não responde por "Inter de Milão")
+        tokens = set(stripped.split())
+        with self._lock:
+            contained = {key for token in tokens for key in self._by_first_token.get(token, ())
+                         if len(key) >= 4 and set(key.split()) <= tokens}
+            team_ids = {self._name_keys[key] for key in contained}
+            # Fuzzy só entre chaves com a mesma inicial, não contra o índice inteiro
+            candidates = list(self._by_initial.get(stripped[0], ()))
+
+        if not team_ids:
+            matches = difflib.get_close_matches(stripped, candidates, n=2, cutoff=FUZZY_CUTOFF)
+            team_ids = {self.keys[key] for key in matches}
+        if len(team_ids) == 1:
+            team_id = team_ids.pop()
+            # Memoriza a grafia para as próximas consultas (só quando não é ambígua)
+            self.add_alias(name, team_id)
+            return team_id
+
+        return None
+
+    def best_match(self, name: str, candidates: list):
+        """Escolhe, entre os resultados de /teams?search=, o time cujo nome mais se parece com a busca."""
+        target = strip_stopwords(normalize(name))
+
+        def score(item):
+            team = item["team"]
+            candidate = strip_stopwords(normalize(team["name"]))
+            exact = candidate == target
+            ratio = difflib.SequenceMatcher(None, target, candidate).ratio()
+            return (exact, not team.get("national", False), ratio)
+
+        return max(candidates, key=score) if candidates else None
+
+    def bulk_load(self, league_id: int, season: int, fetch) -> int:
+        """Carrega todos os times de uma liga/temporada. fetch(endpoint, params) -> data."""
+        data = fetch("teams", {"league": league_id, "season": season})
+        items = data.get("response") or []
+        for item in items:
+            team = item["team"]
+            self.add_team(team["id"], team["name"], team.get("code"), team.get("country"))
+
+        if items:
+            self.loaded_leagues.add(f"{league_id}:{season}")
+            self.save()
+        return len(items)
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_team_index() -> TeamIndex:
+    """Índice compartilhado (caminho configurável em FOOTBALL_TEAM_INDEX_PATH)."""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = TeamIndex(
+                os.getenv("FOOTBALL_TEAM_INDEX_PATH", os.path.join(".cache", "team_index.json"))
+            )
+        return _default_index
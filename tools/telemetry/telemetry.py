@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import uuid
+import bisect
+import logging
+import threading
+import contextvars
+
+logger = logging.getLogger("agente_football.telemetry")
+
+# Limites (segundos) dos histogramas de latência
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_current_span = contextvars.ContextVar("telemetry_span", default=None)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float):
+        """Estimativa pelo limite superior do bucket (como histogram_quantile, sem interpolar)."""
+        if not self.count:
+            return None
+        target, seen = q * self.count, 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class Telemetry:
+    """Spans aninhados, contadores, gauges e histogramas em memória.
+
+    Desligado por padrão: span() devolve um contexto vazio compartilhado e os
+    demais métodos retornam na primeira linha. Ligado, cada span fechado vira
+    uma linha JSON no logger "agente_football.telemetry" e alimenta o
+    histograma span_duration_seconds.
+    """
+
+    def __init__(self, enabled: bool = False, log_spans: bool = True, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.log_spans = log_spans
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.gauges = {}
+            self.histograms = {}
+
+    def enable(self, log_spans: bool = True):
+        self.enabled = True
+        self.log_spans = log_spans
+
+    def disable(self):
+        self.enabled = False
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def incr(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    # ------------------------------------------------------------------
+    # Spans
+    # ------------------------------------------------------------------
+
+    def span(self, name: str, **attrs):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name, attrs)
+
+    def _finish(self, span):
+        self.observe("span_duration_seconds", span.duration, span=span.name)
+        if span.error:
+            self.incr("span_errors_total", span=span.name)
+        if self.log_spans and logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                "type": "span",
+                "trace_id": span.trace_id,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "name": span.name,
+                "start": round(span.start_wall, 6),
+                "duration_ms": round(span.duration * 1000, 3),
+                "attrs": span.attrs,
+                "error": span.error
+            }, ensure_ascii=False, default=str))
+
+    # ------------------------------------------------------------------
+    # Exportação
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        """Métricas como dict (JSON), com p50/p95/p99 estimados dos histogramas."""
+        def label_str(name, labels):
+            return name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else "")
+
+        with self._lock:
+            return {
+                "counters": {label_str(n, l): v for (n, l), v in self.counters.items()},
+                "gauges": {label_str(n, l): v for (n, l), v in self.gauges.items()},
+                "histograms": {
+                    label_str(n, l): {"count": h.count, "sum": round(h.sum, 6),
+                                      "p50": h.quantile(0.5), "p95": h.quantile(0.95), "p99": h.quantile(0.99)}
+                    for (n, l), h in self.histograms.items()
+                }
+            }
+
+    def prometheus_text(self, prefix: str = "agente_football_") -> str:
+        """Formato de exposição texto do Prometheus (0.0.4)."""
+        def fmt(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+        lines = []
+        with self._lock:
+            for kind, series in (("counter", self.counters), ("gauge", self.gauges)):
+                for name in sorted({n for n, _ in series}):
+                    lines.append(f"# TYPE {prefix}{name} {kind}")
+                    for (n, labels), value in sorted(series.items()):
+                        if n == name:
+                            lines.append(f"{prefix}{name}{fmt(labels)} {value}")
+
+            for name in sorted({n for n, _ in self.histograms}):
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                for (n, labels), h in sorted(self.histograms.items(), key=lambda item: item[0]):
+                    if n != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(list(h.buckets) + ["+Inf"], h.counts):
+                        cumulative += count
+                        lines.append(f"{prefix}{name}_bucket{fmt(labels, [('le', str(bound))])} {cumulative}")
+                    lines.append(f"{prefix}{name}_sum{fmt(labels)} {h.sum}")
+                    lines.append(f"{prefix}{name}_count{fmt(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Span:
+    __slots__ = ("telemetry", "name", "attrs", "trace_id", "span_id", "parent_id",
+                 "start", "start_wall", "duration", "error", "_token")
+
+    def __init__(self, telemetry: Telemetry, name: str, attrs: dict):
+        self.telemetry = telemetry
+        self.name = name
+        self.attrs = attrs
+        self.error = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = uuid.uuid4().hex[:8]
+        self._token = _current_span.set(self)
+        self.start_wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Span aberto em um gerador retomado em outro contexto
+            _current_span.set(None)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.telemetry._finish(self)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+class JsonLogFormatter(logging.Formatter):
+    """Uma linha JSON por registro; mensagens que já são JSON (spans) entram como objeto."""
+
+    def format(self, record):
+        message = record.getMessage()
+        entry = {"ts": round(record.created, 6), "level": record.levelname, "logger": record.name}
+        if message.startswith("{"):
+            try:
+                entry.update(json.loads(message))
+            except ValueError:
+                entry["msg"] = message
+        else:
+            entry["msg"] = message
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level: str = None, json_format: bool = None):
+    """Configura o logging raiz: nível em LOG_LEVEL (padrão WARNING) e JSON com LOG_FORMAT=json."""
+    level = (level or os.getenv("LOG_LEVEL", "WARNING")).upper()
+    if json_format is None:
+        json_format = os.getenv("LOG_FORMAT", "text") == "json"
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonLogFormatter() if json_format else logging.Formatter("%(message)s"))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+
+
+_default_telemetry = Telemetry(enabled=os.getenv("TELEMETRY_ENABLED", "0") == "1")
+
+
+def get_telemetry() -> Telemetry:
+    """Instância do processo (ligada com TELEMETRY_ENABLED=1 ou get_telemetry().enable())."""
+    return _default_telemetry